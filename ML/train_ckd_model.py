@@ -5,8 +5,6 @@
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier
@@ -73,6 +71,12 @@ accuracy = accuracy_score(y_test, y_pred)
 print(f"Model Accuracy: {accuracy*100:.2f}%")
 print("\nClassification Report:\n", classification_report(y_test, y_pred))
 
+# Plotting libraries are only needed for the charts below; Agg renders without a display
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import seaborn as sns
+
 # Confusion Matrix
 cm = confusion_matrix(y_test, y_pred)
 plt.figure(figsize=(6, 4))
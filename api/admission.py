@@ -0,0 +1,270 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request, status
+
+from api.metrics import Counter, Gauge, Histogram
+
+load_dotenv()
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+# Served in this order when a slot frees up
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Concurrent prediction requests per worker process (0 disables the in-flight limit)
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "32"))
+# Share of the in-flight slots batch requests may hold; the rest is kept for interactive ones
+ADMISSION_BATCH_SHARE = float(os.getenv("ADMISSION_BATCH_SHARE", "0.5"))
+# Requests allowed to wait for a slot before new ones are shed with 503
+ADMISSION_MAX_QUEUE = {
+    INTERACTIVE: int(os.getenv("ADMISSION_MAX_QUEUE_INTERACTIVE", "64")),
+    BATCH: int(os.getenv("ADMISSION_MAX_QUEUE_BATCH", "16")),
+}
+# Longest a queued request waits before it is shed; the interactive value is its queueing budget
+ADMISSION_QUEUE_TIMEOUT = {
+    INTERACTIVE: float(os.getenv("ADMISSION_QUEUE_TIMEOUT_INTERACTIVE", "0.25")),
+    BATCH: float(os.getenv("ADMISSION_QUEUE_TIMEOUT_BATCH", "5")),
+}
+# Per-client token bucket: sustained requests/second and burst size (0 disables rate limiting)
+ADMISSION_RATE_PER_SECOND = float(os.getenv("ADMISSION_RATE_PER_SECOND", "0"))
+ADMISSION_BURST = float(os.getenv("ADMISSION_BURST", "20"))
+ADMISSION_MAX_CLIENTS = int(os.getenv("ADMISSION_MAX_CLIENTS", "10000"))
+# Header identifying the client, set by a trusted proxy or gateway. Empty (the
+# default) keys rate limits on the peer address, which clients cannot forge.
+ADMISSION_CLIENT_HEADER = os.getenv("ADMISSION_CLIENT_HEADER", "")
+# Sent as Retry-After on 503s
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+PRIORITY_HEADER = "X-Priority"
+
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "Admission decisions for prediction requests by priority and outcome",
+    ("priority", "decision")
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    "admission_in_flight_requests",
+    "Admitted prediction requests currently running",
+    ("priority",)
+)
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "admission_queue_depth",
+    "Prediction requests waiting for an in-flight slot",
+    ("priority",)
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    "admission_queue_wait_seconds",
+    "Time admitted prediction requests waited for a slot",
+    ("priority",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+
+class Shed(Exception):
+    """Raised when a request is turned away; `reason` is the decision label."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens; returns 0 if they were available, else seconds until they will be."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    One token bucket per client, kept in an LRU of at most `max_clients`
+    entries (an evicted client starts again with a full bucket).
+    """
+
+    def __init__(
+        self,
+        rate: float = ADMISSION_RATE_PER_SECOND,
+        burst: float = ADMISSION_BURST,
+        max_clients: int = ADMISSION_MAX_CLIENTS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_clients = max_clients
+        self.clock = clock
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, client: str) -> float:
+        """0 if `client` may proceed, else seconds until it may retry."""
+        if self.rate <= 0:
+            return 0.0
+        now = self.clock()
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            bucket = self.buckets[client] = TokenBucket(self.rate, self.burst, now)
+            if len(self.buckets) > self.max_clients:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(client)
+        return bucket.take(now)
+
+
+class AdmissionController:
+    """
+    Bounded in-flight limit with one FIFO queue per priority class. A freed
+    slot goes to the oldest queued interactive request first; batch requests
+    never hold more than `batch_share` of the slots, so interactive traffic
+    always has capacity of its own. Requests are shed when their class's
+    queue is full or when they wait longer than its queue timeout. Runs on
+    one event loop; limits apply per worker process.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+        batch_share: float = ADMISSION_BATCH_SHARE,
+        max_queue: Optional[Dict[str, int]] = None,
+        queue_timeout: Optional[Dict[str, float]] = None
+    ):
+        self.max_in_flight = max_in_flight
+        self.batch_limit = max(1, int(max_in_flight * batch_share))
+        self.max_queue = dict(max_queue or ADMISSION_MAX_QUEUE)
+        self.queue_timeout = dict(queue_timeout or ADMISSION_QUEUE_TIMEOUT)
+        self.in_flight = {priority: 0 for priority in PRIORITIES}
+        self.queues: Dict[str, Deque[asyncio.Future]] = {priority: deque() for priority in PRIORITIES}
+
+    def _has_slot(self, priority: str) -> bool:
+        if self.max_in_flight <= 0:
+            return True
+        if sum(self.in_flight.values()) >= self.max_in_flight:
+            return False
+        return priority != BATCH or self.in_flight[BATCH] < self.batch_limit
+
+    def _start(self, priority: str) -> None:
+        self.in_flight[priority] += 1
+        ADMISSION_IN_FLIGHT.set(priority, value=self.in_flight[priority])
+
+    def _dequeue(self, priority: str, waiter: asyncio.Future) -> None:
+        queue = self.queues[priority]
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        ADMISSION_QUEUE_DEPTH.set(priority, value=len(queue))
+
+    async def acquire(self, priority: str) -> float:
+        """Wait for an in-flight slot; returns the time waited or raises Shed."""
+        queue = self.queues[priority]
+        if not queue and self._has_slot(priority) and (priority == INTERACTIVE or not self.queues[INTERACTIVE]):
+            self._start(priority)
+            return 0.0
+        if len(queue) >= self.max_queue[priority]:
+            raise Shed("shed_queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(priority, value=len(queue))
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout[priority])
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self.release(priority)
+            else:
+                self._dequeue(priority, waiter)
+            if isinstance(exc, asyncio.TimeoutError):
+                raise Shed("shed_timeout") from None
+            raise
+        return time.perf_counter() - start
+
+    def release(self, priority: str) -> None:
+        self.in_flight[priority] -= 1
+        ADMISSION_IN_FLIGHT.set(priority, value=self.in_flight[priority])
+        for waiting in PRIORITIES:
+            queue = self.queues[waiting]
+            while queue and self._has_slot(waiting):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                # Hand the slot straight to the waiter so nothing can overtake it
+                self._start(waiting)
+                waiter.set_result(None)
+            ADMISSION_QUEUE_DEPTH.set(waiting, value=len(queue))
+
+
+rate_limiter = RateLimiter()
+controller = AdmissionController()
+
+
+def client_id(request: Request) -> str:
+    if ADMISSION_CLIENT_HEADER:
+        client = request.headers.get(ADMISSION_CLIENT_HEADER)
+        if client:
+            return client
+    return request.client.host if request.client else "unknown"
+
+
+def request_priority(request: Request, default: str) -> str:
+    """`X-Priority: batch` downgrades an interactive route; batch routes stay batch."""
+    if request.headers.get(PRIORITY_HEADER, "").strip().lower() == BATCH:
+        return BATCH
+    return default
+
+
+def admission(default_priority: str = INTERACTIVE) -> Callable[[Request], AsyncIterator[None]]:
+    """
+    Route dependency that rate-limits the client (429) and then waits for
+    an in-flight slot (503 when shed). The slot is held until the response
+    has been sent, so streamed exports count for their whole duration.
+    """
+
+    async def admit(request: Request) -> AsyncIterator[None]:
+        priority = request_priority(request, default_priority)
+        retry_after = rate_limiter.check(client_id(request))
+        if retry_after:
+            ADMISSION_DECISIONS.inc(priority, "rate_limited")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Rate limit exceeded",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+        try:
+            waited = await controller.acquire(priority)
+        except Shed as exc:
+            ADMISSION_DECISIONS.inc(priority, exc.reason)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is overloaded, retry later",
+                headers={"Retry-After": str(ADMISSION_RETRY_AFTER)}
+            )
+        ADMISSION_DECISIONS.inc(priority, "admitted")
+        ADMISSION_QUEUE_WAIT.observe(waited, priority)
+        try:
+            yield
+        finally:
+            controller.release(priority)
+
+    return admit
+
+
+admit_interactive = admission(INTERACTIVE)
+admit_batch = admission(BATCH)
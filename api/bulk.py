@@ -0,0 +1,221 @@
+import codecs
+import inspect
+import json
+import os
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+
+_SPACE = re.compile(r"\s*")
+_STRUCTURAL = re.compile(r'["\[\]{},]')
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+
+InsertResult = Tuple[int, List[Tuple[int, str]]]
+# Sync writers (pymongo) run in the threadpool; async writers are awaited
+InsertMany = Callable[[List[Dict[str, Any]]], Union[InsertResult, Awaitable[InsertResult]]]
+
+
+async def iter_records(
+    chunks: AsyncIterator[bytes]
+) -> AsyncIterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Incrementally parse an NDJSON or JSON array body.
+    Yields (record number, value, error) tuples; record numbers start at 1.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    mode = None
+    record = 0
+    finished = False
+    # Array parser state: "first" element, a "value" after a comma, or a "separator"
+    expect = "first"
+
+    async def _chunks():
+        async for chunk in chunks:
+            yield text_decoder.decode(chunk)
+        yield text_decoder.decode(b"", final=True)
+
+    async for text in _chunks():
+        if finished:
+            break
+        buffer += text
+
+        if mode is None:
+            stripped = buffer.lstrip()
+            if not stripped:
+                continue
+            if stripped[0] == "[":
+                mode = "array"
+                buffer = stripped[1:]
+            else:
+                mode = "ndjson"
+
+        if mode == "ndjson":
+            lines = buffer.split("\n")
+            buffer = lines.pop()
+            for line in lines:
+                record += 1
+                if not line.strip():
+                    continue
+                try:
+                    yield record, json.loads(line), None
+                except json.JSONDecodeError as e:
+                    yield record, None, f"Invalid JSON: {e.msg}"
+            continue
+
+        pos = 0
+        while True:
+            pos = _SPACE.match(buffer, pos).end()
+            if pos >= len(buffer):
+                break
+            char = buffer[pos]
+            if expect == "separator":
+                # Every element (valid or not) ends at a `,` or `]`
+                if char == "]":
+                    finished = True
+                    break
+                pos += 1
+                expect = "value"
+                continue
+            if char == "]" and expect == "first":
+                finished = True
+                break
+            if char in ",]":
+                # Empty element: `[,1]`, `[1,,2]` or `[1,]`
+                record += 1
+                yield record, None, "Invalid JSON: missing value"
+                expect = "separator"
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                error = "unexpected data after value"
+            except json.JSONDecodeError as e:
+                end, error = -1, e.msg
+            if end >= 0:
+                # Only accept a value once the `,` or `]` after it has arrived, so
+                # a number split across chunks is not read as two
+                after = _SPACE.match(buffer, end).end()
+                if after < len(buffer) and buffer[after] in ",]":
+                    record += 1
+                    yield record, value, None
+                    pos = after
+                    expect = "separator"
+                    continue
+            boundary = _element_end(buffer, pos)
+            if boundary < 0:
+                # Element is incomplete; wait for the next chunk
+                break
+            # The whole element is here and is not valid JSON: report it and move on
+            record += 1
+            yield record, None, f"Invalid JSON: {error}"
+            pos = boundary
+            expect = "separator"
+        buffer = buffer[pos:]
+
+    if mode == "ndjson" and buffer.strip():
+        record += 1
+        try:
+            yield record, json.loads(buffer), None
+        except json.JSONDecodeError as e:
+            yield record, None, f"Invalid JSON: {e.msg}"
+    elif mode == "array" and not finished:
+        yield record + 1, None, "Invalid JSON: unterminated array"
+
+
+def _element_end(buffer: str, pos: int) -> int:
+    """
+    Index of the top-level `,` or `]` that ends the array element starting
+    at `pos` (skipping strings and nested brackets), or -1 if it has not
+    been received yet.
+    """
+    depth = 0
+    while True:
+        match = _STRUCTURAL.search(buffer, pos)
+        if match is None:
+            return -1
+        char, pos = match.group(), match.end()
+        if char == '"':
+            tail = _STRING_TAIL.match(buffer, pos)
+            if tail is None:
+                return -1
+            pos = tail.end()
+        elif char in "[{":
+            depth += 1
+        elif depth == 0:
+            return match.start()
+        elif char in "]}":
+            depth -= 1
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single message."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in exc.errors()
+    )
+
+
+async def _write_batch(
+    insert: InsertMany,
+    batch: List[Tuple[int, Dict[str, Any]]]
+) -> Tuple[int, List[Dict[str, Any]]]:
+    documents = [doc for _, doc in batch]
+    if inspect.iscoroutinefunction(insert):
+        count, write_errors = await insert(documents)
+    else:
+        count, write_errors = await run_in_threadpool(insert, documents)
+    return count, [{"line": batch[index][0], "error": message} for index, message in write_errors]
+
+
+async def bulk_ingest(
+    chunks: AsyncIterator[bytes],
+    schema: Type[BaseModel],
+    prepare: Callable[[BaseModel], Dict[str, Any]],
+    insert: InsertMany,
+    batch_size: int = BULK_BATCH_SIZE
+) -> Dict[str, Any]:
+    """
+    Validate each record against `schema`, build the stored document with
+    `prepare`, and write the results in batches through `insert`, which
+    returns the inserted count and (batch index, message) write errors.
+    """
+    received = 0
+    inserted = 0
+    errors: List[Dict[str, Any]] = []
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+
+    async for record, value, error in iter_records(chunks):
+        received += 1
+        if error:
+            errors.append({"line": record, "error": error})
+            continue
+        try:
+            item = schema.model_validate(value)
+        except ValidationError as e:
+            errors.append({"line": record, "error": format_validation_error(e)})
+            continue
+
+        batch.append((record, prepare(item)))
+        if len(batch) >= batch_size:
+            count, write_errors = await _write_batch(insert, batch)
+            inserted += count
+            errors.extend(write_errors)
+            batch = []
+
+    if batch:
+        count, write_errors = await _write_batch(insert, batch)
+        inserted += count
+        errors.extend(write_errors)
+
+    errors.sort(key=lambda err: err["line"])
+    return {
+        "received": received,
+        "inserted": inserted,
+        "failed": len(errors),
+        "errors": errors
+    }
@@ -0,0 +1,245 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from dotenv import load_dotenv
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from api.database import reading_replica
+from api.metrics import Counter
+
+load_dotenv()
+
+# "memory" (in-process LRU), "redis" or "none"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+# Redis URL for CACHE_BACKEND=redis; "memory://" is a process-local stand-in
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+# Worker processes serving the API (also read by uvicorn and gunicorn). The
+# in-process backend only sees its own worker's invalidations, so it needs 1.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# Per-patient resources; a write to one only invalidates responses built from it
+PATIENT_RESOURCES = ("patient", "medical_history", "vital_signs", "lab_results", "diagnoses")
+
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Response cache lookups by route and result (hit, miss, coalesced)",
+    ("route", "result")
+)
+CACHE_INVALIDATIONS = Counter(
+    "response_cache_invalidations_total",
+    "Response cache invalidations by resource",
+    ("resource",)
+)
+
+
+class LRUBackend:
+    """
+    In-process LRU with per-entry TTL. Version counters are kept apart from
+    the entries so eviction can never roll a version back.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_versions(self, keys: Sequence[str]) -> List[int]:
+        return [self._versions.get(key, 0) for key in keys]
+
+    async def bump_version(self, key: str) -> int:
+        self._versions[key] = self._versions.get(key, 0) + 1
+        return self._versions[key]
+
+
+class RedisBackend:
+    """Shared cache across workers; entries expire via Redis TTLs."""
+
+    def __init__(self, url: str = CACHE_URL):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(key, value, ex=ttl)
+
+    async def get_versions(self, keys: Sequence[str]) -> List[int]:
+        return [int(value or 0) for value in await self.client.mget(keys)]
+
+    async def bump_version(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+CacheBackend = Union[LRUBackend, RedisBackend]
+
+
+def create_cache_backend(backend: str = CACHE_BACKEND, url: str = CACHE_URL) -> Optional[CacheBackend]:
+    if backend == "none":
+        return None
+    if backend == "redis" and not url.startswith("memory://"):
+        return RedisBackend(url)
+    if WEB_CONCURRENCY > 1:
+        raise RuntimeError(
+            f"CACHE_BACKEND={backend} keeps entries per process, so invalidations would not reach the other "
+            f"workers (WEB_CONCURRENCY={WEB_CONCURRENCY}); use CACHE_BACKEND=redis with a shared CACHE_URL, or none"
+        )
+    return LRUBackend()
+
+
+class ResponseCache:
+    """
+    Read-through cache of serialized JSON responses, keyed by route and the
+    current version of every patient resource the response depends on.
+    Writes bump a resource version, which orphans the old entries (they age
+    out via TTL/LRU). Concurrent misses for the same key share one load.
+    Versions are only shared between workers by the Redis backend.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = CACHE_TTL_SECONDS, prefix: str = "rc"):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self._inflight: Dict[str, "asyncio.Future[bytes]"] = {}
+
+    def _version_key(self, patient_id: int, resource: str) -> str:
+        return f"{self.prefix}:v:{resource}:{patient_id}"
+
+    async def _key(self, route: str, patient_id: int, resources: Sequence[str]) -> str:
+        versions = await self.backend.get_versions(
+            [self._version_key(patient_id, resource) for resource in resources]
+        ) if resources else []
+        return f"{self.prefix}:{route}:{patient_id}:" + ".".join(map(str, versions))
+
+    async def get_or_load(
+        self,
+        route: str,
+        patient_id: int,
+        resources: Sequence[str],
+        load: Callable[[], Awaitable[bytes]],
+        store: bool = True
+    ) -> Tuple[bytes, str]:
+        """
+        Return (body, result) where result is hit, miss or coalesced. With
+        store=False a miss is loaded (and shared with concurrent misses) but
+        not cached.
+        """
+        route_name = route.split(":", 1)[0]
+        key = await self._key(route, patient_id, resources)
+        cached = await self.backend.get(key)
+        if cached is not None:
+            CACHE_REQUESTS.inc(route_name, "hit")
+            return cached, "hit"
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            CACHE_REQUESTS.inc(route_name, "coalesced")
+            return await asyncio.shield(pending), "coalesced"
+
+        CACHE_REQUESTS.inc(route_name, "miss")
+        future: "asyncio.Future[bytes]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            body = await load()
+        except Exception as e:
+            # Waiters see the same error (e.g. a 404); mark it retrieved for the no-waiter case
+            future.set_exception(e)
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(body)
+        if store:
+            await self.backend.set(key, body, self.ttl)
+        return body, "miss"
+
+    async def invalidate(self, patient_id: int, resource: str) -> None:
+        CACHE_INVALIDATIONS.inc(resource)
+        await self.backend.bump_version(self._version_key(patient_id, resource))
+
+
+_backend = create_cache_backend()
+response_cache = ResponseCache(_backend) if _backend is not None else None
+
+
+async def cached_bytes(
+    route: str,
+    patient_id: int,
+    resources: Sequence[str],
+    load: Callable[[], Awaitable[bytes]]
+) -> Tuple[bytes, Optional[str]]:
+    """
+    Bytes from `load` through the response cache, e.g. an intermediate
+    result several responses are built from. Returns (body, result), with
+    result None when caching is off.
+    """
+    if response_cache is None:
+        return await load(), None
+    # A lagging replica could otherwise cache pre-write data under the new versions
+    return await response_cache.get_or_load(route, patient_id, resources, load, store=not reading_replica.get())
+
+
+async def cached_json(
+    route: str,
+    patient_id: int,
+    resources: Sequence[str],
+    load: Callable[[], Awaitable[Any]],
+    adapter: TypeAdapter,
+    etag: Optional[str] = None
+) -> Response:
+    """
+    Serve a per-patient GET through the response cache. `load` returns ORM
+    objects (or raises HTTPException); they are validated and serialized
+    with `adapter` once per miss. `etag`, when given, is sent as the ETag
+    and is part of the cache key: the ETag comes from the database while
+    version counters may lag a write made by another worker or a script,
+    so a body is only ever served with the ETag it was cached under.
+    """
+    headers = {"ETag": etag} if etag else {}
+
+    async def load_body() -> bytes:
+        data = await load()
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+    if etag:
+        route = f"{route}:{etag}"
+    body, result = await cached_bytes(route, patient_id, resources, load_body)
+    if result:
+        headers["X-Cache"] = result.upper()
+    return Response(body, media_type="application/json", headers=headers)
+
+
+async def invalidate_patient(patient_id: Optional[int], *resources: str) -> None:
+    """Invalidate cached responses built from `resources` of one patient."""
+    if response_cache is None or patient_id is None:
+        return
+    for resource in resources:
+        await response_cache.invalidate(patient_id, resource)
@@ -0,0 +1,216 @@
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from api.export import EXPORT_BATCH_SIZE
+from api.models.feature_packing import FeaturePacker
+from api.models.prediction_analytics import PREDICTION_LABEL_FIELD, PREDICTION_SCORE_FIELD
+
+# Parquet compression codec: snappy, zstd, gzip, lz4 or none
+EXPORT_PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")
+
+# Format -> (media type, file extension)
+COLUMNAR_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError("Columnar export needs pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+
+def _path(doc: Dict[str, Any], path: str) -> Any:
+    for key in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(key)
+    return doc
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def trim_float32(values: np.ndarray) -> np.ndarray:
+    """
+    Round widened float32 values to 7 significant digits, so 0.1 reads back
+    as 0.1 like FeaturePacker.unpack, without a per-value Python loop.
+    """
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        scale = 10.0 ** (6 - np.floor(np.log10(np.abs(values))))
+        trimmed = np.round(values * scale) / scale
+    return np.where(np.isfinite(trimmed), trimmed, values)
+
+
+def prediction_schema(feature_names: List[str]):
+    """Fixed columns plus one float64 column per feature, in feature_names.pkl order."""
+    pa = require_pyarrow()
+    return pa.schema(
+        [
+            pa.field("_id", pa.string()),
+            pa.field("patient_id", pa.int64()),
+            pa.field("model_name", pa.string()),
+            pa.field("model_version", pa.string()),
+            pa.field("timestamp", pa.timestamp("ms")),
+            pa.field("prediction_label", pa.int64()),
+            pa.field("prediction_score", pa.float64()),
+        ]
+        + [pa.field(name, pa.float64()) for name in feature_names],
+        metadata={"feature_names": "\n".join(feature_names)}
+    )
+
+
+class PredictionBatcher:
+    """
+    Turns prediction documents into Arrow record batches. Packed features
+    in the current feature order (whichever of them were ints) are decoded
+    for a whole batch at once with np.frombuffer; dict features (and older
+    packed schemas) are placed by name. Missing or non-numeric features
+    become nulls.
+    """
+
+    def __init__(self, packer: FeaturePacker):
+        self.packer = packer
+        self.schema_id, self.feature_names = packer.current_schema()
+        self.index = {name: i for i, name in enumerate(self.feature_names)}
+        self.schema = prediction_schema(self.feature_names)
+        # Schema ID -> whether its vectors are in the current feature order
+        self.current_order: Dict[str, bool] = {self.schema_id: True}
+
+    def in_current_order(self, schema_id: str) -> bool:
+        same = self.current_order.get(schema_id)
+        if same is None:
+            same = self.current_order[schema_id] = self.packer.schema_names(schema_id) == self.feature_names
+        return same
+
+    def features(self, docs: List[Dict[str, Any]]) -> np.ndarray:
+        matrix = np.full((len(docs), len(self.feature_names)), np.nan)
+        packed_rows: List[int] = []
+        packed: List[bytes] = []
+        for row, doc in enumerate(docs):
+            schema_id = doc.get("feature_schema")
+            if schema_id and doc.get("features_packed") is not None and self.in_current_order(schema_id):
+                packed_rows.append(row)
+                packed.append(bytes(doc["features_packed"]))
+                continue
+            features = self.packer.unpack(doc).get("features")
+            if not isinstance(features, dict):
+                continue
+            for name, value in features.items():
+                column = self.index.get(name)
+                if column is not None:
+                    value = _number(value)
+                    if value is not None:
+                        matrix[row, column] = value
+        if packed_rows:
+            vectors = np.frombuffer(b"".join(packed), dtype="<f4").reshape(len(packed_rows), -1)
+            matrix[packed_rows] = trim_float32(vectors.astype(np.float64))
+        return matrix
+
+    def batch(self, docs: List[Dict[str, Any]]):
+        pa = require_pyarrow()
+        matrix = self.features(docs)
+        columns = [
+            pa.array([str(doc["_id"]) for doc in docs], pa.string()),
+            pa.array([doc.get("patient_id") for doc in docs], pa.int64()),
+            pa.array([doc.get("model_name") for doc in docs], pa.string()),
+            pa.array([doc.get("model_version") for doc in docs], pa.string()),
+            pa.array([doc.get("timestamp") for doc in docs], pa.timestamp("ms")),
+            pa.array([_label(_path(doc, PREDICTION_LABEL_FIELD)) for doc in docs], pa.int64()),
+            pa.array([_number(_path(doc, PREDICTION_SCORE_FIELD)) for doc in docs], pa.float64()),
+        ]
+        # from_pandas maps NaN (missing feature) to null
+        columns += [pa.array(matrix[:, i], pa.float64(), from_pandas=True) for i in range(matrix.shape[1])]
+        return pa.RecordBatch.from_arrays(columns, schema=self.schema)
+
+    def batches(self, cursor: Iterable[Dict[str, Any]], rows: int = EXPORT_BATCH_SIZE) -> Iterator[Any]:
+        docs: List[Dict[str, Any]] = []
+        for doc in cursor:
+            docs.append(doc)
+            if len(docs) >= rows:
+                yield self.batch(docs)
+                docs = []
+        if docs:
+            yield self.batch(docs)
+
+
+def _label(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return int(value)
+    number = _number(value)
+    return int(number) if number is not None and number.is_integer() else None
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> Iterator[bytes]:
+        if self.chunks:
+            chunk = b"".join(self.chunks)
+            self.chunks = []
+            yield chunk
+
+
+def iter_columnar(
+    cursor: Iterable[Dict[str, Any]],
+    batcher: PredictionBatcher,
+    fmt: str = "arrow",
+    rows: int = EXPORT_BATCH_SIZE,
+    compression: str = EXPORT_PARQUET_COMPRESSION
+) -> Iterator[bytes]:
+    """
+    Stream predictions as an Arrow IPC stream or a Parquet file. Each batch
+    of `rows` documents becomes one record batch (Parquet row group) and is
+    flushed before the next is read, so memory stays bounded by `rows`.
+    """
+    pa = require_pyarrow()
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(
+            sink, batcher.schema, compression=None if compression == "none" else compression
+        )
+    else:
+        writer = pa.ipc.new_stream(sink, batcher.schema)
+    try:
+        for batch in batcher.batches(cursor, rows):
+            writer.write_table(pa.Table.from_batches([batch]))
+            yield from sink.drain()
+        writer.close()
+        yield from sink.drain()
+    finally:
+        close = getattr(cursor, "close", None)
+        if close:
+            close()
+
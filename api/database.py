@@ -1,23 +1,193 @@
-from sqlalchemy.orm import sessionmaker, Session
-from typing import Generator
+from fastapi import Request
+from http.cookies import SimpleCookie
+from starlette.datastructures import MutableHeaders
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from contextvars import ContextVar
+from typing import AsyncGenerator, List, Optional
+import asyncio
+import itertools
+import time
 
-from api.models.sql_models import engine
-from api.models.mongo_models import MongoDB
+from api.metrics import Counter
+from api.models.sql_models import (
+    READ_YOUR_WRITES_SECONDS,
+    REPLICA_LAG_CHECK_SECONDS,
+    REPLICA_MAX_LAG_SECONDS,
+    REPLICA_SELECTION,
+    engine,
+    async_engine,
+    replica_engines
+)
+from api.models.mongo_models import MongoDB, HistoryStore, create_history_store
 
-# Create session factory
+# Create session factories (sync for scripts, async for the API)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
 
+# Set on responses to writes; reads carrying it stay on the primary until it expires
+READ_YOUR_WRITES_COOKIE = "sql_primary_until"
 
-def get_db() -> Generator[Session, None, None]:
+SQL_READS = Counter("sql_reads_total", "SQL read sessions by target database", ("target",))
+
+# True while the current request reads from a replica; such reads may lag
+# a write, so the response cache serves them without storing them
+reading_replica: ContextVar[bool] = ContextVar("reading_replica", default=False)
+
+_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+async def measure_lag(replica: AsyncEngine) -> float:
+    """Replication lag in seconds; 0 for non-PostgreSQL replicas (e.g. SQLite copies)."""
+    async with replica.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            return 0.0
+        lag = (await conn.execute(_LAG_QUERY)).scalar()
+        return float(lag or 0.0)
+
+
+class ReplicaRouter:
     """
-    Dependency function to get database session.
-    Yields a database session and ensures it's closed after use.
+    Picks a read replica per session, round-robin or by fewest in-flight
+    sessions, skipping replicas lagging more than REPLICA_MAX_LAG_SECONDS.
+    Lag is re-measured at most every REPLICA_LAG_CHECK_SECONDS per replica;
+    a replica whose check fails is treated as lagging.
     """
-    db = SessionLocal()
+
+    def __init__(
+        self,
+        engines: List[AsyncEngine],
+        strategy: str = REPLICA_SELECTION,
+        max_lag: float = REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = REPLICA_LAG_CHECK_SECONDS
+    ):
+        self.engines = engines
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sessionmakers = [
+            async_sessionmaker(replica, autoflush=False, expire_on_commit=False)
+            for replica in engines
+        ]
+        self.in_flight = [0] * len(engines)
+        self.lag = [0.0] * len(engines)
+        self._checked_at = [float("-inf")] * len(engines)
+        self._turn = itertools.count()
+
+    async def replica_lag(self, index: int) -> float:
+        now = time.monotonic()
+        if now - self._checked_at[index] >= self.check_interval:
+            # Claim the check before awaiting so concurrent requests don't pile on
+            self._checked_at[index] = now
+            try:
+                self.lag[index] = await asyncio.wait_for(
+                    measure_lag(self.engines[index]), timeout=self.check_interval
+                )
+            except Exception:
+                self.lag[index] = float("inf")
+        return self.lag[index]
+
+    async def choose(self) -> Optional[int]:
+        """Index of the replica to read from, or None to use the primary."""
+        healthy = [
+            index for index in range(len(self.engines))
+            if await self.replica_lag(index) <= self.max_lag
+        ]
+        if not healthy:
+            return None
+        if self.strategy == "least_connections":
+            return min(healthy, key=lambda index: self.in_flight[index])
+        return healthy[next(self._turn) % len(healthy)]
+
+
+replica_router = ReplicaRouter(replica_engines) if replica_engines else None
+
+
+def read_your_writes_expiry() -> str:
+    """Cookie value marking a client as having just written to the primary."""
+    return f"{time.time() + READ_YOUR_WRITES_SECONDS:.3f}"
+
+
+def wrote_recently(request: Request) -> bool:
     try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware setting READ_YOUR_WRITES_COOKIE on successful
+    writes, so the client's next reads stay on the primary. It only edits
+    the response headers, and bodies (including streams) pass through
+    untouched. Register it only when replicas are configured.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = SimpleCookie()
+                cookie[READ_YOUR_WRITES_COOKIE] = read_your_writes_expiry()
+                cookie[READ_YOUR_WRITES_COOKIE]["path"] = "/"
+                cookie[READ_YOUR_WRITES_COOKIE]["httponly"] = True
+                cookie[READ_YOUR_WRITES_COOKIE]["samesite"] = "lax"
+                MutableHeaders(scope=message).append("set-cookie", cookie.output(header="").strip())
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
+
+
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get database session.
+    Yields an async database session and ensures it's closed after use.
+    """
+    async with AsyncSessionLocal() as db:
         yield db
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get a read-only database session.
+    Uses a read replica when configured (READ_REPLICA_URLS), falling back to
+    the primary when replicas lag or the client wrote recently.
+    """
+    index = None
+    if replica_router is not None and not wrote_recently(request):
+        index = await replica_router.choose()
+
+    if index is None:
+        SQL_READS.inc("primary")
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+
+    SQL_READS.inc(f"replica{index}")
+    replica_router.in_flight[index] += 1
+    token = reading_replica.set(True)
+    try:
+        async with replica_router.sessionmakers[index]() as db:
+            yield db
     finally:
-        db.close()
+        reading_replica.reset(token)
+        replica_router.in_flight[index] -= 1
 
 
 def get_mongo_db() -> MongoDB:
@@ -25,3 +195,11 @@ def get_mongo_db() -> MongoDB:
     Dependency function to get MongoDB instance.
     """
     return MongoDB()
+
+
+def get_history_store() -> HistoryStore:
+    """
+    Dependency function to get the patient history store for the configured
+    storage mode (PATIENT_HISTORY_STORAGE).
+    """
+    return create_history_store(MongoDB())
@@ -1,17 +1,18 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
-from typing import Type, TypeVar, Optional
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Type, TypeVar, Optional
 
 ModelType = TypeVar("ModelType")
 
 
-def get_object_or_404(
-    db: Session,
+async def get_object_or_404(
+    db: AsyncSession,
     model: Type[ModelType],
     object_id: int,
     error_message: str = "Object not found"
 ) -> ModelType:
-    obj = db.query(model).filter(model.id == object_id).first()
+    obj = await db.get(model, object_id)
     if not obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -19,3 +20,29 @@ def get_object_or_404(
         )
     return obj
 
+
+def parse_fields(
+    fields: Optional[str],
+    model: Type[BaseModel]
+) -> Optional[Dict[str, int]]:
+    """
+    Turn a comma-separated `fields=` query value into a Mongo projection.
+    Top-level names must exist on `model`; dotted sub-paths such as
+    `features.Age` are allowed. `_id` is always returned.
+    """
+    if not fields:
+        return None
+
+    allowed = {name for name in model.model_fields if name != "id"}
+    projection = {}
+    for field in fields.split(","):
+        field = field.strip()
+        if not field or field in ("id", "_id"):
+            continue
+        if field.split(".", 1)[0] not in allowed:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field: {field}"
+            )
+        projection[field] = 1
+    return projection or {"_id": 1}
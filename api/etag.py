@@ -0,0 +1,56 @@
+import hashlib
+from typing import Any, Optional, Sequence
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.sql_models import Patient
+
+
+def weak_etag(*parts: Any) -> str:
+    digest = hashlib.sha1("|".join(map(str, parts)).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Weak comparison of `etag` against the request's If-None-Match header."""
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+async def patient_etag(
+    db: AsyncSession,
+    patient_id: int,
+    models: Sequence[Any] = (),
+    extra: Sequence[Any] = ()
+) -> Optional[str]:
+    """
+    ETag for a patient and, optionally, its child collections, from the
+    patient's updated_at plus count and max(updated_at) of each model, in a
+    single query. Returns None if the patient does not exist.
+    """
+    columns = [Patient.updated_at]
+    for model in models:
+        owned = model.patient_id == patient_id
+        columns.append(select(func.count()).select_from(model).where(owned).scalar_subquery())
+        columns.append(select(func.max(model.updated_at)).where(owned).scalar_subquery())
+    row = (await db.execute(select(*columns).where(Patient.patient_id == patient_id))).first()
+    if row is None:
+        return None
+    return weak_etag(patient_id, *row, *extra)
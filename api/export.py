@@ -0,0 +1,52 @@
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from bson import ObjectId
+from pymongo.cursor import Cursor
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+EXPORT_CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_BYTES", str(64 * 1024)))
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def json_default(value: Any) -> Any:
+    """JSON encoder fallback for BSON/driver types."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def iter_ndjson(
+    cursor: Cursor,
+    chunk_bytes: int = EXPORT_CHUNK_BYTES,
+    transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None
+) -> Iterator[bytes]:
+    """
+    Serialize documents from a cursor as NDJSON while it is being iterated.
+    Lines are coalesced into chunks of roughly `chunk_bytes` so that only one
+    driver batch and one output chunk are held in memory at a time.
+    `transform` is applied to each document before it is encoded.
+    """
+    encoder = json.JSONEncoder(default=json_default, separators=(",", ":"))
+    buffer = []
+    size = 0
+    try:
+        for doc in cursor:
+            if transform:
+                doc = transform(doc)
+            line = (encoder.encode(doc) + "\n").encode("utf-8")
+            buffer.append(line)
+            size += len(line)
+            if size >= chunk_bytes:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield b"".join(buffer)
+    finally:
+        cursor.close()
@@ -1,22 +1,40 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from contextlib import asynccontextmanager
 
+from api.database import ReadYourWritesMiddleware, replica_router
+from api.metrics import CONTENT_TYPE, render_metrics
+from api.models.mongo_models import MongoDB
+from api.request_metrics import REQUEST_METRICS, RequestMetricsMiddleware
+from api.serialization import FAST_JSON, FastJSONResponse
+from api.warmup import WARMUP, warm_up
+
 from api.routers import (
     patients,
     medical_history,
     vital_signs,
     lab_results,
-    diagnoses
+    diagnoses,
+    egfr_analytics
+)
+from api.routers import (
+    patient_history_mongo,
+    predictions_mongo,
+    prediction_analytics_mongo,
+    prediction_tiering_mongo
 )
-from api.routers import patient_history_mongo, predictions_mongo
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup: each worker process opens its own MongoDB client
+    MongoDB.connect()
+    # Open pools and exercise the hot paths before the server starts accepting requests
+    if WARMUP:
+        await warm_up(app)
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    MongoDB.close()
 
 
 # Create FastAPI application
@@ -24,7 +42,8 @@ app = FastAPI(
     title="CKD Prediction API",
     description="API for Chronic Kidney Disease prediction and patient management",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if FAST_JSON else JSONResponse
 )
 
 # Configure CORS
@@ -36,16 +55,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Keep a client's reads on the primary for a short while after it writes
+if replica_router is not None:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+
+# Per-route request metrics; added last so it wraps the other middleware too
+if REQUEST_METRICS:
+    app.add_middleware(RequestMetricsMiddleware)
+
+
 # Include routers (PostgreSQL/SQL)
 app.include_router(patients.router, prefix="/api/v1")
 app.include_router(medical_history.router, prefix="/api/v1")
 app.include_router(vital_signs.router, prefix="/api/v1")
 app.include_router(lab_results.router, prefix="/api/v1")
 app.include_router(diagnoses.router, prefix="/api/v1")
+app.include_router(egfr_analytics.router, prefix="/api/v1")
 
 # Include routers (MongoDB)
 app.include_router(patient_history_mongo.router, prefix="/api/v1/mongo")
 app.include_router(predictions_mongo.router, prefix="/api/v1/mongo")
+app.include_router(prediction_analytics_mongo.router, prefix="/api/v1/mongo")
+app.include_router(prediction_tiering_mongo.router, prefix="/api/v1/mongo")
 
 
 # Root endpoint
@@ -65,6 +97,23 @@ async def health_check():
     return {"status": "healthy"}
 
 
+# Readiness endpoint: failed warm-up steps are retried on each check
+@app.get("/ready")
+async def readiness_check():
+    status = await warm_up(app)
+    failed = {step: error for step, error in status.items() if error}
+    return JSONResponse(
+        status_code=503 if failed else 200,
+        content={"status": "not ready" if failed else "ready", "failed": failed}
+    )
+
+
+# Metrics endpoint (Prometheus text format)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
@@ -0,0 +1,249 @@
+import io
+import os
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+from sqlalchemy import Integer, cast, literal, null, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.models.sql_models import Diagnosis, LabResults
+
+# KDIGO: a sustained eGFR decline faster than this (mL/min/1.73m² per year) is rapid progression
+EGFR_RAPID_DECLINE = float(os.getenv("EGFR_RAPID_DECLINE", "5.0"))
+# Minimum eGFR readings and observed span before a patient can be flagged
+EGFR_MIN_READINGS = int(os.getenv("EGFR_MIN_READINGS", "3"))
+EGFR_MIN_SPAN_DAYS = int(os.getenv("EGFR_MIN_SPAN_DAYS", "90"))
+
+# Lower eGFR bound of CKD stages 1-4; anything below the last bound is stage 5
+STAGE_BOUNDS = np.array([90.0, 60.0, 30.0, 15.0])
+# Diagnosis.ckd_stage ranges 0-5
+STAGES = 6
+DAYS_PER_YEAR = 365.25
+
+
+class EgfrSeries(NamedTuple):
+    """Readings of many patients, sorted by (patient_id, date, source, row id)."""
+    patient_id: np.ndarray
+    days: np.ndarray
+    egfr: np.ndarray
+    stage: np.ndarray
+
+
+def series_query(patient_id: Optional[int] = None):
+    """
+    eGFR readings from lab results and diagnoses in one statement. Lab rows
+    carry no stage; diagnosis rows carry the recorded ckd_stage, if any.
+    Readings on the same date are ordered labs first, then by row id, so
+    first/last values and stage transitions do not depend on the plan.
+    """
+    labs = select(
+        LabResults.patient_id.label("patient_id"),
+        LabResults.test_date.label("date"),
+        LabResults.egfr.label("egfr"),
+        cast(null(), Integer).label("stage"),
+        literal(0).label("source"),
+        LabResults.lab_id.label("row_id")
+    ).where(LabResults.egfr.isnot(None), LabResults.test_date.isnot(None))
+    diagnoses = select(
+        Diagnosis.patient_id.label("patient_id"),
+        Diagnosis.diagnosis_date.label("date"),
+        Diagnosis.gfr_value.label("egfr"),
+        Diagnosis.ckd_stage.label("stage"),
+        literal(1).label("source"),
+        Diagnosis.diagnosis_id.label("row_id")
+    ).where(
+        Diagnosis.diagnosis_date.isnot(None),
+        Diagnosis.gfr_value.isnot(None) | Diagnosis.ckd_stage.isnot(None)
+    )
+    if patient_id is not None:
+        labs = labs.where(LabResults.patient_id == patient_id)
+        diagnoses = diagnoses.where(Diagnosis.patient_id == patient_id)
+    readings = union_all(labs, diagnoses).subquery()
+    return (
+        select(readings.c.patient_id, readings.c.date, readings.c.egfr, readings.c.stage)
+        .where(readings.c.patient_id.isnot(None))
+        .order_by(readings.c.patient_id, readings.c.date, readings.c.source, readings.c.row_id)
+    )
+
+
+def to_series(rows: List[Any]) -> EgfrSeries:
+    """Column arrays from (patient_id, date, egfr, stage) rows."""
+    if not rows:
+        empty = np.empty(0)
+        return EgfrSeries(empty.astype(np.int64), empty, empty, empty.astype(np.int64))
+    patient_ids, dates, egfr, stages = zip(*rows)
+    days = np.array(dates, dtype="datetime64[s]").astype(np.int64) / 86400.0
+    egfr = np.array(egfr, dtype=float)
+    stage = np.array([-1 if s is None else s for s in stages], dtype=np.int64)
+    return EgfrSeries(np.array(patient_ids, dtype=np.int64), days, egfr, stage)
+
+
+async def load_series(db: AsyncSession, patient_id: Optional[int] = None) -> EgfrSeries:
+    result = await db.execute(series_query(patient_id))
+    return to_series(result.all())
+
+
+def egfr_stage(egfr: np.ndarray) -> np.ndarray:
+    """CKD stage 1-5 from eGFR (stage 3a/3b are reported as 3)."""
+    return np.searchsorted(-STAGE_BOUNDS, -egfr, side="left") + 1
+
+
+def _group_sum(groups: np.ndarray, weights: np.ndarray, count: int) -> np.ndarray:
+    return np.bincount(groups, weights=weights, minlength=count)
+
+
+def compute_trends(series: EgfrSeries) -> Dict[str, np.ndarray]:
+    """
+    Per-patient eGFR trend and stage progression, computed group-wise over
+    the whole series with bincount reductions (no per-patient loop):
+
+    - slope_per_year: least-squares eGFR slope, NaN with fewer than 2 readings
+    - stage transitions and progressions (moves to a worse stage)
+    - days spent in each stage between consecutive readings
+    - rapid_decliner: slope at or below -EGFR_RAPID_DECLINE over enough
+      readings (EGFR_MIN_READINGS) and time (EGFR_MIN_SPAN_DAYS)
+
+    Readings use the recorded stage when a diagnosis gives one and the
+    stage implied by eGFR otherwise.
+    """
+    patient_ids, groups = np.unique(series.patient_id, return_inverse=True)
+    count = len(patient_ids)
+    groups = groups.reshape(-1)
+
+    measured = np.isfinite(series.egfr)
+    weight = measured.astype(float)
+    egfr = np.where(measured, series.egfr, 0.0)
+    years = series.days / DAYS_PER_YEAR
+
+    # Least squares on per-patient centred time keeps the sums well conditioned
+    readings = _group_sum(groups, weight, count)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_years = _group_sum(groups, weight * years, count) / readings
+        mean_egfr = _group_sum(groups, weight * egfr, count) / readings
+        centred = np.where(measured, years - mean_years[groups], 0.0)
+        sxx = _group_sum(groups, centred * centred, count)
+        sxy = _group_sum(groups, centred * (egfr - mean_egfr[groups]), count)
+        slope = np.where((readings >= 2) & (sxx > 0), sxy / sxx, np.nan)
+
+    # First/last measured reading per patient (the series is sorted by date)
+    measured_index = np.flatnonzero(measured)
+    measured_groups = groups[measured_index]
+    first = np.full(count, -1)
+    last = np.full(count, -1)
+    first[measured_groups[::-1]] = measured_index[::-1]
+    last[measured_groups] = measured_index
+    has_egfr = first >= 0
+    first_egfr = np.where(has_egfr, series.egfr[first], np.nan)
+    last_egfr = np.where(has_egfr, series.egfr[last], np.nan)
+    span_days = np.where(has_egfr, series.days[last] - series.days[first], 0.0)
+
+    stage = np.where(
+        series.stage >= 0, series.stage, egfr_stage(np.where(measured, series.egfr, np.inf))
+    )
+    same_patient = groups[1:] == groups[:-1]
+    changed = same_patient & (stage[1:] != stage[:-1])
+    worse = changed & (stage[1:] > stage[:-1])
+    transitions = np.bincount(groups[1:][changed], minlength=count)
+    progressions = np.bincount(groups[1:][worse], minlength=count)
+
+    # Each reading's stage holds until the patient's next reading
+    held = np.zeros(len(groups))
+    held[:-1] = np.where(same_patient, np.diff(series.days), 0.0)
+    days_in_stage = _group_sum(groups * STAGES + stage, held, count * STAGES).reshape(count, STAGES)
+
+    last_row = np.full(count, -1)
+    last_row[groups] = np.arange(len(groups))
+    current_stage = stage[last_row] if count else np.empty(0, dtype=np.int64)
+
+    with np.errstate(invalid="ignore"):
+        rapid = (
+            (slope <= -EGFR_RAPID_DECLINE)
+            & (readings >= EGFR_MIN_READINGS)
+            & (span_days >= EGFR_MIN_SPAN_DAYS)
+        )
+
+    return {
+        "patient_id": patient_ids,
+        "readings": readings.astype(np.int64),
+        "first_egfr": first_egfr,
+        "last_egfr": last_egfr,
+        "span_days": span_days,
+        "slope_per_year": slope,
+        "current_stage": current_stage,
+        "stage_transitions": transitions,
+        "stage_progressions": progressions,
+        "days_in_stage": days_in_stage,
+        "rapid_decliner": rapid,
+    }
+
+
+def dump_trends(trends: Dict[str, np.ndarray]) -> bytes:
+    """Serialize compute_trends output (numeric arrays only) for the response cache."""
+    buffer = io.BytesIO()
+    np.savez(buffer, **trends)
+    return buffer.getvalue()
+
+
+def load_trends(body: bytes) -> Dict[str, np.ndarray]:
+    with np.load(io.BytesIO(body), allow_pickle=False) as arrays:
+        return {name: arrays[name] for name in arrays.files}
+
+
+def _value(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 3)
+
+
+def trend_rows(trends: Dict[str, np.ndarray], order: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+    """Response rows for the patients at `order` (all, by patient_id, by default)."""
+    if order is None:
+        order = np.arange(len(trends["patient_id"]))
+    rows = []
+    for i in order:
+        days = trends["days_in_stage"][i]
+        rows.append({
+            "patient_id": int(trends["patient_id"][i]),
+            "readings": int(trends["readings"][i]),
+            "first_egfr": _value(trends["first_egfr"][i]),
+            "last_egfr": _value(trends["last_egfr"][i]),
+            "span_days": round(float(trends["span_days"][i]), 1),
+            "slope_per_year": _value(trends["slope_per_year"][i]),
+            "current_stage": int(trends["current_stage"][i]),
+            "stage_transitions": int(trends["stage_transitions"][i]),
+            "stage_progressions": int(trends["stage_progressions"][i]),
+            "days_in_stage": {str(s): round(float(days[s]), 1) for s in np.flatnonzero(days)},
+            "rapid_decliner": bool(trends["rapid_decliner"][i]),
+        })
+    return rows
+
+
+def cohort_report(
+    trends: Dict[str, np.ndarray],
+    min_readings: int = 1,
+    stage: Optional[int] = None,
+    rapid_only: bool = False,
+    skip: int = 0,
+    limit: int = 100
+) -> Dict[str, Any]:
+    """
+    Cohort summary plus one page of patients, steepest decline first
+    (patients without a slope last).
+    """
+    selected = trends["readings"] >= min_readings
+    if stage is not None:
+        selected &= trends["current_stage"] == stage
+    if rapid_only:
+        selected &= trends["rapid_decliner"]
+
+    index = np.flatnonzero(selected)
+    slopes = trends["slope_per_year"][index]
+    order = index[np.argsort(slopes, kind="stable")]
+    stage_counts = np.bincount(trends["current_stage"][index], minlength=STAGES)
+    has_slope = np.isfinite(slopes)
+
+    return {
+        "patients": int(len(index)),
+        "rapid_decliners": int(trends["rapid_decliner"][index].sum()),
+        "median_slope_per_year": _value(np.median(slopes[has_slope])) if has_slope.any() else None,
+        "stage_counts": {str(s): int(n) for s, n in enumerate(stage_counts) if n},
+        "results": trend_rows(trends, order[skip:skip + limit]),
+    }
@@ -0,0 +1,162 @@
+from bson import Binary
+from typing import Dict, Any, FrozenSet, List, Optional, Set, Tuple
+import hashlib
+import os
+import struct
+from numbers import Integral, Real
+
+from api.models.mongo_models import MongoDB
+
+# "dict" stores prediction features as a name -> value document; "packed"
+# stores them as a little-endian float32 vector plus a feature-schema ID.
+PREDICTION_FEATURE_STORAGE = os.getenv("PREDICTION_FEATURE_STORAGE", "dict")
+FEATURE_NAMES_PATH = os.getenv("FEATURE_NAMES_PATH", "ml/models/feature_names.pkl")
+
+PACKED_FIELDS = ("features_packed", "feature_schema")
+
+# Largest integer magnitude float32 holds exactly; larger ints are stored as a dict
+FLOAT32_EXACT_INT = 2 ** 24
+
+
+def schema_id_for(names: List[str], integer: FrozenSet[str] = frozenset()) -> str:
+    """
+    Schema ID from the feature order and the names stored as integers.
+    All-float schemas hash the names only, so their IDs predate the flags.
+    """
+    key = "\n".join(names)
+    if integer:
+        key += "\n#integer\n" + "\n".join(name for name in names if name in integer)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def packed_projection(
+    projection: Optional[Dict[str, int]]
+) -> Tuple[Optional[Dict[str, int]], Optional[Set[str]]]:
+    """
+    Extend a `fields=` projection so packed features are fetched whenever
+    `features` (or a `features.<name>` sub-path) is requested. Also returns
+    the requested feature names, or None when all features are wanted.
+    """
+    if not projection:
+        return projection, None
+
+    feature_keys: Optional[Set[str]] = set()
+    for key in projection:
+        if key == "features":
+            feature_keys = None
+            break
+        if key.startswith("features."):
+            feature_keys.add(key.split(".", 1)[1])
+    else:
+        if not feature_keys:
+            return projection, None
+
+    projection = dict(projection)
+    for field in PACKED_FIELDS:
+        projection[field] = 1
+    return projection, feature_keys
+
+
+class FeaturePacker:
+    """
+    Encodes prediction feature dicts as packed float32 vectors in the order
+    fixed by feature_names.pkl, and decodes them back on read. Schemas are
+    registered in `feature_schemas` so older vectors stay decodable after
+    the model's feature list changes. A schema also lists the features that
+    were ints when packed, so they decode as ints rather than floats.
+    """
+
+    # Schema ID -> (feature names, names stored as integers)
+    _schemas: Dict[str, Tuple[List[str], FrozenSet[str]]] = {}
+    _current: Optional[Tuple[str, List[str]]] = None
+
+    def __init__(self, mongo_db: MongoDB, storage: str = PREDICTION_FEATURE_STORAGE):
+        self.collection = mongo_db.feature_schemas
+        self.storage = storage
+
+    def current_schema(self) -> Tuple[str, List[str]]:
+        if FeaturePacker._current is None:
+            import joblib
+
+            names = list(joblib.load(FEATURE_NAMES_PATH))
+            FeaturePacker._current = (self.register(names), names)
+        return FeaturePacker._current
+
+    def register(self, names: List[str], integer: FrozenSet[str] = frozenset()) -> str:
+        schema_id = schema_id_for(names, integer)
+        if schema_id not in FeaturePacker._schemas:
+            schema = {"names": names}
+            if integer:
+                schema["integer"] = [name for name in names if name in integer]
+            self.collection.update_one({"_id": schema_id}, {"$setOnInsert": schema}, upsert=True)
+            FeaturePacker._schemas[schema_id] = (names, integer)
+        return schema_id
+
+    def schema(self, schema_id: str) -> Tuple[List[str], FrozenSet[str]]:
+        cached = FeaturePacker._schemas.get(schema_id)
+        if cached is None:
+            schema = self.collection.find_one({"_id": schema_id})
+            if not schema:
+                raise ValueError(f"Unknown feature schema: {schema_id}")
+            cached = FeaturePacker._schemas[schema_id] = (schema["names"], frozenset(schema.get("integer", ())))
+        return cached
+
+    def schema_names(self, schema_id: str) -> List[str]:
+        return self.schema(schema_id)[0]
+
+    def pack(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace `features` with a packed vector when packed storage is enabled
+        and the features match the current schema exactly; otherwise the
+        document is left as a plain dict. Floats keep float32 precision
+        (about 7 significant digits); ints beyond float32's exact range
+        keep the document unpacked.
+        """
+        features = doc.get("features")
+        if self.storage != "packed" or not isinstance(features, dict):
+            return doc
+
+        schema_id, names = self.current_schema()
+        if len(features) != len(names):
+            return doc
+        try:
+            values = [features[name] for name in names]
+        except KeyError:
+            return doc
+        if not all(isinstance(value, Real) for value in values):
+            return doc
+        integer = frozenset(name for name, value in zip(names, values) if isinstance(value, Integral))
+        if any(abs(features[name]) > FLOAT32_EXACT_INT for name in integer):
+            return doc
+
+        del doc["features"]
+        doc["features_packed"] = Binary(struct.pack(f"<{len(values)}f", *values))
+        doc["feature_schema"] = self.register(names, integer) if integer else schema_id
+        return doc
+
+    def unpack(self, doc: Dict[str, Any], only: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Restore `features` as a dict, limited to `only` names when given."""
+        packed = doc.pop("features_packed", None)
+        schema_id = doc.pop("feature_schema", None)
+        if packed is None or schema_id is None:
+            return doc
+
+        names, integer = self.schema(schema_id)
+        values = struct.unpack(f"<{len(names)}f", packed)
+        # Trim float32 noise so 27.5 stays 27.5 and 0.1 reads back as 0.1
+        doc["features"] = {
+            name: int(value) if name in integer else float(f"{value:.7g}")
+            for name, value in zip(names, values)
+            if only is None or name in only
+        }
+        return doc
+
+    def update_fields(self, update_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Split an update into $set and $unset parts, packing new features."""
+        if "features" not in update_data:
+            return update_data, {}
+
+        update_data = self.pack(dict(update_data))
+        if "features" in update_data:
+            return update_data, {field: "" for field in PACKED_FIELDS}
+        return update_data, {"features": ""}
@@ -1,35 +1,434 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ASCENDING, DESCENDING, ReturnDocument, UpdateOne
 from pymongo.collection import Collection
 from pymongo.database import Database
-from typing import Dict, Any, List, Optional
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 import os
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
+from api.models.mongo_monitoring import PoolMetricsListener, CommandMetricsListener
+
 load_dotenv()
 
+# "document" stores one document per history entry; "bucketed" groups a
+# patient's entries into time-bounded bucket documents.
+PATIENT_HISTORY_STORAGE = os.getenv("PATIENT_HISTORY_STORAGE", "document")
+HISTORY_BUCKET_HOURS = int(os.getenv("HISTORY_BUCKET_HOURS", "24"))
+HISTORY_BUCKET_MAX_ENTRIES = int(os.getenv("HISTORY_BUCKET_MAX_ENTRIES", "500"))
+
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = os.getenv("MONGO_MAX_IDLE_TIME_MS")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def client_options() -> Dict[str, Any]:
+    """MongoClient pool, compression and monitoring options from the environment."""
+    options: Dict[str, Any] = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "event_listeners": [PoolMetricsListener(), CommandMetricsListener()]
+    }
+    if MONGO_MAX_IDLE_TIME_MS:
+        options["maxIdleTimeMS"] = int(MONGO_MAX_IDLE_TIME_MS)
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = int(MONGO_WAIT_QUEUE_TIMEOUT_MS)
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+
 class MongoDB:
+    """
+    Process-wide MongoDB handle. The app opens the client in its lifespan via
+    connect() and closes it on shutdown; scripts that call MongoDB() directly
+    get a client on first use. A client inherited across fork() is never
+    reused: the child opens its own.
+    """
+
     _instance = None
-    
+    _pid = None
+
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(MongoDB, cls).__new__(cls)
-            mongo_uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
-            cls._instance.client = MongoClient(mongo_uri)
-            cls._instance.db = cls._instance.client.get_database("ckd_database")
+        if cls._instance is None or cls._pid != os.getpid():
+            cls.connect()
         return cls._instance
 
+    @classmethod
+    def connect(cls) -> "MongoDB":
+        if cls._instance is not None and cls._pid == os.getpid():
+            return cls._instance
+        instance = super(MongoDB, cls).__new__(cls)
+        instance.client = MongoClient(MONGODB_URI, **client_options())
+        instance.db = instance.client.get_database("ckd_database")
+        cls._instance = instance
+        cls._pid = os.getpid()
+        return instance
+
+    @classmethod
+    def close(cls) -> None:
+        if cls._instance is not None and cls._pid == os.getpid():
+            cls._instance.client.close()
+        cls._instance = None
+        cls._pid = None
+
     @property
     def patient_history(self) -> Collection:
         return self.db.patient_history
     
+    @property
+    def patient_history_buckets(self) -> Collection:
+        return self.db.patient_history_buckets
+
     @property
     def predictions(self) -> Collection:
         return self.db.predictions
 
+    @property
+    def predictions_archive(self) -> Collection:
+        return self.db.predictions_archive
+
+    @property
+    def feature_schemas(self) -> Collection:
+        return self.db.feature_schemas
+
+    @property
+    def prediction_daily_summary(self) -> Collection:
+        return self.db.prediction_daily_summary
+
+    @property
+    def analytics_state(self) -> Collection:
+        return self.db.analytics_state
+
+
+def insert_documents(
+    collection: Collection,
+    documents: List[Dict[str, Any]]
+) -> Tuple[int, List[Tuple[int, str]]]:
+    """
+    Unordered insert_many that reports failures instead of raising.
+    Returns the inserted count and (index, message) pairs for failed documents.
+    """
+    try:
+        result = collection.insert_many(documents, ordered=False)
+        return len(result.inserted_ids), []
+    except BulkWriteError as e:
+        errors = [
+            (err["index"], err.get("errmsg", "Write error"))
+            for err in e.details.get("writeErrors", [])
+        ]
+        return e.details.get("nInserted", 0), errors
+
+
+class DocumentHistoryStore:
+    """One document per history entry in `patient_history`."""
+
+    def __init__(self, mongo_db: MongoDB):
+        self.collection = mongo_db.patient_history
+
+    def insert(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        result = self.collection.insert_one(entry)
+        return self.collection.find_one({"_id": result.inserted_id})
+
+    def insert_many(self, entries: List[Dict[str, Any]]) -> Tuple[int, List[Tuple[int, str]]]:
+        return insert_documents(self.collection, entries)
+
+    def find(
+        self,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        cursor = self.collection.find(query, projection).skip(skip).limit(limit).sort("timestamp", -1)
+        return list(cursor)
+
+    def iter(
+        self,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None,
+        batch_size: int = 1000
+    ) -> Iterable[Dict[str, Any]]:
+        return self.collection.find(query, projection, batch_size=batch_size).sort("_id", 1)
+
+    def get(self, entry_id: ObjectId, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        return self.collection.find_one({"_id": entry_id}, projection)
+
+    def update(self, entry_id: ObjectId, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        result = self.collection.update_one({"_id": entry_id}, {"$set": update_data})
+        if result.matched_count == 0:
+            return None
+        return self.collection.find_one({"_id": entry_id})
+
+    def delete(self, entry_id: ObjectId) -> bool:
+        return self.collection.delete_one({"_id": entry_id}).deleted_count > 0
+
+
+class BucketedHistoryStore:
+    """
+    Groups each patient's entries into time-bounded documents in
+    `patient_history_buckets`:
+
+        {patient_id, bucket_start, count, min_timestamp, max_timestamp,
+         entries: [{_id, entry_type, data, timestamp, metadata}, ...]}
+
+    Entries keep their own ObjectId, so reads and writes by entry ID and the
+    flattened documents returned match the one-document-per-entry layout.
+    """
+
+    _indexes_ready = False
+
+    def __init__(
+        self,
+        mongo_db: MongoDB,
+        bucket_hours: int = HISTORY_BUCKET_HOURS,
+        max_entries: int = HISTORY_BUCKET_MAX_ENTRIES
+    ):
+        self.collection = mongo_db.patient_history_buckets
+        self.bucket_seconds = bucket_hours * 3600
+        self.max_entries = max_entries
+        if not BucketedHistoryStore._indexes_ready:
+            self.ensure_indexes()
+
+    def ensure_indexes(self) -> None:
+        self.collection.create_index([("patient_id", ASCENDING), ("bucket_start", DESCENDING)])
+        self.collection.create_index("entries._id")
+        BucketedHistoryStore._indexes_ready = True
+
+    def bucket_start(self, timestamp: datetime) -> datetime:
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        seconds = int((timestamp - _EPOCH).total_seconds())
+        return _EPOCH + timedelta(seconds=seconds - seconds % self.bucket_seconds)
+
+    def _bucket_update(self, patient_id: int, start: datetime, entries: List[Dict[str, Any]]) -> UpdateOne:
+        timestamps = [entry["timestamp"] for entry in entries]
+        return UpdateOne(
+            {
+                "patient_id": patient_id,
+                "bucket_start": start,
+                "count": {"$lte": self.max_entries - len(entries)}
+            },
+            {
+                "$push": {"entries": {"$each": entries, "$sort": {"timestamp": -1}}},
+                "$inc": {"count": len(entries)},
+                "$min": {"min_timestamp": min(timestamps)},
+                "$max": {"max_timestamp": max(timestamps)}
+            },
+            upsert=True
+        )
+
+    def insert(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {"_id": ObjectId(), **entry}
+        _, errors = self.insert_many([entry])
+        if errors:
+            raise ValueError(errors[0][1])
+        return entry
+
+    def insert_many(self, entries: List[Dict[str, Any]]) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Insert entries into their buckets. Entries that come with an `_id`
+        already stored in some bucket (e.g. a migration re-run over an
+        overlapping range) are skipped and not counted as inserted.
+        """
+        supplied = [entry["_id"] for entry in entries if "_id" in entry]
+        existing = set()
+        if supplied:
+            existing = set(self.collection.distinct("entries._id", {"entries._id": {"$in": supplied}}))
+        groups: Dict[Tuple[int, datetime], List[Tuple[int, Dict[str, Any]]]] = {}
+        skipped = 0
+        for index, entry in enumerate(entries):
+            if entry.get("_id") in existing:
+                skipped += 1
+                continue
+            entry.setdefault("_id", ObjectId())
+            stored = {key: value for key, value in entry.items() if key != "patient_id"}
+            key = (entry["patient_id"], self.bucket_start(entry["timestamp"]))
+            groups.setdefault(key, []).append((index, stored))
+
+        operations = []
+        op_indexes = []
+        for (patient_id, start), group in groups.items():
+            for offset in range(0, len(group), self.max_entries):
+                chunk = group[offset:offset + self.max_entries]
+                operations.append(self._bucket_update(patient_id, start, [stored for _, stored in chunk]))
+                op_indexes.append([index for index, _ in chunk])
+
+        if not operations:
+            return 0, []
+        try:
+            self.collection.bulk_write(operations, ordered=False)
+            return len(entries) - skipped, []
+        except BulkWriteError as e:
+            errors = [
+                (index, err.get("errmsg", "Write error"))
+                for err in e.details.get("writeErrors", [])
+                for index in op_indexes[err["index"]]
+            ]
+            return len(entries) - skipped - len(errors), errors
+
+    @staticmethod
+    def _split(query: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Bucket-level and entry-level filters for an entry query."""
+        bucket_match = {}
+        entry_match = {}
+        for key, value in query.items():
+            if key == "patient_id":
+                bucket_match["patient_id"] = value
+            else:
+                bucket_match[f"entries.{key}"] = value
+                entry_match[key] = value
+        return bucket_match, entry_match
+
+    def _pipeline(self, query: Dict[str, Any], since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        bucket_match, entry_match = self._split(query)
+        if since is not None:
+            bucket_match["bucket_start"] = {"$gte": since}
+
+        pipeline = [
+            {"$match": bucket_match},
+            {"$unwind": "$entries"},
+            {"$replaceWith": {"$mergeObjects": [{"patient_id": "$patient_id"}, "$entries"]}}
+        ]
+        if entry_match:
+            pipeline.append({"$match": entry_match})
+        return pipeline
+
+    def _oldest_needed(self, query: Dict[str, Any], needed: int) -> Optional[datetime]:
+        """
+        Walk the matching buckets newest first (on the patient_id,
+        bucket_start index) and return the bucket_start at which `needed`
+        matching entries are covered, or None if every bucket is needed.
+        Bucket windows do not overlap in time, so entries of older windows
+        are older than all of these.
+        """
+        bucket_match, entry_match = self._split(query)
+        if any(isinstance(value, dict) for value in entry_match.values()):
+            # Operator filters cannot be counted per bucket here
+            return None
+        matching: Any = "$count"
+        if entry_match:
+            matching = {"$size": {"$filter": {
+                "input": "$entries",
+                "as": "entry",
+                "cond": {"$and": [{"$eq": [f"$$entry.{key}", value]} for key, value in entry_match.items()]}
+            }}}
+        pipeline = [
+            {"$match": bucket_match},
+            {"$sort": {"bucket_start": -1}},
+            {"$project": {"bucket_start": 1, "matching": matching}}
+        ]
+        covered = 0
+        with self.collection.aggregate(pipeline, batchSize=100) as cursor:
+            for bucket in cursor:
+                covered += bucket["matching"]
+                if covered >= needed:
+                    return bucket["bucket_start"]
+        return None
+
+    def find(
+        self,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """
+        One page of entries, newest first. Only the newest buckets that
+        cover `skip + limit` entries are unwound and sorted.
+        """
+        pipeline = self._pipeline(query, self._oldest_needed(query, skip + limit)) + [
+            {"$sort": {"timestamp": -1}},
+            {"$skip": skip},
+            {"$limit": limit}
+        ]
+        if projection:
+            pipeline.append({"$project": projection})
+        return list(self.collection.aggregate(pipeline, allowDiskUse=True))
+
+    def iter(
+        self,
+        query: Dict[str, Any],
+        projection: Optional[Dict[str, int]] = None,
+        batch_size: int = 1000
+    ) -> Iterable[Dict[str, Any]]:
+        # Entry ObjectIds give insertion order; buckets are ordered by time, not insertion
+        pipeline = self._pipeline(query) + [{"$sort": {"_id": 1}}]
+        if projection:
+            pipeline.append({"$project": projection})
+        return self.collection.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True)
+
+    def get(self, entry_id: ObjectId, projection: Optional[Dict[str, int]] = None) -> Optional[Dict[str, Any]]:
+        pipeline = self._pipeline({"_id": entry_id}) + [{"$limit": 1}]
+        if projection:
+            pipeline.append({"$project": projection})
+        return next(iter(self.collection.aggregate(pipeline)), None)
+
+    def update(self, entry_id: ObjectId, update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if "timestamp" in update_data and update_data["timestamp"] is None:
+            raise ValueError("timestamp cannot be null: it decides the entry's bucket")
+        current = self.get(entry_id)
+        if not current:
+            return None
+
+        updated = {**current, **update_data}
+        start = self.bucket_start(updated["timestamp"])
+        if start == self.bucket_start(current["timestamp"]):
+            self.collection.update_one(
+                {"entries._id": entry_id},
+                {
+                    "$set": {f"entries.$.{key}": value for key, value in update_data.items()},
+                    "$min": {"min_timestamp": updated["timestamp"]},
+                    "$max": {"max_timestamp": updated["timestamp"]}
+                }
+            )
+        else:
+            # Timestamp moved the entry into another bucket. Add it there before
+            # pulling it from the old one, so a failure in between leaves a
+            # duplicate rather than losing the entry.
+            old_bucket = self.collection.find_one({"entries._id": entry_id}, {"_id": 1})
+            stored = {key: value for key, value in updated.items() if key != "patient_id"}
+            self.collection.bulk_write([self._bucket_update(updated["patient_id"], start, [stored])])
+            if old_bucket:
+                self._pull({"_id": old_bucket["_id"]}, entry_id)
+        return updated
+
+    def delete(self, entry_id: ObjectId) -> bool:
+        return self._pull({"entries._id": entry_id}, entry_id)
+
+    def _pull(self, bucket_filter: Dict[str, Any], entry_id: ObjectId) -> bool:
+        bucket = self.collection.find_one_and_update(
+            {**bucket_filter, "entries._id": entry_id},
+            {"$pull": {"entries": {"_id": entry_id}}, "$inc": {"count": -1}},
+            projection={"count": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not bucket:
+            return False
+        if bucket["count"] <= 0:
+            self.collection.delete_one({"_id": bucket["_id"], "count": {"$lte": 0}})
+        return True
+
+
+HistoryStore = Union[DocumentHistoryStore, BucketedHistoryStore]
+
+
+def create_history_store(mongo_db: MongoDB) -> HistoryStore:
+    """Return the patient history store for the configured storage mode."""
+    if PATIENT_HISTORY_STORAGE == "bucketed":
+        return BucketedHistoryStore(mongo_db)
+    return DocumentHistoryStore(mongo_db)
+
+
 class PatientHistory:
     def __init__(self):
-        self.db = MongoDB().patient_history
+        self.store = create_history_store(MongoDB())
 
     def add_history_entry(
         self,
@@ -52,12 +451,15 @@ class PatientHistory:
             }
         }
         
-        result = self.db.insert_one(history_entry)
-        return str(result.inserted_id)
+        created = self.store.insert(history_entry)
+        return str(created["_id"])
 
 class PredictionModel:
     def __init__(self):
+        from api.models.feature_packing import FeaturePacker
+
         self.db = MongoDB().predictions
+        self.packer = FeaturePacker(MongoDB())
 
     def save_prediction(
         self,
@@ -78,7 +480,7 @@ class PredictionModel:
             "metadata": metadata or {}
         }
         
-        result = self.db.insert_one(prediction_doc)
+        result = self.db.insert_one(self.packer.pack(prediction_doc))
         return str(result.inserted_id)
 
     def get_patient_predictions(
@@ -86,6 +488,7 @@ class PredictionModel:
         patient_id: int,
         limit: int = 10
     ) -> List[Dict[str, Any]]:
-        return list(self.db.find(
-            {"patient_id": patient_id}
-        ).sort("timestamp", -1).limit(limit))
\ No newline at end of file
+        return [
+            self.packer.unpack(doc)
+            for doc in self.db.find({"patient_id": patient_id}).sort("timestamp", -1).limit(limit)
+        ]
\ No newline at end of file
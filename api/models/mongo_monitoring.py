@@ -0,0 +1,105 @@
+import threading
+import time
+
+from pymongo import monitoring
+
+from api.metrics import Counter, Gauge, Histogram
+
+POOL_CHECKOUT_WAIT = Histogram(
+    "mongo_pool_checkout_wait_seconds",
+    "Time spent waiting to check a connection out of the MongoDB pool",
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+)
+POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total",
+    "Failed MongoDB pool checkouts by reason",
+    ("reason",)
+)
+POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections",
+    "Open MongoDB pool connections",
+    ("address",)
+)
+POOL_CHECKED_OUT = Gauge(
+    "mongo_pool_checked_out_connections",
+    "MongoDB pool connections currently checked out",
+    ("address",)
+)
+COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency by command name",
+    ("command",)
+)
+COMMAND_FAILURES = Counter(
+    "mongo_command_failures_total",
+    "Failed MongoDB commands by command name",
+    ("command",)
+)
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Records pool size, checked-out connections and checkout wait time."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def _wait(self, event) -> float:
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            return duration
+        started = getattr(self._local, "started", None)
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_checked_out(self, event):
+        POOL_CHECKOUT_WAIT.observe(self._wait(event))
+        POOL_CHECKED_OUT.inc(_address(event))
+
+    def connection_check_out_failed(self, event):
+        POOL_CHECKOUT_WAIT.observe(self._wait(event))
+        POOL_CHECKOUT_FAILURES.inc(str(event.reason))
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.dec(_address(event))
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS.inc(_address(event))
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS.dec(_address(event))
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records per-command latency histograms."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        COMMAND_DURATION.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event):
+        COMMAND_DURATION.observe(event.duration_micros / 1e6, event.command_name)
+        COMMAND_FAILURES.inc(event.command_name)
@@ -0,0 +1,172 @@
+"""
+Monthly range partitions for the fast-growing time-series tables (PostgreSQL).
+
+Migration 0005 turns lab_results and vital_signs into tables partitioned by
+test_date/measurement_date. Each has monthly partitions named
+<table>_pYYYY_MM plus a <table>_default partition that catches rows outside
+every range. Run `python -m scripts.manage_partitions` from cron to create
+upcoming months and detach (archive or drop) expired ones.
+"""
+import os
+import re
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+load_dotenv()
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES = {
+    "lab_results": "test_date",
+    "vital_signs": "measurement_date",
+}
+
+# Months of partitions kept ready beyond the current one
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+# Months of partitions kept attached before the current one; 0 keeps everything
+PARTITION_RETAIN_MONTHS = int(os.getenv("PARTITION_RETAIN_MONTHS", "0"))
+# Schema that detached partitions are moved into
+PARTITION_ARCHIVE_SCHEMA = os.getenv("PARTITION_ARCHIVE_SCHEMA", "archive")
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(conn: Connection, table: str) -> List[Tuple[str, date]]:
+    """(name, month) of the table's attached monthly partitions, oldest first."""
+    names = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:table)"
+        ),
+        {"table": table}
+    ).scalars().all()
+    partitions = []
+    for name in names:
+        match = _PARTITION_SUFFIX.search(name)
+        if match and name == partition_name(table, date(int(match[1]), int(match[2]), 1)):
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_default_partition(conn: Connection, table: str) -> None:
+    conn.execute(text(
+        f'CREATE TABLE IF NOT EXISTS "{default_partition_name(table)}" PARTITION OF "{table}" DEFAULT'
+    ))
+
+
+def create_partition(conn: Connection, table: str, month: date) -> bool:
+    """
+    Attach the partition for `month` if it is missing. Rows for that month
+    that already landed in the default partition are moved into it first,
+    since ATTACH fails while the default partition holds rows in range.
+    Returns True if a partition was created.
+    """
+    name = partition_name(table, month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+
+    column = PARTITIONED_TABLES[table]
+    lower, upper = month, add_months(month, 1)
+    conn.execute(text(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'))
+    conn.execute(
+        text(
+            f'WITH moved AS (DELETE FROM "{default_partition_name(table)}" '
+            f"WHERE {column} >= :lower AND {column} < :upper RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        {"lower": lower, "upper": upper}
+    )
+    conn.execute(text(
+        f"ALTER TABLE \"{table}\" ATTACH PARTITION \"{name}\" FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+    return True
+
+
+def ensure_partitions(
+    conn: Connection,
+    ahead: int = PARTITION_MONTHS_AHEAD,
+    first_month: Optional[date] = None,
+    today: Optional[date] = None,
+    tables: Sequence[str] = tuple(PARTITIONED_TABLES)
+) -> List[str]:
+    """
+    Create any missing monthly partitions from `first_month` (default: the
+    current month) through `ahead` months after the current one. Tables that
+    are not partitioned (before migration 0005, or SQLite) are skipped.
+    """
+    current = month_start(today or datetime.utcnow().date())
+    created = []
+    for table in tables:
+        if not is_partitioned(conn, table):
+            continue
+        create_default_partition(conn, table)
+        month = month_start(first_month) if first_month else current
+        while month <= add_months(current, ahead):
+            if create_partition(conn, table, month):
+                created.append(partition_name(table, month))
+            month = add_months(month, 1)
+    return created
+
+
+def detach_partitions(
+    conn: Connection,
+    retain_months: int = PARTITION_RETAIN_MONTHS,
+    archive_schema: Optional[str] = PARTITION_ARCHIVE_SCHEMA,
+    drop: bool = False,
+    concurrently: bool = False,
+    today: Optional[date] = None
+) -> List[str]:
+    """
+    Detach partitions that ended more than `retain_months` months before
+    the current month and move them to `archive_schema` (or drop them).
+    Archived partitions stay queryable and can be dumped or re-attached.
+    `concurrently` (PostgreSQL 14+) avoids blocking readers but needs an
+    autocommit connection. retain_months <= 0 detaches nothing.
+    """
+    if retain_months <= 0:
+        return []
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -retain_months)
+    detached = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            continue
+        for name, month in list_partitions(conn, table):
+            if add_months(month, 1) > cutoff:
+                break
+            conn.execute(text(
+                f'ALTER TABLE "{table}" DETACH PARTITION "{name}"{" CONCURRENTLY" if concurrently else ""}'
+            ))
+            if drop:
+                conn.execute(text(f'DROP TABLE "{name}"'))
+            else:
+                conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+                conn.execute(text(f'ALTER TABLE "{name}" SET SCHEMA "{archive_schema}"'))
+            detached.append(name)
+    return detached
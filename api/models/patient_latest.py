@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from api.models.sql_models import Patient, PatientLatest, LabResults, VitalSigns
+
+# (source model, date column, id column, snapshot date column, fields)
+SNAPSHOT_SOURCES = (
+    (
+        LabResults, LabResults.test_date, LabResults.lab_id, "last_test_date",
+        ("serum_creatinine", "blood_urea_nitrogen", "sodium_level", "potassium_level",
+         "hemoglobin", "white_blood_cells", "red_blood_cells", "egfr")
+    ),
+    (
+        VitalSigns, VitalSigns.measurement_date, VitalSigns.vital_id, "last_measurement_date",
+        ("blood_pressure_systolic", "blood_pressure_diastolic", "heart_rate",
+         "weight_kg", "height_cm", "bmi", "temperature_c")
+    ),
+)
+
+# Patient IDs per statement, keeping IN lists a reasonable size
+REFRESH_CHUNK_SIZE = 1000
+
+
+def snapshot_select(patient_ids: Optional[List[int]] = None):
+    """
+    One row per patient with the newest non-null value of every snapshot
+    field. Each value is a correlated subquery served by the
+    (patient_id, <date> DESC) indexes.
+    """
+    columns = [Patient.patient_id.label("patient_id")]
+    for model, date_column, id_column, date_name, fields in SNAPSHOT_SOURCES:
+        owned = model.patient_id == Patient.patient_id
+        columns.append(
+            select(func.max(date_column)).where(owned).correlate(Patient).scalar_subquery().label(date_name)
+        )
+        for field in fields:
+            column = getattr(model, field)
+            columns.append(
+                select(column)
+                .where(owned, column.isnot(None))
+                .order_by(date_column.desc(), id_column.desc())
+                .limit(1)
+                .correlate(Patient)
+                .scalar_subquery()
+                .label(field)
+            )
+    columns.append(literal(datetime.utcnow()).label("updated_at"))
+
+    statement = select(*columns)
+    if patient_ids is not None:
+        statement = statement.where(Patient.patient_id.in_(patient_ids))
+    return statement
+
+
+def _refresh_statements(patient_ids: List[int], dialect: str):
+    """
+    Lock the patients' rows, then upsert their snapshots. Concurrent writes
+    for the same patient wait on the lock, so the later one's snapshot
+    includes the earlier one's row. FOR NO KEY UPDATE does not conflict
+    with the KEY SHARE locks taken by the lab/vital foreign key checks.
+    """
+    lock = (
+        select(Patient.patient_id)
+        .where(Patient.patient_id.in_(patient_ids))
+        .order_by(Patient.patient_id)
+        .with_for_update(key_share=True)
+    )
+    statement = snapshot_select(patient_ids)
+    names = [column.name for column in statement.selected_columns]
+    if dialect not in ("postgresql", "sqlite"):
+        return (
+            lock,
+            delete(PatientLatest).where(PatientLatest.patient_id.in_(patient_ids)),
+            insert(PatientLatest).from_select(names, statement)
+        )
+    upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(PatientLatest).from_select(
+        names, statement
+    )
+    return (
+        lock,
+        upsert.on_conflict_do_update(
+            index_elements=[PatientLatest.patient_id],
+            set_={name: upsert.excluded[name] for name in names if name != "patient_id"}
+        )
+    )
+
+
+def _chunks(patient_ids: Iterable[int], size: int = REFRESH_CHUNK_SIZE) -> Iterable[List[int]]:
+    ids = sorted(set(patient_ids))
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+async def refresh_patient_latest(db: AsyncSession, patient_ids: Iterable[int]) -> None:
+    """
+    Recompute the snapshot rows for `patient_ids` inside the caller's
+    transaction. Flush pending lab/vital changes before calling.
+    """
+    dialect = db.bind.dialect.name
+    for chunk in _chunks(patient_ids):
+        for statement in _refresh_statements(chunk, dialect):
+            await db.execute(statement)
+
+
+def rebuild_patient_latest(db: Session, batch_size: int = REFRESH_CHUNK_SIZE) -> int:
+    """Recompute every patient's snapshot, committing per batch. Returns the patient count."""
+    patient_ids = db.execute(select(Patient.patient_id)).scalars().all()
+    dialect = db.bind.dialect.name
+    for chunk in _chunks(patient_ids, batch_size):
+        for statement in _refresh_statements(chunk, dialect):
+            db.execute(statement)
+        db.commit()
+    # Drop snapshots whose patient rows were removed without the FK cascade
+    db.execute(delete(PatientLatest).where(PatientLatest.patient_id.not_in(select(Patient.patient_id))))
+    db.commit()
+    return len(patient_ids)
@@ -0,0 +1,218 @@
+from pymongo import ASCENDING, DESCENDING
+from typing import Dict, Any, List, Optional
+import json
+import os
+from datetime import datetime, timedelta
+
+from api.models.mongo_models import MongoDB
+
+PREDICTION_LABEL_FIELD = os.getenv("PREDICTION_LABEL_FIELD", "prediction.label")
+PREDICTION_SCORE_FIELD = os.getenv("PREDICTION_SCORE_FIELD", "prediction.probability")
+# Predictions newer than this are left for the next refresh so that documents
+# stamped just before insertion are not skipped by the high-water mark.
+SUMMARY_REFRESH_LAG_SECONDS = int(os.getenv("SUMMARY_REFRESH_LAG_SECONDS", "5"))
+
+DAILY_SUMMARY_ID = "prediction_daily_summary"
+
+
+def _label_value(raw: str) -> Any:
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+# Label values counted as positive, comma-separated JSON scalars ("1,true", "\"ckd\"")
+# or bare strings (ckd). Clear the summary high-water mark after changing this.
+POSITIVE_LABELS = [
+    _label_value(raw.strip()) for raw in os.getenv("PREDICTION_POSITIVE_LABELS", "1,true").split(",") if raw.strip()
+]
+
+
+def _time_match(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    model_version: Optional[str] = None
+) -> Dict[str, Any]:
+    match: Dict[str, Any] = {}
+    if start or end:
+        match["timestamp"] = {}
+        if start:
+            match["timestamp"]["$gte"] = start
+        if end:
+            match["timestamp"]["$lt"] = end
+    if model_version:
+        match["model_version"] = model_version
+    return match
+
+
+def _daily_group_stage() -> Dict[str, Any]:
+    return {
+        "$group": {
+            "_id": {
+                "model_version": "$model_version",
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}}
+            },
+            "total": {"$sum": 1},
+            "positives": {
+                "$sum": {"$cond": [{"$in": [f"${PREDICTION_LABEL_FIELD}", POSITIVE_LABELS]}, 1, 0]}
+            }
+        }
+    }
+
+
+def _rate_row(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "model_version": doc["_id"]["model_version"],
+        "day": doc["_id"]["day"],
+        "total": doc["total"],
+        "positives": doc["positives"],
+        "positive_rate": doc["positives"] / doc["total"] if doc["total"] else 0.0
+    }
+
+
+class PredictionAnalytics:
+    """
+    Aggregation pipelines over the predictions collection, plus an
+    incrementally refreshed per-day summary collection for dashboards.
+    """
+
+    _indexes_ready = False
+
+    def __init__(self, mongo_db: MongoDB):
+        self.mongo_db = mongo_db
+        self.predictions = mongo_db.predictions
+        self.summary = mongo_db.prediction_daily_summary
+        self.state = mongo_db.analytics_state
+        if not PredictionAnalytics._indexes_ready:
+            self.ensure_indexes()
+
+    def ensure_indexes(self) -> None:
+        self.predictions.create_index([("patient_id", ASCENDING), ("timestamp", DESCENDING)])
+        self.predictions.create_index([("model_version", ASCENDING), ("timestamp", ASCENDING)])
+        self.predictions.create_index("timestamp")
+        PredictionAnalytics._indexes_ready = True
+
+    def latest_per_patient(
+        self,
+        model_name: Optional[str] = None,
+        projection: Optional[Dict[str, int]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Latest prediction for each patient, ordered by patient_id."""
+        pipeline: List[Dict[str, Any]] = []
+        if model_name:
+            pipeline.append({"$match": {"model_name": model_name}})
+        pipeline += [
+            {"$sort": {"patient_id": 1, "timestamp": -1}},
+            {"$group": {"_id": "$patient_id", "doc": {"$first": "$$ROOT"}}},
+            {"$sort": {"_id": 1}},
+            {"$skip": skip},
+            {"$limit": limit},
+            {"$replaceWith": "$doc"}
+        ]
+        if projection:
+            pipeline.append({"$project": projection})
+        return list(self.predictions.aggregate(pipeline, allowDiskUse=True))
+
+    def positive_rate(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        model_version: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Positive prediction rate per model_version per day, computed live."""
+        pipeline = [
+            {"$match": _time_match(start, end, model_version)},
+            _daily_group_stage(),
+            {"$sort": {"_id.day": 1, "_id.model_version": 1}}
+        ]
+        return [_rate_row(doc) for doc in self.predictions.aggregate(pipeline, allowDiskUse=True)]
+
+    def positive_rate_summary(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        model_version: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Positive prediction rate read from the materialized daily summary:
+        the whole days overlapping [start, end), so with midnight bounds it
+        matches the live `positive_rate`.
+        """
+        query: Dict[str, Any] = {}
+        if start or end:
+            query["_id.day"] = {}
+            if start:
+                query["_id.day"]["$gte"] = start.strftime("%Y-%m-%d")
+            if end:
+                # A day is included only if it starts before `end`
+                end_day = end if end.time() == datetime.min.time() else end + timedelta(days=1)
+                query["_id.day"]["$lt"] = end_day.strftime("%Y-%m-%d")
+        if model_version:
+            query["_id.model_version"] = model_version
+        cursor = self.summary.find(query).sort([("_id.day", 1), ("_id.model_version", 1)])
+        return [_rate_row(doc) for doc in cursor]
+
+    def score_distribution(
+        self,
+        bins: int = 10,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        model_version: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Histogram of prediction scores in [0, 1] using $bucket."""
+        boundaries = [round(i / bins, 6) for i in range(bins + 1)]
+        score = f"${PREDICTION_SCORE_FIELD}"
+        match = _time_match(start, end, model_version)
+        match[PREDICTION_SCORE_FIELD] = {"$gte": 0, "$lte": 1}
+        pipeline = [
+            {"$match": match},
+            {
+                "$bucket": {
+                    # Clamp 1.0 into the last bucket, whose upper boundary is exclusive
+                    "groupBy": {"$min": [score, boundaries[-1] - 1e-9]},
+                    "boundaries": boundaries,
+                    "output": {"count": {"$sum": 1}}
+                }
+            }
+        ]
+        counts = {doc["_id"]: doc["count"] for doc in self.predictions.aggregate(pipeline, allowDiskUse=True)}
+        return [
+            {"lower": lower, "upper": upper, "count": counts.get(lower, 0)}
+            for lower, upper in zip(boundaries, boundaries[1:])
+        ]
+
+    def refresh_daily_summary(self) -> Dict[str, Any]:
+        """
+        Incrementally refresh the per-day summary from the stored high-water
+        mark. Every day touched since the mark is recomputed from scratch and
+        replaced, so a refresh is idempotent and safe to retry.
+        """
+        state = self.state.find_one({"_id": DAILY_SUMMARY_ID}) or {}
+        since = state.get("high_water_mark")
+        until = datetime.utcnow() - timedelta(seconds=SUMMARY_REFRESH_LAG_SECONDS)
+        if since and since >= until:
+            return {"refreshed_from": None, "high_water_mark": since}
+
+        refreshed_from = since.replace(hour=0, minute=0, second=0, microsecond=0) if since else None
+        pipeline = [
+            {"$match": _time_match(refreshed_from, until)},
+            _daily_group_stage(),
+            {
+                "$merge": {
+                    "into": self.summary.name,
+                    "on": "_id",
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert"
+                }
+            }
+        ]
+        self.predictions.aggregate(pipeline, allowDiskUse=True)
+        self.state.update_one(
+            {"_id": DAILY_SUMMARY_ID},
+            {"$set": {"high_water_mark": until, "refreshed_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return {"refreshed_from": refreshed_from, "high_water_mark": until}
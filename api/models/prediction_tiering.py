@@ -0,0 +1,229 @@
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+from api.export import json_default
+from api.models.feature_packing import PACKED_FIELDS, FeaturePacker
+from api.models.mongo_models import MongoDB
+
+PREDICTION_HOT_DAYS = int(os.getenv("PREDICTION_HOT_DAYS", "90"))
+PREDICTION_KEEP_LATEST = int(os.getenv("PREDICTION_KEEP_LATEST", "3"))
+# "collection" moves cold predictions to predictions_archive; "file" writes
+# them to gzip-compressed NDJSON files and "parquet" to a Parquet dataset
+# (needs pyarrow) under PREDICTION_ARCHIVE_DIR.
+PREDICTION_ARCHIVE_TARGET = os.getenv("PREDICTION_ARCHIVE_TARGET", "collection")
+PREDICTION_ARCHIVE_DIR = os.getenv("PREDICTION_ARCHIVE_DIR", "archive/predictions")
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+TIERING_STATE_ID = "prediction_tiering"
+DUPLICATE_KEY = 11000
+# Fields kept as their own Parquet columns; everything else goes into the JSON `document` column
+PARQUET_COLUMN_FIELDS = ("_id", "features") + PACKED_FIELDS
+
+
+class PredictionTiering:
+    """
+    Moves predictions older than a cutoff, except each patient's latest N,
+    out of the hot `predictions` collection into an archive collection,
+    compressed NDJSON files or a Parquet dataset.
+    """
+
+    def __init__(
+        self,
+        mongo_db: MongoDB,
+        target: str = PREDICTION_ARCHIVE_TARGET,
+        archive_dir: str = PREDICTION_ARCHIVE_DIR
+    ):
+        self.predictions = mongo_db.predictions
+        self.archive = mongo_db.predictions_archive
+        self.packer = FeaturePacker(mongo_db)
+        self.state = mongo_db.analytics_state
+        self.target = target
+        self.archive_dir = archive_dir
+
+    def _cold_ids(self, cutoff: datetime, keep_latest: int, batch_size: int) -> Iterator[List[ObjectId]]:
+        pipeline = [
+            {
+                "$setWindowFields": {
+                    "partitionBy": "$patient_id",
+                    "sortBy": {"timestamp": -1},
+                    "output": {"rank": {"$documentNumber": {}}}
+                }
+            },
+            {"$match": {"rank": {"$gt": keep_latest}, "timestamp": {"$lt": cutoff}}},
+            {"$project": {"_id": 1}}
+        ]
+        batch = []
+        with self.predictions.aggregate(pipeline, allowDiskUse=True, batchSize=batch_size) as cursor:
+            for doc in cursor:
+                batch.append(doc["_id"])
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _write_collection(self, docs: List[Dict[str, Any]]) -> None:
+        try:
+            self.archive.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            # Documents already archived by an interrupted run are fine
+            if any(err["code"] != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+                raise
+
+    def _write_file(self, docs: List[Dict[str, Any]], path: str) -> None:
+        encoder = json.JSONEncoder(default=json_default, separators=(",", ":"))
+        with gzip.open(path, "at", encoding="utf-8") as archive_file:
+            for doc in docs:
+                archive_file.write(encoder.encode(self.packer.unpack(doc)) + "\n")
+
+    def _write_parquet(self, docs: List[Dict[str, Any]], path: str, part: int) -> None:
+        """
+        Write one batch as its own Parquet file, closed before the batch is
+        deleted from the hot set, so an interrupted run leaves only complete
+        files. Columns match the Parquet export, plus the rest of each
+        document (prediction, metadata) as JSON so nothing is dropped.
+        """
+        import pyarrow.parquet as pq
+        from api.columnar import EXPORT_PARQUET_COMPRESSION, PredictionBatcher, require_pyarrow
+
+        pa = require_pyarrow()
+        encoder = json.JSONEncoder(default=json_default, separators=(",", ":"))
+        table = pa.Table.from_batches([PredictionBatcher(self.packer).batch(docs)])
+        table = table.append_column("document", pa.array([
+            encoder.encode({key: value for key, value in doc.items() if key not in PARQUET_COLUMN_FIELDS})
+            for doc in docs
+        ], pa.string()))
+        compression = None if EXPORT_PARQUET_COMPRESSION == "none" else EXPORT_PARQUET_COMPRESSION
+        pq.write_table(table, os.path.join(path, f"part-{part:05d}.parquet"), compression=compression)
+
+    def run(
+        self,
+        hot_days: int = PREDICTION_HOT_DAYS,
+        keep_latest: int = PREDICTION_KEEP_LATEST,
+        batch_size: int = ARCHIVE_BATCH_SIZE
+    ) -> Dict[str, Any]:
+        """Archive cold predictions in batches and record run metrics."""
+        cutoff = datetime.utcnow() - timedelta(days=hot_days)
+        path = None
+        if self.target == "collection":
+            self.archive.create_index([("patient_id", ASCENDING), ("timestamp", DESCENDING)])
+        elif self.target == "file":
+            os.makedirs(self.archive_dir, exist_ok=True)
+            path = os.path.join(
+                self.archive_dir,
+                f"predictions-{datetime.utcnow():%Y%m%d-%H%M%S}.ndjson.gz"
+            )
+        elif self.target == "parquet":
+            # One directory per run; pyarrow.parquet.read_table(path) reads it as one table
+            path = os.path.join(self.archive_dir, f"predictions-{datetime.utcnow():%Y%m%d-%H%M%S}")
+            os.makedirs(path, exist_ok=True)
+
+        moved = 0
+        start = time.perf_counter()
+        for part, ids in enumerate(self._cold_ids(cutoff, keep_latest, batch_size)):
+            docs = list(self.predictions.find({"_id": {"$in": ids}}))
+            if self.target == "file":
+                self._write_file(docs, path)
+            elif self.target == "parquet":
+                self._write_parquet(docs, path, part)
+            else:
+                self._write_collection(docs)
+            moved += self.predictions.delete_many({"_id": {"$in": ids}}).deleted_count
+        elapsed = time.perf_counter() - start
+
+        run = {
+            "cutoff": cutoff,
+            "target": self.target,
+            "path": path,
+            "moved": moved,
+            "seconds": round(elapsed, 3),
+            "docs_per_second": round(moved / elapsed, 1) if elapsed > 0 else 0.0,
+            "finished_at": datetime.utcnow()
+        }
+        self.state.update_one({"_id": TIERING_STATE_ID}, {"$set": {"last_run": run}}, upsert=True)
+        return run
+
+    def status(self) -> Dict[str, Any]:
+        """Hot/archive set sizes and metrics from the last run."""
+        db = self.predictions.database
+        hot = db.command("collStats", self.predictions.name)
+        archive = db.command("collStats", self.archive.name) if self.archive.name in db.list_collection_names() else {}
+        state = self.state.find_one({"_id": TIERING_STATE_ID}) or {}
+        return {
+            "hot_count": hot.get("count", 0),
+            "hot_size_bytes": hot.get("size", 0),
+            "hot_storage_bytes": hot.get("storageSize", 0),
+            "hot_index_bytes": hot.get("totalIndexSize", 0),
+            "archive_count": archive.get("count", 0),
+            "archive_storage_bytes": archive.get("storageSize", 0),
+            "last_run": state.get("last_run")
+        }
+
+
+def _union_pipeline(archive_name: str, query: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"$match": query},
+        {"$unionWith": {"coll": archive_name, "pipeline": [{"$match": query}]}}
+    ]
+
+
+def find_predictions(
+    mongo_db: MongoDB,
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, int]] = None,
+    skip: int = 0,
+    limit: int = 100,
+    include_archived: bool = False
+) -> List[Dict[str, Any]]:
+    """Find predictions newest first, optionally including the archive collection."""
+    if not include_archived:
+        cursor = mongo_db.predictions.find(query, projection).skip(skip).limit(limit).sort("timestamp", -1)
+        return list(cursor)
+
+    pipeline = _union_pipeline(mongo_db.predictions_archive.name, query) + [
+        {"$sort": {"timestamp": -1}},
+        {"$skip": skip},
+        {"$limit": limit}
+    ]
+    if projection:
+        pipeline.append({"$project": projection})
+    return list(mongo_db.predictions.aggregate(pipeline, allowDiskUse=True))
+
+
+def iter_predictions(
+    mongo_db: MongoDB,
+    query: Dict[str, Any],
+    projection: Optional[Dict[str, int]] = None,
+    batch_size: int = 1000,
+    include_archived: bool = False
+) -> Iterable[Dict[str, Any]]:
+    """Cursor over predictions, hot and optionally archived, in _id order for streaming exports."""
+    if not include_archived:
+        return mongo_db.predictions.find(query, projection, batch_size=batch_size).sort("_id", 1)
+
+    # Same _id order as the hot-only path
+    pipeline = _union_pipeline(mongo_db.predictions_archive.name, query) + [{"$sort": {"_id": 1}}]
+    if projection:
+        pipeline.append({"$project": projection})
+    return mongo_db.predictions.aggregate(pipeline, batchSize=batch_size, allowDiskUse=True)
+
+
+def get_prediction_by_id(
+    mongo_db: MongoDB,
+    prediction_id: ObjectId,
+    projection: Optional[Dict[str, int]] = None,
+    include_archived: bool = False
+) -> Optional[Dict[str, Any]]:
+    """Find one prediction by ID, falling back to the archive collection."""
+    prediction = mongo_db.predictions.find_one({"_id": prediction_id}, projection)
+    if prediction is None and include_archived:
+        prediction = mongo_db.predictions_archive.find_one({"_id": prediction_id}, projection)
+    return prediction
+
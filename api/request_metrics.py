@@ -0,0 +1,106 @@
+import os
+import time
+from typing import Dict, Tuple
+
+from dotenv import load_dotenv
+
+from api.metrics import Counter, Gauge, Histogram
+
+load_dotenv()
+
+# Record per-route request metrics (served on /metrics)
+REQUEST_METRICS = os.getenv("REQUEST_METRICS", "true").lower() in ("1", "true", "yes")
+
+# Label for requests that matched no route (404s, probes), so stray paths cannot add series
+UNMATCHED_ROUTE = "<unmatched>"
+
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last response byte, by method and route template",
+    ("method", "route")
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled"
+)
+HTTP_REQUEST_SIZE = Histogram(
+    "http_request_size_bytes",
+    "Request body size by method and route template",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size by method and route template",
+    ("method", "route"),
+    buckets=SIZE_BUCKETS
+)
+
+
+def route_template(scope: Dict) -> str:
+    """Path template of the matched route (e.g. `/api/v1/patients/{patient_id}`)."""
+    template = getattr(scope.get("route"), "path_format", None)
+    if not template:
+        return UNMATCHED_ROUTE
+    # Newer FastAPI versions report routes of included routers without the include prefix
+    path = scope["path"]
+    try:
+        matched = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    if matched != path and path.endswith(matched):
+        return path[:len(path) - len(matched)] + template
+    return template
+
+
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware recording, per route template: request count by
+    status, latency, request and response body sizes, plus requests in
+    flight. The route is read from the scope after the router has matched
+    it, so there is no extra route resolution; recording is a few dict
+    updates per request. Bodies are counted as they stream, so NDJSON
+    uploads and streamed exports are measured without buffering.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        # [status, request bytes, response bytes]
+        state = [500, 0, 0]
+
+        async def counting_receive():
+            message = await receive()
+            state[1] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                state[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                state[2] += len(message.get("body", b""))
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            labels: Tuple[str, str] = (scope["method"], route_template(scope))
+            HTTP_REQUESTS.inc(*labels, str(state[0]))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, *labels)
+            HTTP_REQUEST_SIZE.observe(state[1], *labels)
+            HTTP_RESPONSE_SIZE.observe(state[2], *labels)
@@ -1,24 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 from typing import List
 from datetime import datetime
 
-from api.database import get_db
+from api.cache import cached_json, invalidate_patient
+from api.database import get_db, get_read_db
+from api.etag import etag_matches, not_modified, patient_etag
 from api.models.sql_models import Patient, Diagnosis
 from api.schemas.diagnosis import DiagnosisCreate, DiagnosisUpdate, DiagnosisResponse
+from api.serialization import FAST_JSON, adapter_response
 
 router = APIRouter(
     prefix="/diagnoses",
     tags=["Diagnoses"]
 )
 
+DIAGNOSES_LIST = TypeAdapter(List[DiagnosisResponse])
+
 
 @router.post("/", response_model=DiagnosisResponse, status_code=status.HTTP_201_CREATED)
-def create_diagnosis(diagnosis: DiagnosisCreate, db: Session = Depends(get_db)):
+async def create_diagnosis(diagnosis: DiagnosisCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a diagnosis record for a patient.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == diagnosis.patient_id).first()
+    patient = await db.get(Patient, diagnosis.patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -32,11 +39,12 @@ def create_diagnosis(diagnosis: DiagnosisCreate, db: Session = Depends(get_db)):
         
         db_diagnosis = Diagnosis(**diagnosis_data)
         db.add(db_diagnosis)
-        db.commit()
-        db.refresh(db_diagnosis)
+        await db.commit()
+        await invalidate_patient(db_diagnosis.patient_id, "diagnoses")
+        await db.refresh(db_diagnosis)
         return db_diagnosis
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error creating diagnosis: {str(e)}"
@@ -44,47 +52,66 @@ def create_diagnosis(diagnosis: DiagnosisCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[DiagnosisResponse])
-def get_diagnoses(
+async def get_diagnoses(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     patient_id: int = Query(None, description="Filter by patient ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all diagnoses with pagination. Optionally filter by patient_id.
     """
-    query = db.query(Diagnosis)
+    query = select(Diagnosis)
     if patient_id:
-        query = query.filter(Diagnosis.patient_id == patient_id)
+        query = query.where(Diagnosis.patient_id == patient_id)
     
-    diagnoses = query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    diagnoses = result.scalars().all()
+    if FAST_JSON:
+        return adapter_response(DIAGNOSES_LIST, diagnoses)
     return diagnoses
 
 
 @router.get("/patient/{patient_id}", response_model=List[DiagnosisResponse])
-def get_patient_diagnoses(patient_id: int, db: Session = Depends(get_db)):
+async def get_patient_diagnoses(
+    patient_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Get all diagnoses for a specific patient.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Patient with ID {patient_id} not found"
-        )
+    etag = await patient_etag(db, patient_id, [Diagnosis])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load():
+        patient = await db.get(Patient, patient_id)
+        if not patient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Patient with ID {patient_id} not found"
+            )
     
-    diagnoses = db.query(Diagnosis).filter(
-        Diagnosis.patient_id == patient_id
-    ).all()
-    return diagnoses
+        result = await db.execute(
+            select(Diagnosis)
+            .where(Diagnosis.patient_id == patient_id)
+            .order_by(Diagnosis.diagnosis_date.desc())
+        )
+        diagnoses = result.scalars().all()
+        return diagnoses
+
+    return await cached_json(
+        "diagnoses", patient_id, ("patient", "diagnoses"), load, DIAGNOSES_LIST, etag=etag
+    )
 
 
 @router.get("/{diagnosis_id}", response_model=DiagnosisResponse)
-def get_diagnosis_by_id(diagnosis_id: int, db: Session = Depends(get_db)):
+async def get_diagnosis_by_id(diagnosis_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Get diagnosis by ID.
     """
-    diagnosis = db.query(Diagnosis).filter(Diagnosis.diagnosis_id == diagnosis_id).first()
+    diagnosis = await db.get(Diagnosis, diagnosis_id)
     if not diagnosis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -94,15 +121,15 @@ def get_diagnosis_by_id(diagnosis_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{diagnosis_id}", response_model=DiagnosisResponse)
-def update_diagnosis(
+async def update_diagnosis(
     diagnosis_id: int,
     diagnosis_update: DiagnosisUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update diagnosis by ID.
     """
-    diagnosis = db.query(Diagnosis).filter(Diagnosis.diagnosis_id == diagnosis_id).first()
+    diagnosis = await db.get(Diagnosis, diagnosis_id)
     if not diagnosis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,11 +141,12 @@ def update_diagnosis(
         for field, value in update_data.items():
             setattr(diagnosis, field, value)
         
-        db.commit()
-        db.refresh(diagnosis)
+        await db.commit()
+        await invalidate_patient(diagnosis.patient_id, "diagnoses")
+        await db.refresh(diagnosis)
         return diagnosis
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error updating diagnosis: {str(e)}"
@@ -126,11 +154,11 @@ def update_diagnosis(
 
 
 @router.delete("/{diagnosis_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_diagnosis(diagnosis_id: int, db: Session = Depends(get_db)):
+async def delete_diagnosis(diagnosis_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete diagnosis by ID.
     """
-    diagnosis = db.query(Diagnosis).filter(Diagnosis.diagnosis_id == diagnosis_id).first()
+    diagnosis = await db.get(Diagnosis, diagnosis_id)
     if not diagnosis:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -138,11 +166,12 @@ def delete_diagnosis(diagnosis_id: int, db: Session = Depends(get_db)):
         )
     
     try:
-        db.delete(diagnosis)
-        db.commit()
+        await db.delete(diagnosis)
+        await db.commit()
+        await invalidate_patient(diagnosis.patient_id, "diagnoses")
         return None
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error deleting diagnosis: {str(e)}"
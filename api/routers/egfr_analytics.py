@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from typing import Optional
+
+from api.cache import cached_bytes, cached_json
+from api.database import get_read_db
+from api.etag import etag_matches, not_modified, patient_etag
+from api.models.egfr_analytics import (
+    cohort_report,
+    compute_trends,
+    dump_trends,
+    load_series,
+    load_trends,
+    trend_rows
+)
+from api.models.sql_models import Patient, LabResults, Diagnosis
+from api.schemas.egfr_analytics import EgfrCohortResponse, EgfrTrendResponse
+
+router = APIRouter(
+    prefix="/analytics/egfr",
+    tags=["eGFR Analytics"]
+)
+
+EGFR_TREND = TypeAdapter(EgfrTrendResponse)
+EGFR_COHORT = TypeAdapter(EgfrCohortResponse)
+
+# Cohort trends are not tied to one patient's versions; they expire by TTL
+COHORT_CACHE_ID = 0
+
+
+@router.get("/cohort", response_model=EgfrCohortResponse)
+async def get_egfr_cohort(
+    min_readings: int = Query(1, ge=1, description="Only patients with at least this many eGFR readings"),
+    stage: Optional[int] = Query(None, ge=0, le=5, description="Filter by current CKD stage"),
+    rapid_only: bool = Query(False, description="Only rapid decliners"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    eGFR slope, stage progression and rapid-decliner flags for every patient,
+    steepest decline first, with a cohort summary. The trends of the whole
+    cohort are computed once and cached for CACHE_TTL_SECONDS; every filter
+    and page is cut from that snapshot, so pages do not overlap or skip.
+    """
+    async def load() -> bytes:
+        series = await load_series(db)
+        return await run_in_threadpool(lambda: dump_trends(compute_trends(series)))
+
+    body, result = await cached_bytes("egfr_cohort", COHORT_CACHE_ID, (), load)
+
+    def report() -> bytes:
+        data = cohort_report(load_trends(body), min_readings, stage, rapid_only, skip, limit)
+        return EGFR_COHORT.dump_json(EGFR_COHORT.validate_python(data))
+
+    headers = {"X-Cache": result.upper()} if result else {}
+    return Response(await run_in_threadpool(report), media_type="application/json", headers=headers)
+
+
+@router.get("/patient/{patient_id}", response_model=EgfrTrendResponse)
+async def get_patient_egfr_trend(
+    patient_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    eGFR slope and CKD-stage progression for a specific patient.
+    """
+    etag = await patient_etag(db, patient_id, [LabResults, Diagnosis])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load():
+        patient = await db.get(Patient, patient_id)
+        if not patient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Patient with ID {patient_id} not found"
+            )
+
+        rows = trend_rows(compute_trends(await load_series(db, patient_id)))
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"No eGFR readings or CKD stages recorded for patient {patient_id}"
+            )
+        return rows[0]
+
+    return await cached_json(
+        "egfr_trend", patient_id, ("patient", "lab_results", "diagnoses"), load, EGFR_TREND, etag=etag
+    )
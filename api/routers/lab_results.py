@@ -1,24 +1,60 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
-from api.database import get_db
-from api.models.sql_models import Patient, LabResults
-from api.schemas.lab_results import LabResultsCreate, LabResultsUpdate, LabResultsResponse
+from api.bulk import bulk_ingest
+from api.cache import cached_json, invalidate_patient
+from api.database import get_db, get_read_db
+from api.etag import etag_matches, not_modified, patient_etag
+from api.models.patient_latest import refresh_patient_latest
+from api.models.sql_models import Patient, LabResults, insert_rows
+from api.schemas.bulk import BulkInsertResponse
+from api.schemas.lab_results import (
+    LabResultsCreate,
+    LabResultsUpdate,
+    LabResultsResponse,
+    LabResultsBucketResponse
+)
+from api.serialization import FAST_JSON, adapter_response
+from api.timeseries import AGGREGATES, BUCKETS, downsample_query, in_range
 
 router = APIRouter(
     prefix="/lab-results",
     tags=["Lab Results"]
 )
 
+LAB_RESULTS_FIELDS = (
+    "serum_creatinine",
+    "blood_urea_nitrogen",
+    "sodium_level",
+    "potassium_level",
+    "hemoglobin",
+    "white_blood_cells",
+    "red_blood_cells",
+    "egfr",
+)
+
+LAB_RESULTS_BUCKETS = TypeAdapter(List[LabResultsBucketResponse])
+LAB_RESULTS_LIST = TypeAdapter(List[LabResultsResponse])
+
+
+def build_lab_results_row(lab_results: LabResultsCreate) -> Dict[str, Any]:
+    """Build the column values for a new lab results row."""
+    lab_data = lab_results.model_dump()
+    if not lab_data.get("test_date"):
+        lab_data["test_date"] = datetime.utcnow()
+    return lab_data
+
 
 @router.post("/", response_model=LabResultsResponse, status_code=status.HTTP_201_CREATED)
-def create_lab_results(lab_results: LabResultsCreate, db: Session = Depends(get_db)):
+async def create_lab_results(lab_results: LabResultsCreate, db: AsyncSession = Depends(get_db)):
     """
     Create lab results record for a patient.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == lab_results.patient_id).first()
+    patient = await db.get(Patient, lab_results.patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -26,17 +62,44 @@ def create_lab_results(lab_results: LabResultsCreate, db: Session = Depends(get_
         )
     
     try:
-        lab_data = lab_results.model_dump()
-        if not lab_data.get("test_date"):
-            lab_data["test_date"] = datetime.utcnow()
-        
-        db_lab_results = LabResults(**lab_data)
+        db_lab_results = LabResults(**build_lab_results_row(lab_results))
         db.add(db_lab_results)
-        db.commit()
-        db.refresh(db_lab_results)
+        await db.flush()
+        await refresh_patient_latest(db, [db_lab_results.patient_id])
+        await db.commit()
+        await invalidate_patient(db_lab_results.patient_id, "lab_results")
+        await db.refresh(db_lab_results)
         return db_lab_results
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error creating lab results: {str(e)}"
+        )
+
+
+@router.post("/bulk", response_model=BulkInsertResponse)
+async def bulk_create_lab_results(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Bulk create lab results records from an NDJSON or JSON array body.
+    Patients are checked per batch with one query and all valid rows are
+    committed in a single transaction; invalid rows are reported per line.
+    """
+    patient_ids = set()
+
+    async def insert(rows: List[Dict[str, Any]]):
+        patient_ids.update(row["patient_id"] for row in rows)
+        return await insert_rows(db, LabResults, rows)
+
+    try:
+        summary = await bulk_ingest(request.stream(), LabResultsCreate, build_lab_results_row, insert)
+        await refresh_patient_latest(db, patient_ids)
+        await db.commit()
+        for patient_id in patient_ids:
+            await invalidate_patient(patient_id, "lab_results")
+        return summary
+    except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error creating lab results: {str(e)}"
@@ -44,47 +107,81 @@ def create_lab_results(lab_results: LabResultsCreate, db: Session = Depends(get_
 
 
 @router.get("/", response_model=List[LabResultsResponse])
-def get_lab_results(
+async def get_lab_results(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     patient_id: int = Query(None, description="Filter by patient ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all lab results with pagination. Optionally filter by patient_id.
     """
-    query = db.query(LabResults)
+    query = select(LabResults)
     if patient_id:
-        query = query.filter(LabResults.patient_id == patient_id)
+        query = query.where(LabResults.patient_id == patient_id)
     
-    lab_results = query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    lab_results = result.scalars().all()
+    if FAST_JSON:
+        return adapter_response(LAB_RESULTS_LIST, lab_results)
     return lab_results
 
 
-@router.get("/patient/{patient_id}", response_model=List[LabResultsResponse])
-def get_patient_lab_results(patient_id: int, db: Session = Depends(get_db)):
+@router.get("/patient/{patient_id}", response_model=Union[List[LabResultsResponse], List[LabResultsBucketResponse]])
+async def get_patient_lab_results(
+    patient_id: int,
+    request: Request,
+    from_: Optional[datetime] = Query(None, alias="from", description="Only rows at or after this time"),
+    to: Optional[datetime] = Query(None, description="Only rows before this time"),
+    bucket: Optional[str] = Query(
+        None, pattern=f"^({'|'.join(BUCKETS)})$", description="Downsample into hour or day buckets"
+    ),
+    agg: str = Query("avg", pattern=f"^({'|'.join(AGGREGATES)})$", description="Per-bucket aggregate"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    Get all lab results for a specific patient.
+    Get lab results for a specific patient, newest first.
+    Optionally limited to [from, to), or downsampled in SQL into one row per
+    hour/day bucket (oldest first) using min/max/avg/last.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Patient with ID {patient_id} not found"
+    params = (from_, to, bucket, bucket and agg)
+    etag = await patient_etag(db, patient_id, [LabResults], params)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load():
+        patient = await db.get(Patient, patient_id)
+        if not patient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Patient with ID {patient_id} not found"
+            )
+
+        if bucket:
+            query = downsample_query(
+                LabResults, LabResults.test_date, LabResults.lab_id, LAB_RESULTS_FIELDS,
+                patient_id, bucket, agg, db.bind.dialect.name, from_, to
+            )
+            result = await db.execute(query)
+            return [dict(row) for row in result.mappings()]
+
+        query = select(LabResults).where(LabResults.patient_id == patient_id)
+        result = await db.execute(
+            in_range(query, LabResults.test_date, from_, to).order_by(LabResults.test_date.desc())
         )
-    
-    lab_results = db.query(LabResults).filter(
-        LabResults.patient_id == patient_id
-    ).all()
-    return lab_results
+        return result.scalars().all()
+
+    route = "lab_results:" + ":".join(map(str, params))
+    adapter = LAB_RESULTS_BUCKETS if bucket else LAB_RESULTS_LIST
+    return await cached_json(route, patient_id, ("patient", "lab_results"), load, adapter, etag=etag)
 
 
 @router.get("/{lab_id}", response_model=LabResultsResponse)
-def get_lab_results_by_id(lab_id: int, db: Session = Depends(get_db)):
+async def get_lab_results_by_id(lab_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Get lab results by ID.
     """
-    lab_results = db.query(LabResults).filter(LabResults.lab_id == lab_id).first()
+    lab_results = await db.get(LabResults, lab_id)
     if not lab_results:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -94,15 +191,15 @@ def get_lab_results_by_id(lab_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{lab_id}", response_model=LabResultsResponse)
-def update_lab_results(
+async def update_lab_results(
     lab_id: int,
     lab_results_update: LabResultsUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update lab results by ID.
     """
-    lab_results = db.query(LabResults).filter(LabResults.lab_id == lab_id).first()
+    lab_results = await db.get(LabResults, lab_id)
     if not lab_results:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,11 +211,14 @@ def update_lab_results(
         for field, value in update_data.items():
             setattr(lab_results, field, value)
         
-        db.commit()
-        db.refresh(lab_results)
+        await db.flush()
+        await refresh_patient_latest(db, [lab_results.patient_id])
+        await db.commit()
+        await invalidate_patient(lab_results.patient_id, "lab_results")
+        await db.refresh(lab_results)
         return lab_results
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error updating lab results: {str(e)}"
@@ -126,11 +226,11 @@ def update_lab_results(
 
 
 @router.delete("/{lab_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_lab_results(lab_id: int, db: Session = Depends(get_db)):
+async def delete_lab_results(lab_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete lab results by ID.
     """
-    lab_results = db.query(LabResults).filter(LabResults.lab_id == lab_id).first()
+    lab_results = await db.get(LabResults, lab_id)
     if not lab_results:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -138,11 +238,14 @@ def delete_lab_results(lab_id: int, db: Session = Depends(get_db)):
         )
     
     try:
-        db.delete(lab_results)
-        db.commit()
+        await db.delete(lab_results)
+        await db.flush()
+        await refresh_patient_latest(db, [lab_results.patient_id])
+        await db.commit()
+        await invalidate_patient(lab_results.patient_id, "lab_results")
         return None
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error deleting lab results: {str(e)}"
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
 from typing import List
 
-from api.database import get_db
+from api.cache import cached_json, invalidate_patient
+from api.database import get_db, get_read_db
+from api.etag import etag_matches, not_modified, patient_etag
 from api.models.sql_models import Patient, MedicalHistory
 from api.schemas.medical_history import (
     MedicalHistoryCreate,
@@ -15,22 +19,25 @@ router = APIRouter(
     tags=["Medical History"]
 )
 
+MEDICAL_HISTORY = TypeAdapter(MedicalHistoryResponse)
+
 
 @router.post("/", response_model=MedicalHistoryResponse, status_code=status.HTTP_201_CREATED)
-def create_medical_history(history: MedicalHistoryCreate, db: Session = Depends(get_db)):
+async def create_medical_history(history: MedicalHistoryCreate, db: AsyncSession = Depends(get_db)):
     """
     Create medical history for a patient.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == history.patient_id).first()
+    patient = await db.get(Patient, history.patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Patient with ID {history.patient_id} not found"
         )
     
-    existing = db.query(MedicalHistory).filter(
-        MedicalHistory.patient_id == history.patient_id
-    ).first()
+    result = await db.execute(
+        select(MedicalHistory).where(MedicalHistory.patient_id == history.patient_id)
+    )
+    existing = result.scalars().first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -40,11 +47,12 @@ def create_medical_history(history: MedicalHistoryCreate, db: Session = Depends(
     try:
         db_history = MedicalHistory(**history.model_dump())
         db.add(db_history)
-        db.commit()
-        db.refresh(db_history)
+        await db.commit()
+        await invalidate_patient(db_history.patient_id, "medical_history")
+        await db.refresh(db_history)
         return db_history
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error creating medical history: {str(e)}"
@@ -52,42 +60,55 @@ def create_medical_history(history: MedicalHistoryCreate, db: Session = Depends(
 
 
 @router.get("/", response_model=List[MedicalHistoryResponse])
-def get_medical_histories(
+async def get_medical_histories(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all medical histories with pagination.
     """
-    histories = db.query(MedicalHistory).offset(skip).limit(limit).all()
+    result = await db.execute(select(MedicalHistory).offset(skip).limit(limit))
+    histories = result.scalars().all()
     return histories
 
 
 @router.get("/patient/{patient_id}", response_model=MedicalHistoryResponse)
-def get_patient_medical_history(patient_id: int, db: Session = Depends(get_db)):
+async def get_patient_medical_history(
+    patient_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_read_db)
+):
     """
     Get medical history for a specific patient.
     """
-    history = db.query(MedicalHistory).filter(
-        MedicalHistory.patient_id == patient_id
-    ).first()
-    if not history:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Medical history not found for patient {patient_id}"
+    etag = await patient_etag(db, patient_id, [MedicalHistory])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load():
+        result = await db.execute(
+            select(MedicalHistory).where(MedicalHistory.patient_id == patient_id)
         )
-    return history
+        history = result.scalars().first()
+        if not history:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Medical history not found for patient {patient_id}"
+            )
+        return history
+
+    return await cached_json(
+        "medical_history", patient_id, ("medical_history",), load, MEDICAL_HISTORY, etag=etag
+    )
 
 
 @router.get("/{history_id}", response_model=MedicalHistoryResponse)
-def get_medical_history(history_id: int, db: Session = Depends(get_db)):
+async def get_medical_history(history_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Get medical history by ID.
     """
-    history = db.query(MedicalHistory).filter(
-        MedicalHistory.history_id == history_id
-    ).first()
+    history = await db.get(MedicalHistory, history_id)
     if not history:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,17 +118,15 @@ def get_medical_history(history_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{history_id}", response_model=MedicalHistoryResponse)
-def update_medical_history(
+async def update_medical_history(
     history_id: int,
     history_update: MedicalHistoryUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update medical history by ID.
     """
-    history = db.query(MedicalHistory).filter(
-        MedicalHistory.history_id == history_id
-    ).first()
+    history = await db.get(MedicalHistory, history_id)
     if not history:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -119,11 +138,12 @@ def update_medical_history(
         for field, value in update_data.items():
             setattr(history, field, value)
         
-        db.commit()
-        db.refresh(history)
+        await db.commit()
+        await invalidate_patient(history.patient_id, "medical_history")
+        await db.refresh(history)
         return history
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error updating medical history: {str(e)}"
@@ -131,13 +151,11 @@ def update_medical_history(
 
 
 @router.delete("/{history_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_medical_history(history_id: int, db: Session = Depends(get_db)):
+async def delete_medical_history(history_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete medical history by ID.
     """
-    history = db.query(MedicalHistory).filter(
-        MedicalHistory.history_id == history_id
-    ).first()
+    history = await db.get(MedicalHistory, history_id)
     if not history:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -145,11 +163,12 @@ def delete_medical_history(history_id: int, db: Session = Depends(get_db)):
         )
     
     try:
-        db.delete(history)
-        db.commit()
+        await db.delete(history)
+        await db.commit()
+        await invalidate_patient(history.patient_id, "medical_history")
         return None
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error deleting medical history: {str(e)}"
@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
 
-from api.database import get_mongo_db
-from api.models.mongo_models import MongoDB
+from api.bulk import bulk_ingest
+from api.database import get_history_store
+from api.dependencies import parse_fields
+from api.export import EXPORT_BATCH_SIZE, NDJSON_MEDIA_TYPE, iter_ndjson
+from api.models.mongo_models import HistoryStore
+from api.schemas.bulk import BulkInsertResponse
 from api.schemas.patient_history_mongo import (
     PatientHistoryCreate,
     PatientHistoryUpdate,
-    PatientHistoryResponse
+    PatientHistoryResponse,
+    PatientHistoryPartialResponse
 )
 
 router = APIRouter(
@@ -29,28 +35,44 @@ def validate_object_id(id_str: str) -> ObjectId:
         )
 
 
+def build_history_document(history: PatientHistoryCreate, source: str = "system") -> Dict[str, Any]:
+    """Build the stored document for a new patient history entry."""
+    history_data = history.model_dump()
+    if not history_data.get("timestamp"):
+        history_data["timestamp"] = datetime.utcnow()
+
+    history_data["metadata"] = {
+        "source": source,
+        "created_at": datetime.utcnow()
+    }
+    return history_data
+
+
+def build_history_query(
+    patient_id: Optional[int] = None,
+    entry_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the Mongo filter shared by the list and export endpoints."""
+    query = {}
+    if patient_id is not None:
+        query["patient_id"] = patient_id
+    if entry_type:
+        query["entry_type"] = entry_type
+    return query
+
+
 @router.post("/", response_model=PatientHistoryResponse, status_code=status.HTTP_201_CREATED)
 def create_patient_history(
     history: PatientHistoryCreate,
-    mongo_db: MongoDB = Depends(get_mongo_db)
+    store: HistoryStore = Depends(get_history_store)
 ):
     """
     Create a new patient history entry.
     """
     try:
-        history_data = history.model_dump()
-        if not history_data.get("timestamp"):
-            history_data["timestamp"] = datetime.utcnow()
-        
-        history_data["metadata"] = {
-            "source": "system",
-            "created_at": datetime.utcnow()
-        }
-        
-        collection = mongo_db.patient_history
-        result = collection.insert_one(history_data)
+        history_data = build_history_document(history)
         
-        created_doc = collection.find_one({"_id": result.inserted_id})
+        created_doc = store.insert(history_data)
         created_doc["_id"] = str(created_doc["_id"])
         
         return created_doc
@@ -61,28 +83,40 @@ def create_patient_history(
         )
 
 
-@router.get("/", response_model=List[PatientHistoryResponse])
+@router.post("/bulk", response_model=BulkInsertResponse)
+async def bulk_create_patient_history(
+    request: Request,
+    store: HistoryStore = Depends(get_history_store)
+):
+    """
+    Bulk create patient history entries from an NDJSON or JSON array body.
+    Each record is validated as a PatientHistoryCreate; invalid records are
+    reported per line and do not block the rest of the batch.
+    """
+    return await bulk_ingest(
+        request.stream(),
+        PatientHistoryCreate,
+        lambda history: build_history_document(history, source="bulk"),
+        store.insert_many
+    )
+
+
+@router.get("/", response_model=List[PatientHistoryPartialResponse], response_model_exclude_unset=True)
 def get_patient_histories(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     patient_id: int = Query(None, description="Filter by patient ID"),
     entry_type: str = Query(None, description="Filter by entry type"),
-    mongo_db: MongoDB = Depends(get_mongo_db)
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. entry_type,timestamp"),
+    store: HistoryStore = Depends(get_history_store)
 ):
     """
     Get all patient history entries with pagination and optional filters.
     """
+    projection = parse_fields(fields, PatientHistoryResponse)
     try:
-        collection = mongo_db.patient_history
-        
-        query = {}
-        if patient_id is not None:
-            query["patient_id"] = patient_id
-        if entry_type:
-            query["entry_type"] = entry_type
-        
-        cursor = collection.find(query).skip(skip).limit(limit).sort("timestamp", -1)
-        histories = list(cursor)
+        query = build_history_query(patient_id, entry_type)
+        histories = store.find(query, projection, skip, limit)
         
         for history in histories:
             history["_id"] = str(history["_id"])
@@ -95,20 +129,41 @@ def get_patient_histories(
         )
 
 
-@router.get("/patient/{patient_id}", response_model=List[PatientHistoryResponse])
+@router.get("/export")
+def export_patient_histories(
+    patient_id: int = Query(None, description="Filter by patient ID"),
+    entry_type: str = Query(None, description="Filter by entry type"),
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000, description="Cursor batch size"),
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. entry_type,timestamp"),
+    store: HistoryStore = Depends(get_history_store)
+):
+    """
+    Stream all matching patient history entries as NDJSON in insertion order.
+    """
+    projection = parse_fields(fields, PatientHistoryResponse)
+
+    cursor = store.iter(
+        build_history_query(patient_id, entry_type),
+        projection,
+        batch_size=batch_size
+    )
+    return StreamingResponse(iter_ndjson(cursor), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/patient/{patient_id}", response_model=List[PatientHistoryPartialResponse], response_model_exclude_unset=True)
 def get_patient_history_by_patient_id(
     patient_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    mongo_db: MongoDB = Depends(get_mongo_db)
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. entry_type,timestamp"),
+    store: HistoryStore = Depends(get_history_store)
 ):
     """
     Get all history entries for a specific patient.
     """
+    projection = parse_fields(fields, PatientHistoryResponse)
     try:
-        collection = mongo_db.patient_history
-        cursor = collection.find({"patient_id": patient_id}).skip(skip).limit(limit).sort("timestamp", -1)
-        histories = list(cursor)
+        histories = store.find({"patient_id": patient_id}, projection, skip, limit)
         
         for history in histories:
             history["_id"] = str(history["_id"])
@@ -121,15 +176,19 @@ def get_patient_history_by_patient_id(
         )
 
 
-@router.get("/{history_id}", response_model=PatientHistoryResponse)
-def get_patient_history(history_id: str, mongo_db: MongoDB = Depends(get_mongo_db)):
+@router.get("/{history_id}", response_model=PatientHistoryPartialResponse, response_model_exclude_unset=True)
+def get_patient_history(
+    history_id: str,
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. entry_type,timestamp"),
+    store: HistoryStore = Depends(get_history_store)
+):
     """
     Get a patient history entry by ID.
     """
+    projection = parse_fields(fields, PatientHistoryResponse)
     try:
         obj_id = validate_object_id(history_id)
-        collection = mongo_db.patient_history
-        history = collection.find_one({"_id": obj_id})
+        history = store.get(obj_id, projection)
         
         if not history:
             raise HTTPException(
@@ -152,16 +211,15 @@ def get_patient_history(history_id: str, mongo_db: MongoDB = Depends(get_mongo_d
 def update_patient_history(
     history_id: str,
     history_update: PatientHistoryUpdate,
-    mongo_db: MongoDB = Depends(get_mongo_db)
+    store: HistoryStore = Depends(get_history_store)
 ):
     """
     Update a patient history entry by ID.
     """
     try:
         obj_id = validate_object_id(history_id)
-        collection = mongo_db.patient_history
         
-        existing = collection.find_one({"_id": obj_id})
+        existing = store.get(obj_id, {"_id": 1})
         if not existing:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -175,12 +233,7 @@ def update_patient_history(
                 detail="No fields to update"
             )
         
-        collection.update_one(
-            {"_id": obj_id},
-            {"$set": update_data}
-        )
-        
-        updated_doc = collection.find_one({"_id": obj_id})
+        updated_doc = store.update(obj_id, update_data)
         updated_doc["_id"] = str(updated_doc["_id"])
         
         return updated_doc
@@ -194,17 +247,14 @@ def update_patient_history(
 
 
 @router.delete("/{history_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_patient_history(history_id: str, mongo_db: MongoDB = Depends(get_mongo_db)):
+def delete_patient_history(history_id: str, store: HistoryStore = Depends(get_history_store)):
     """
     Delete a patient history entry by ID.
     """
     try:
         obj_id = validate_object_id(history_id)
-        collection = mongo_db.patient_history
-        
-        result = collection.delete_one({"_id": obj_id})
         
-        if result.deleted_count == 0:
+        if not store.delete(obj_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Patient history with ID {history_id} not found"
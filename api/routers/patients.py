@@ -1,31 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from pydantic import TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 
-from api.database import get_db
-from api.models.sql_models import Patient
-from api.schemas.patient import PatientCreate, PatientUpdate, PatientResponse
+from api.cache import PATIENT_RESOURCES, cached_json, invalidate_patient
+from api.database import get_db, get_read_db
+from api.etag import etag_matches, not_modified, patient_etag, weak_etag
+from api.models.sql_models import Patient, PatientLatest, MedicalHistory, VitalSigns, LabResults, Diagnosis
+from api.schemas.patient import (
+    PatientCreate,
+    PatientUpdate,
+    PatientResponse,
+    PatientFullResponse,
+    PatientLatestResponse
+)
+from api.serialization import adapter_response
 
 router = APIRouter(
     prefix="/patients",
     tags=["Patients"]
 )
 
+PATIENT = TypeAdapter(PatientResponse)
+PATIENT_LIST = TypeAdapter(List[PatientResponse])
+PATIENT_FULL = TypeAdapter(PatientFullResponse)
+
+# Collection relationship -> (model, id column, date column), newest first
+FULL_RECORD_COLLECTIONS = {
+    "vital_signs": (VitalSigns, VitalSigns.vital_id, VitalSigns.measurement_date),
+    "lab_results": (LabResults, LabResults.lab_id, LabResults.test_date),
+    "diagnoses": (Diagnosis, Diagnosis.diagnosis_id, Diagnosis.diagnosis_date),
+}
+
+
+def build_full_patient_query(patient_id: int, latest: Optional[int] = None):
+    """
+    Select a patient with medical history, vitals, labs and diagnoses loaded
+    via selectinload: one query for the patient plus one per relationship,
+    regardless of how many rows each collection holds. With `latest`, each
+    collection is limited to its newest N rows inside the same IN-load.
+    """
+    options = [selectinload(Patient.medical_history)]
+    for name, (model, id_column, date_column) in FULL_RECORD_COLLECTIONS.items():
+        attribute = getattr(Patient, name)
+        if latest is not None:
+            newest = (
+                select(id_column)
+                .where(model.patient_id == patient_id)
+                .order_by(date_column.desc(), id_column.desc())
+                .limit(latest)
+            )
+            attribute = attribute.and_(id_column.in_(newest))
+        options.append(selectinload(attribute))
+    return select(Patient).where(Patient.patient_id == patient_id).options(*options)
+
+
+async def load_full_patient(db: AsyncSession, patient_id: int, latest: Optional[int] = None) -> Optional[Patient]:
+    result = await db.execute(build_full_patient_query(patient_id, latest))
+    patient = result.scalars().first()
+    if patient is not None:
+        for name, (_, id_column, date_column) in FULL_RECORD_COLLECTIONS.items():
+            getattr(patient, name).sort(
+                key=lambda row: (getattr(row, date_column.key) or datetime.min, getattr(row, id_column.key)),
+                reverse=True
+            )
+    return patient
+
 
 @router.post("/", response_model=PatientResponse, status_code=status.HTTP_201_CREATED)
-def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
+async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new patient.
     """
     try:
         db_patient = Patient(**patient.model_dump())
         db.add(db_patient)
-        db.commit()
-        db.refresh(db_patient)
+        await db.commit()
+        await db.refresh(db_patient)
         return db_patient
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error creating patient: {str(e)}"
@@ -33,42 +90,104 @@ def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=List[PatientResponse])
-def get_patients(
+async def get_patients(
+    request: Request,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all patients with pagination.
+    The ETag covers the page's IDs and updated_at values, so If-None-Match
+    is answered from that narrow query without loading the full rows.
     """
-    patients = db.query(Patient).offset(skip).limit(limit).all()
-    return patients
+    page = select(Patient.patient_id, Patient.updated_at).order_by(Patient.patient_id).offset(skip).limit(limit)
+    etag = weak_etag(skip, limit, *(await db.execute(page)).all())
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    result = await db.execute(select(Patient).order_by(Patient.patient_id).offset(skip).limit(limit))
+    return adapter_response(PATIENT_LIST, result.scalars().all(), headers={"ETag": etag})
 
 
 @router.get("/{patient_id}", response_model=PatientResponse)
-def get_patient(patient_id: int, db: Session = Depends(get_db)):
+async def get_patient(patient_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
     """
     Get a patient by ID.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-    if not patient:
+    etag = await patient_etag(db, patient_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load():
+        patient = await db.get(Patient, patient_id)
+        if not patient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Patient with ID {patient_id} not found"
+            )
+        return patient
+
+    return await cached_json("patient", patient_id, ("patient",), load, PATIENT, etag=etag)
+
+
+@router.get("/{patient_id}/full", response_model=PatientFullResponse)
+async def get_patient_full(
+    patient_id: int,
+    request: Request,
+    latest: Optional[int] = Query(
+        None, ge=1, le=1000, description="Only include the newest N vitals, labs and diagnoses"
+    ),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get a patient with medical history, vital signs, lab results and
+    diagnoses (newest first) in a fixed number of queries.
+    """
+    etag = await patient_etag(db, patient_id, [MedicalHistory, VitalSigns, LabResults, Diagnosis], [latest])
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load():
+        patient = await load_full_patient(db, patient_id, latest)
+        if not patient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Patient with ID {patient_id} not found"
+            )
+        return patient
+
+    return await cached_json(f"full:{latest}", patient_id, PATIENT_RESOURCES, load, PATIENT_FULL, etag=etag)
+
+
+@router.get("/{patient_id}/latest", response_model=PatientLatestResponse)
+async def get_patient_latest(patient_id: int, db: AsyncSession = Depends(get_read_db)):
+    """
+    Get a patient's latest value of each lab and vital field from the
+    patient_latest snapshot (a single primary-key lookup).
+    """
+    snapshot = await db.get(PatientLatest, patient_id)
+    if snapshot:
+        return snapshot
+    if not await db.get(Patient, patient_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Patient with ID {patient_id} not found"
         )
-    return patient
+    # No labs or vitals recorded yet
+    return PatientLatestResponse(patient_id=patient_id)
 
 
 @router.put("/{patient_id}", response_model=PatientResponse)
-def update_patient(
+async def update_patient(
     patient_id: int,
     patient_update: PatientUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a patient by ID.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
+    patient = await db.get(Patient, patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -81,11 +200,12 @@ def update_patient(
             setattr(patient, field, value)
         
         patient.updated_at = datetime.utcnow()
-        db.commit()
-        db.refresh(patient)
+        await db.commit()
+        await invalidate_patient(patient_id, "patient")
+        await db.refresh(patient)
         return patient
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error updating patient: {str(e)}"
@@ -93,11 +213,11 @@ def update_patient(
 
 
 @router.delete("/{patient_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_patient(patient_id: int, db: Session = Depends(get_db)):
+async def delete_patient(patient_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete a patient by ID.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
+    patient = await db.get(Patient, patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -105,13 +225,14 @@ def delete_patient(patient_id: int, db: Session = Depends(get_db)):
         )
     
     try:
-        db.delete(patient)
-        db.commit()
+        await db.delete(patient)
+        await db.commit()
+        # ON DELETE CASCADE removed the patient's other records too
+        await invalidate_patient(patient_id, *PATIENT_RESOURCES)
         return None
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error deleting patient: {str(e)}"
         )
-
@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List
+from datetime import datetime
+
+from api.admission import admit_batch, admit_interactive
+from api.database import get_mongo_db
+from api.dependencies import parse_fields
+from api.models.feature_packing import FeaturePacker, packed_projection
+from api.models.mongo_models import MongoDB
+from api.models.prediction_analytics import PredictionAnalytics
+from api.schemas.prediction_mongo import PredictionResponse, PredictionPartialResponse
+from api.schemas.prediction_analytics import (
+    PositiveRateResponse,
+    ScoreBucketResponse,
+    SummaryRefreshResponse
+)
+
+router = APIRouter(
+    prefix="/predictions/analytics",
+    tags=["Prediction Analytics (MongoDB)"]
+)
+
+
+def get_prediction_analytics(mongo_db: MongoDB = Depends(get_mongo_db)) -> PredictionAnalytics:
+    return PredictionAnalytics(mongo_db)
+
+
+@router.get(
+    "/latest", response_model=List[PredictionPartialResponse], response_model_exclude_unset=True,
+    dependencies=[Depends(admit_interactive)]
+)
+def get_latest_predictions(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    model_name: str = Query(None, description="Filter by model name"),
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. prediction,model_version,timestamp"),
+    analytics: PredictionAnalytics = Depends(get_prediction_analytics)
+):
+    """
+    Get the latest prediction for each patient.
+    """
+    projection, feature_keys = packed_projection(parse_fields(fields, PredictionResponse))
+    try:
+        predictions = analytics.latest_per_patient(model_name, projection, skip, limit)
+        packer = FeaturePacker(analytics.mongo_db)
+        for prediction in predictions:
+            packer.unpack(prediction, feature_keys)
+            prediction["_id"] = str(prediction["_id"])
+        return predictions
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error fetching latest predictions: {str(e)}"
+        )
+
+
+@router.get("/positive-rate", response_model=List[PositiveRateResponse], dependencies=[Depends(admit_interactive)])
+def get_positive_rate(
+    start: datetime = Query(None, description="Only include predictions at or after this time"),
+    end: datetime = Query(None, description="Only include predictions before this time"),
+    model_version: str = Query(None, description="Filter by model version"),
+    materialized: bool = Query(False, description="Read from the materialized daily summary"),
+    analytics: PredictionAnalytics = Depends(get_prediction_analytics)
+):
+    """
+    Get the positive prediction rate per model version per day.
+    """
+    try:
+        if materialized:
+            return analytics.positive_rate_summary(start, end, model_version)
+        return analytics.positive_rate(start, end, model_version)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error computing positive rate: {str(e)}"
+        )
+
+
+@router.get("/score-distribution", response_model=List[ScoreBucketResponse], dependencies=[Depends(admit_interactive)])
+def get_score_distribution(
+    bins: int = Query(10, ge=2, le=100, description="Number of equal-width score buckets"),
+    start: datetime = Query(None, description="Only include predictions at or after this time"),
+    end: datetime = Query(None, description="Only include predictions before this time"),
+    model_version: str = Query(None, description="Filter by model version"),
+    analytics: PredictionAnalytics = Depends(get_prediction_analytics)
+):
+    """
+    Get the distribution of prediction scores.
+    """
+    try:
+        return analytics.score_distribution(bins, start, end, model_version)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error computing score distribution: {str(e)}"
+        )
+
+
+@router.post("/summary/refresh", response_model=SummaryRefreshResponse, dependencies=[Depends(admit_batch)])
+def refresh_summary(analytics: PredictionAnalytics = Depends(get_prediction_analytics)):
+    """
+    Incrementally refresh the materialized daily summary.
+    """
+    try:
+        return analytics.refresh_daily_summary()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error refreshing summary: {str(e)}"
+        )
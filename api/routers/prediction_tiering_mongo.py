@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from api.database import get_mongo_db
+from api.models.mongo_models import MongoDB
+from api.models.prediction_tiering import PredictionTiering
+from api.schemas.prediction_tiering import TieringStatusResponse
+
+router = APIRouter(
+    prefix="/predictions/tiering",
+    tags=["Prediction Tiering (MongoDB)"]
+)
+
+
+@router.get("/status", response_model=TieringStatusResponse)
+def get_tiering_status(mongo_db: MongoDB = Depends(get_mongo_db)):
+    """
+    Get hot/archive set sizes and metrics from the last archival run.
+    """
+    try:
+        return PredictionTiering(mongo_db).status()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error fetching tiering status: {str(e)}"
+        )
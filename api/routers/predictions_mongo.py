@@ -1,15 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
+from datetime import datetime
 from bson import ObjectId
 from bson.errors import InvalidId
 
+from api.bulk import bulk_ingest
+from api.columnar import COLUMNAR_FORMATS, EXPORT_PARQUET_COMPRESSION, PredictionBatcher, iter_columnar
+from api.admission import admit_batch, admit_interactive
 from api.database import get_mongo_db
-from api.models.mongo_models import MongoDB
+from api.dependencies import parse_fields
+from api.export import EXPORT_BATCH_SIZE, NDJSON_MEDIA_TYPE, iter_ndjson
+from api.models.feature_packing import FeaturePacker, packed_projection
+from api.models.mongo_models import MongoDB, insert_documents
+from api.models.prediction_tiering import (
+    PREDICTION_ARCHIVE_TARGET,
+    find_predictions,
+    get_prediction_by_id,
+    iter_predictions
+)
+from api.schemas.bulk import BulkInsertResponse
 from api.schemas.prediction_mongo import (
     PredictionCreate,
     PredictionUpdate,
-    PredictionResponse
+    PredictionResponse,
+    PredictionPartialResponse
 )
+from api.serialization import FAST_JSON, documents_response
 
 router = APIRouter(
     prefix="/predictions",
@@ -17,6 +34,19 @@ router = APIRouter(
 )
 
 
+def archived_reads(
+    include_archived: bool = Query(False, description="Also read from the prediction archive")
+) -> bool:
+    """Only the archive collection is queryable; file and Parquet archives are offline."""
+    if include_archived and PREDICTION_ARCHIVE_TARGET != "collection":
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"include_archived needs PREDICTION_ARCHIVE_TARGET=collection "
+                   f"(archived predictions are in {PREDICTION_ARCHIVE_TARGET} archives)"
+        )
+    return include_archived
+
+
 def validate_object_id(id_str: str) -> ObjectId:
     """Validate and convert string to ObjectId."""
     try:
@@ -28,7 +58,32 @@ def validate_object_id(id_str: str) -> ObjectId:
         )
 
 
-@router.post("/", response_model=PredictionResponse, status_code=status.HTTP_201_CREATED)
+def build_prediction_document(prediction: PredictionCreate, packer: FeaturePacker) -> Dict[str, Any]:
+    """Build the stored document for a new prediction."""
+    prediction_data = prediction.model_dump()
+    prediction_data["timestamp"] = datetime.utcnow()
+    if not prediction_data.get("metadata"):
+        prediction_data["metadata"] = {}
+    return packer.pack(prediction_data)
+
+
+def build_prediction_query(
+    patient_id: Optional[int] = None,
+    model_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the Mongo filter shared by the list and export endpoints."""
+    query = {}
+    if patient_id is not None:
+        query["patient_id"] = patient_id
+    if model_name:
+        query["model_name"] = model_name
+    return query
+
+
+@router.post(
+    "/", response_model=PredictionResponse, status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admit_interactive)]
+)
 def create_prediction(
     prediction: PredictionCreate,
     mongo_db: MongoDB = Depends(get_mongo_db)
@@ -37,17 +92,13 @@ def create_prediction(
     Create a new prediction record.
     """
     try:
-        from datetime import datetime
-        
-        prediction_data = prediction.model_dump()
-        prediction_data["timestamp"] = datetime.utcnow()
-        if not prediction_data.get("metadata"):
-            prediction_data["metadata"] = {}
+        packer = FeaturePacker(mongo_db)
+        prediction_data = build_prediction_document(prediction, packer)
         
         collection = mongo_db.predictions
         result = collection.insert_one(prediction_data)
         
-        created_doc = collection.find_one({"_id": result.inserted_id})
+        created_doc = packer.unpack(collection.find_one({"_id": result.inserted_id}))
         created_doc["_id"] = str(created_doc["_id"])
         
         return created_doc
@@ -58,32 +109,54 @@ def create_prediction(
         )
 
 
-@router.get("/", response_model=List[PredictionResponse])
+@router.post("/bulk", response_model=BulkInsertResponse, dependencies=[Depends(admit_batch)])
+async def bulk_create_predictions(
+    request: Request,
+    mongo_db: MongoDB = Depends(get_mongo_db)
+):
+    """
+    Bulk create prediction records from an NDJSON or JSON array body.
+    Each record is validated as a PredictionCreate; invalid records are
+    reported per line and do not block the rest of the batch.
+    """
+    packer = FeaturePacker(mongo_db)
+    return await bulk_ingest(
+        request.stream(),
+        PredictionCreate,
+        lambda prediction: build_prediction_document(prediction, packer),
+        lambda documents: insert_documents(mongo_db.predictions, documents)
+    )
+
+
+@router.get(
+    "/", response_model=List[PredictionPartialResponse], response_model_exclude_unset=True,
+    dependencies=[Depends(admit_interactive)]
+)
 def get_predictions(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     patient_id: int = Query(None, description="Filter by patient ID"),
     model_name: str = Query(None, description="Filter by model name"),
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. prediction,model_version,timestamp"),
+    include_archived: bool = Depends(archived_reads),
     mongo_db: MongoDB = Depends(get_mongo_db)
 ):
     """
     Get all predictions with pagination and optional filters.
     """
+    projection, feature_keys = packed_projection(parse_fields(fields, PredictionResponse))
     try:
-        collection = mongo_db.predictions
-        
-        query = {}
-        if patient_id is not None:
-            query["patient_id"] = patient_id
-        if model_name:
-            query["model_name"] = model_name
-        
-        cursor = collection.find(query).skip(skip).limit(limit).sort("timestamp", -1)
-        predictions = list(cursor)
+        query = build_prediction_query(patient_id, model_name)
+        predictions = find_predictions(mongo_db, query, projection, skip, limit, include_archived)
         
+        packer = FeaturePacker(mongo_db)
+        for prediction in predictions:
+            packer.unpack(prediction, feature_keys)
+        if FAST_JSON:
+            return documents_response(predictions, PredictionPartialResponse)
+
         for prediction in predictions:
             prediction["_id"] = str(prediction["_id"])
-        
         return predictions
     except Exception as e:
         raise HTTPException(
@@ -92,24 +165,92 @@ def get_predictions(
         )
 
 
-@router.get("/patient/{patient_id}", response_model=List[PredictionResponse])
+@router.get("/export", dependencies=[Depends(admit_batch)])
+def export_predictions(
+    patient_id: int = Query(None, description="Filter by patient ID"),
+    model_name: str = Query(None, description="Filter by model name"),
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=1, le=10000, description="Cursor batch size"),
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. prediction,model_version,timestamp"),
+    include_archived: bool = Depends(archived_reads),
+    format: str = Query(
+        "ndjson", pattern="^(ndjson|arrow|parquet)$", description="ndjson, arrow (IPC stream) or parquet"
+    ),
+    compression: str = Query(
+        EXPORT_PARQUET_COMPRESSION, pattern="^(snappy|zstd|gzip|lz4|none)$", description="Parquet compression"
+    ),
+    mongo_db: MongoDB = Depends(get_mongo_db)
+):
+    """
+    Stream all matching predictions in insertion order
+    (archived ones included, in the same order, when include_archived is set).
+    NDJSON returns documents as stored; arrow and parquet return one typed
+    column per feature in feature_names.pkl order, written in record
+    batches (row groups) of batch_size rows.
+    """
+    query = build_prediction_query(patient_id, model_name)
+    packer = FeaturePacker(mongo_db)
+
+    if format in COLUMNAR_FORMATS:
+        if fields:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="fields is only supported for NDJSON exports"
+            )
+        try:
+            batcher = PredictionBatcher(packer)
+        except RuntimeError as e:
+            raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(e))
+        cursor = iter_predictions(mongo_db, query, batch_size=batch_size, include_archived=include_archived)
+        media_type, extension = COLUMNAR_FORMATS[format]
+        return StreamingResponse(
+            iter_columnar(cursor, batcher, format, batch_size, compression),
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="predictions.{extension}"'}
+        )
+
+    projection, feature_keys = packed_projection(parse_fields(fields, PredictionResponse))
+    cursor = iter_predictions(
+        mongo_db,
+        query,
+        projection,
+        batch_size=batch_size,
+        include_archived=include_archived
+    )
+    return StreamingResponse(
+        iter_ndjson(cursor, transform=lambda doc: packer.unpack(doc, feature_keys)),
+        media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+@router.get(
+    "/patient/{patient_id}", response_model=List[PredictionPartialResponse], response_model_exclude_unset=True,
+    dependencies=[Depends(admit_interactive)]
+)
 def get_predictions_by_patient_id(
     patient_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. prediction,model_version,timestamp"),
+    include_archived: bool = Depends(archived_reads),
     mongo_db: MongoDB = Depends(get_mongo_db)
 ):
     """
     Get all predictions for a specific patient.
     """
+    projection, feature_keys = packed_projection(parse_fields(fields, PredictionResponse))
     try:
-        collection = mongo_db.predictions
-        cursor = collection.find({"patient_id": patient_id}).skip(skip).limit(limit).sort("timestamp", -1)
-        predictions = list(cursor)
+        predictions = find_predictions(
+            mongo_db, {"patient_id": patient_id}, projection, skip, limit, include_archived
+        )
         
+        packer = FeaturePacker(mongo_db)
+        for prediction in predictions:
+            packer.unpack(prediction, feature_keys)
+        if FAST_JSON:
+            return documents_response(predictions, PredictionPartialResponse)
+
         for prediction in predictions:
             prediction["_id"] = str(prediction["_id"])
-        
         return predictions
     except Exception as e:
         raise HTTPException(
@@ -118,15 +259,23 @@ def get_predictions_by_patient_id(
         )
 
 
-@router.get("/{prediction_id}", response_model=PredictionResponse)
-def get_prediction(prediction_id: str, mongo_db: MongoDB = Depends(get_mongo_db)):
+@router.get(
+    "/{prediction_id}", response_model=PredictionPartialResponse, response_model_exclude_unset=True,
+    dependencies=[Depends(admit_interactive)]
+)
+def get_prediction(
+    prediction_id: str,
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. prediction,model_version,timestamp"),
+    include_archived: bool = Depends(archived_reads),
+    mongo_db: MongoDB = Depends(get_mongo_db)
+):
     """
     Get a prediction by ID.
     """
+    projection, feature_keys = packed_projection(parse_fields(fields, PredictionResponse))
     try:
         obj_id = validate_object_id(prediction_id)
-        collection = mongo_db.predictions
-        prediction = collection.find_one({"_id": obj_id})
+        prediction = get_prediction_by_id(mongo_db, obj_id, projection, include_archived)
         
         if not prediction:
             raise HTTPException(
@@ -134,6 +283,7 @@ def get_prediction(prediction_id: str, mongo_db: MongoDB = Depends(get_mongo_db)
                 detail=f"Prediction with ID {prediction_id} not found"
             )
         
+        FeaturePacker(mongo_db).unpack(prediction, feature_keys)
         prediction["_id"] = str(prediction["_id"])
         return prediction
     except HTTPException:
@@ -145,7 +295,7 @@ def get_prediction(prediction_id: str, mongo_db: MongoDB = Depends(get_mongo_db)
         )
 
 
-@router.put("/{prediction_id}", response_model=PredictionResponse)
+@router.put("/{prediction_id}", response_model=PredictionResponse, dependencies=[Depends(admit_interactive)])
 def update_prediction(
     prediction_id: str,
     prediction_update: PredictionUpdate,
@@ -158,7 +308,7 @@ def update_prediction(
         obj_id = validate_object_id(prediction_id)
         collection = mongo_db.predictions
         
-        existing = collection.find_one({"_id": obj_id})
+        existing = collection.find_one({"_id": obj_id}, {"_id": 1})
         if not existing:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -172,12 +322,14 @@ def update_prediction(
                 detail="No fields to update"
             )
         
-        collection.update_one(
-            {"_id": obj_id},
-            {"$set": update_data}
-        )
+        packer = FeaturePacker(mongo_db)
+        set_data, unset_data = packer.update_fields(update_data)
+        update = {"$set": set_data}
+        if unset_data:
+            update["$unset"] = unset_data
+        collection.update_one({"_id": obj_id}, update)
         
-        updated_doc = collection.find_one({"_id": obj_id})
+        updated_doc = packer.unpack(collection.find_one({"_id": obj_id}))
         updated_doc["_id"] = str(updated_doc["_id"])
         
         return updated_doc
@@ -190,7 +342,7 @@ def update_prediction(
         )
 
 
-@router.delete("/{prediction_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{prediction_id}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(admit_interactive)])
 def delete_prediction(prediction_id: str, mongo_db: MongoDB = Depends(get_mongo_db)):
     """
     Delete a prediction by ID.
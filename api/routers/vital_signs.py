@@ -1,24 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import TypeAdapter
+from typing import Any, Dict, List, Optional, Union
 from datetime import datetime
 
-from api.database import get_db
-from api.models.sql_models import Patient, VitalSigns
-from api.schemas.vital_signs import VitalSignsCreate, VitalSignsUpdate, VitalSignsResponse
+from api.bulk import bulk_ingest
+from api.cache import cached_json, invalidate_patient
+from api.database import get_db, get_read_db
+from api.etag import etag_matches, not_modified, patient_etag
+from api.models.patient_latest import refresh_patient_latest
+from api.models.sql_models import Patient, VitalSigns, insert_rows
+from api.schemas.bulk import BulkInsertResponse
+from api.schemas.vital_signs import (
+    VitalSignsCreate,
+    VitalSignsUpdate,
+    VitalSignsResponse,
+    VitalSignsBucketResponse
+)
+from api.serialization import FAST_JSON, adapter_response
+from api.timeseries import AGGREGATES, BUCKETS, downsample_query, in_range
 
 router = APIRouter(
     prefix="/vital-signs",
     tags=["Vital Signs"]
 )
 
+VITAL_SIGNS_FIELDS = (
+    "blood_pressure_systolic",
+    "blood_pressure_diastolic",
+    "heart_rate",
+    "weight_kg",
+    "height_cm",
+    "bmi",
+    "temperature_c",
+)
+
+VITAL_SIGNS_BUCKETS = TypeAdapter(List[VitalSignsBucketResponse])
+VITAL_SIGNS_LIST = TypeAdapter(List[VitalSignsResponse])
+
+
+def build_vital_signs_row(vital_signs: VitalSignsCreate) -> Dict[str, Any]:
+    """Build the column values for a new vital signs row."""
+    vital_data = vital_signs.model_dump()
+    if not vital_data.get("measurement_date"):
+        vital_data["measurement_date"] = datetime.utcnow()
+    return vital_data
+
 
 @router.post("/", response_model=VitalSignsResponse, status_code=status.HTTP_201_CREATED)
-def create_vital_signs(vital_signs: VitalSignsCreate, db: Session = Depends(get_db)):
+async def create_vital_signs(vital_signs: VitalSignsCreate, db: AsyncSession = Depends(get_db)):
     """
     Create vital signs record for a patient.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == vital_signs.patient_id).first()
+    patient = await db.get(Patient, vital_signs.patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -26,17 +61,44 @@ def create_vital_signs(vital_signs: VitalSignsCreate, db: Session = Depends(get_
         )
     
     try:
-        vital_data = vital_signs.model_dump()
-        if not vital_data.get("measurement_date"):
-            vital_data["measurement_date"] = datetime.utcnow()
-        
-        db_vital_signs = VitalSigns(**vital_data)
+        db_vital_signs = VitalSigns(**build_vital_signs_row(vital_signs))
         db.add(db_vital_signs)
-        db.commit()
-        db.refresh(db_vital_signs)
+        await db.flush()
+        await refresh_patient_latest(db, [db_vital_signs.patient_id])
+        await db.commit()
+        await invalidate_patient(db_vital_signs.patient_id, "vital_signs")
+        await db.refresh(db_vital_signs)
         return db_vital_signs
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error creating vital signs: {str(e)}"
+        )
+
+
+@router.post("/bulk", response_model=BulkInsertResponse)
+async def bulk_create_vital_signs(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Bulk create vital signs records from an NDJSON or JSON array body.
+    Patients are checked per batch with one query and all valid rows are
+    committed in a single transaction; invalid rows are reported per line.
+    """
+    patient_ids = set()
+
+    async def insert(rows: List[Dict[str, Any]]):
+        patient_ids.update(row["patient_id"] for row in rows)
+        return await insert_rows(db, VitalSigns, rows)
+
+    try:
+        summary = await bulk_ingest(request.stream(), VitalSignsCreate, build_vital_signs_row, insert)
+        await refresh_patient_latest(db, patient_ids)
+        await db.commit()
+        for patient_id in patient_ids:
+            await invalidate_patient(patient_id, "vital_signs")
+        return summary
+    except Exception as e:
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error creating vital signs: {str(e)}"
@@ -44,47 +106,81 @@ def create_vital_signs(vital_signs: VitalSignsCreate, db: Session = Depends(get_
 
 
 @router.get("/", response_model=List[VitalSignsResponse])
-def get_vital_signs(
+async def get_vital_signs(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     patient_id: int = Query(None, description="Filter by patient ID"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all vital signs with pagination. Optionally filter by patient_id.
     """
-    query = db.query(VitalSigns)
+    query = select(VitalSigns)
     if patient_id:
-        query = query.filter(VitalSigns.patient_id == patient_id)
+        query = query.where(VitalSigns.patient_id == patient_id)
     
-    vital_signs = query.offset(skip).limit(limit).all()
+    result = await db.execute(query.offset(skip).limit(limit))
+    vital_signs = result.scalars().all()
+    if FAST_JSON:
+        return adapter_response(VITAL_SIGNS_LIST, vital_signs)
     return vital_signs
 
 
-@router.get("/patient/{patient_id}", response_model=List[VitalSignsResponse])
-def get_patient_vital_signs(patient_id: int, db: Session = Depends(get_db)):
+@router.get("/patient/{patient_id}", response_model=Union[List[VitalSignsResponse], List[VitalSignsBucketResponse]])
+async def get_patient_vital_signs(
+    patient_id: int,
+    request: Request,
+    from_: Optional[datetime] = Query(None, alias="from", description="Only rows at or after this time"),
+    to: Optional[datetime] = Query(None, description="Only rows before this time"),
+    bucket: Optional[str] = Query(
+        None, pattern=f"^({'|'.join(BUCKETS)})$", description="Downsample into hour or day buckets"
+    ),
+    agg: str = Query("avg", pattern=f"^({'|'.join(AGGREGATES)})$", description="Per-bucket aggregate"),
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    Get all vital signs for a specific patient.
+    Get vital signs for a specific patient, newest first.
+    Optionally limited to [from, to), or downsampled in SQL into one row per
+    hour/day bucket (oldest first) using min/max/avg/last.
     """
-    patient = db.query(Patient).filter(Patient.patient_id == patient_id).first()
-    if not patient:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Patient with ID {patient_id} not found"
+    params = (from_, to, bucket, bucket and agg)
+    etag = await patient_etag(db, patient_id, [VitalSigns], params)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    async def load():
+        patient = await db.get(Patient, patient_id)
+        if not patient:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Patient with ID {patient_id} not found"
+            )
+
+        if bucket:
+            query = downsample_query(
+                VitalSigns, VitalSigns.measurement_date, VitalSigns.vital_id, VITAL_SIGNS_FIELDS,
+                patient_id, bucket, agg, db.bind.dialect.name, from_, to
+            )
+            result = await db.execute(query)
+            return [dict(row) for row in result.mappings()]
+
+        query = select(VitalSigns).where(VitalSigns.patient_id == patient_id)
+        result = await db.execute(
+            in_range(query, VitalSigns.measurement_date, from_, to).order_by(VitalSigns.measurement_date.desc())
         )
-    
-    vital_signs = db.query(VitalSigns).filter(
-        VitalSigns.patient_id == patient_id
-    ).all()
-    return vital_signs
+        return result.scalars().all()
+
+    route = "vital_signs:" + ":".join(map(str, params))
+    adapter = VITAL_SIGNS_BUCKETS if bucket else VITAL_SIGNS_LIST
+    return await cached_json(route, patient_id, ("patient", "vital_signs"), load, adapter, etag=etag)
 
 
 @router.get("/{vital_id}", response_model=VitalSignsResponse)
-def get_vital_signs_by_id(vital_id: int, db: Session = Depends(get_db)):
+async def get_vital_signs_by_id(vital_id: int, db: AsyncSession = Depends(get_read_db)):
     """
     Get vital signs by ID.
     """
-    vital_signs = db.query(VitalSigns).filter(VitalSigns.vital_id == vital_id).first()
+    vital_signs = await db.get(VitalSigns, vital_id)
     if not vital_signs:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -94,15 +190,15 @@ def get_vital_signs_by_id(vital_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/{vital_id}", response_model=VitalSignsResponse)
-def update_vital_signs(
+async def update_vital_signs(
     vital_id: int,
     vital_signs_update: VitalSignsUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update vital signs by ID.
     """
-    vital_signs = db.query(VitalSigns).filter(VitalSigns.vital_id == vital_id).first()
+    vital_signs = await db.get(VitalSigns, vital_id)
     if not vital_signs:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,11 +210,14 @@ def update_vital_signs(
         for field, value in update_data.items():
             setattr(vital_signs, field, value)
         
-        db.commit()
-        db.refresh(vital_signs)
+        await db.flush()
+        await refresh_patient_latest(db, [vital_signs.patient_id])
+        await db.commit()
+        await invalidate_patient(vital_signs.patient_id, "vital_signs")
+        await db.refresh(vital_signs)
         return vital_signs
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error updating vital signs: {str(e)}"
@@ -126,11 +225,11 @@ def update_vital_signs(
 
 
 @router.delete("/{vital_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_vital_signs(vital_id: int, db: Session = Depends(get_db)):
+async def delete_vital_signs(vital_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete vital signs by ID.
     """
-    vital_signs = db.query(VitalSigns).filter(VitalSigns.vital_id == vital_id).first()
+    vital_signs = await db.get(VitalSigns, vital_id)
     if not vital_signs:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -138,11 +237,14 @@ def delete_vital_signs(vital_id: int, db: Session = Depends(get_db)):
         )
     
     try:
-        db.delete(vital_signs)
-        db.commit()
+        await db.delete(vital_signs)
+        await db.flush()
+        await refresh_patient_latest(db, [vital_signs.patient_id])
+        await db.commit()
+        await invalidate_patient(vital_signs.patient_id, "vital_signs")
         return None
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error deleting vital signs: {str(e)}"
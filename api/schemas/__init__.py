@@ -1,32 +1,62 @@
-from .patient import PatientCreate, PatientUpdate, PatientResponse
+from .patient import (
+    PatientCreate,
+    PatientUpdate,
+    PatientResponse,
+    PatientFullResponse,
+    PatientLatestResponse,
+)
 from .medical_history import MedicalHistoryCreate, MedicalHistoryUpdate, MedicalHistoryResponse
-from .vital_signs import VitalSignsCreate, VitalSignsUpdate, VitalSignsResponse
-from .lab_results import LabResultsCreate, LabResultsUpdate, LabResultsResponse
+from .vital_signs import VitalSignsCreate, VitalSignsUpdate, VitalSignsResponse, VitalSignsBucketResponse
+from .lab_results import LabResultsCreate, LabResultsUpdate, LabResultsResponse, LabResultsBucketResponse
 from .diagnosis import DiagnosisCreate, DiagnosisUpdate, DiagnosisResponse
-from .patient_history_mongo import PatientHistoryCreate, PatientHistoryUpdate, PatientHistoryResponse
-from .prediction_mongo import PredictionCreate, PredictionUpdate, PredictionResponse
+from .patient_history_mongo import (
+    PatientHistoryCreate,
+    PatientHistoryUpdate,
+    PatientHistoryResponse,
+    PatientHistoryPartialResponse,
+)
+from .prediction_mongo import PredictionCreate, PredictionUpdate, PredictionResponse, PredictionPartialResponse
+from .bulk import BulkInsertError, BulkInsertResponse
+from .prediction_analytics import PositiveRateResponse, ScoreBucketResponse, SummaryRefreshResponse
+from .prediction_tiering import TieringRunResponse, TieringStatusResponse
+from .egfr_analytics import EgfrTrendResponse, EgfrCohortResponse
 
 __all__ = [
     "PatientCreate",
     "PatientUpdate",
     "PatientResponse",
+    "PatientFullResponse",
+    "PatientLatestResponse",
     "MedicalHistoryCreate",
     "MedicalHistoryUpdate",
     "MedicalHistoryResponse",
     "VitalSignsCreate",
     "VitalSignsUpdate",
     "VitalSignsResponse",
+    "VitalSignsBucketResponse",
     "LabResultsCreate",
     "LabResultsUpdate",
     "LabResultsResponse",
+    "LabResultsBucketResponse",
     "DiagnosisCreate",
     "DiagnosisUpdate",
     "DiagnosisResponse",
     "PatientHistoryCreate",
     "PatientHistoryUpdate",
     "PatientHistoryResponse",
+    "PatientHistoryPartialResponse",
     "PredictionCreate",
     "PredictionUpdate",
     "PredictionResponse",
+    "PredictionPartialResponse",
+    "BulkInsertError",
+    "BulkInsertResponse",
+    "PositiveRateResponse",
+    "ScoreBucketResponse",
+    "SummaryRefreshResponse",
+    "TieringRunResponse",
+    "TieringStatusResponse",
+    "EgfrTrendResponse",
+    "EgfrCohortResponse",
 ]
 
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class BulkInsertError(BaseModel):
+    line: int = Field(..., description="1-based line (NDJSON) or element (JSON array) number")
+    error: str
+
+
+class BulkInsertResponse(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkInsertError]
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class EgfrTrendResponse(BaseModel):
+    patient_id: int
+    readings: int = Field(..., description="eGFR readings used for the slope")
+    first_egfr: Optional[float] = None
+    last_egfr: Optional[float] = None
+    span_days: float
+    slope_per_year: Optional[float] = Field(None, description="Least-squares eGFR change per year")
+    current_stage: int
+    stage_transitions: int
+    stage_progressions: int = Field(..., description="Transitions to a worse stage")
+    days_in_stage: Dict[str, float] = Field(..., description="Days spent in each CKD stage")
+    rapid_decliner: bool
+
+
+class EgfrCohortResponse(BaseModel):
+    patients: int
+    rapid_decliners: int
+    median_slope_per_year: Optional[float] = None
+    stage_counts: Dict[str, int] = Field(..., description="Patients per current CKD stage")
+    results: List[EgfrTrendResponse]
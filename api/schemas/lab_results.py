@@ -38,3 +38,15 @@ class LabResultsResponse(LabResultsBase):
     class Config:
         from_attributes = True
 
+
+class LabResultsBucketResponse(BaseModel):
+    bucket: datetime = Field(..., description="Start of the hour/day bucket")
+    count: int = Field(..., description="Raw rows in the bucket")
+    serum_creatinine: Optional[float] = None
+    blood_urea_nitrogen: Optional[float] = None
+    sodium_level: Optional[float] = None
+    potassium_level: Optional[float] = None
+    hemoglobin: Optional[float] = None
+    white_blood_cells: Optional[float] = None
+    red_blood_cells: Optional[float] = None
+    egfr: Optional[float] = None
@@ -1,6 +1,11 @@
 from pydantic import BaseModel, EmailStr, Field
 from datetime import date, datetime
-from typing import Optional
+from typing import List, Optional
+
+from .medical_history import MedicalHistoryResponse
+from .vital_signs import VitalSignsResponse
+from .lab_results import LabResultsResponse
+from .diagnosis import DiagnosisResponse
 
 
 class PatientBase(BaseModel):
@@ -35,3 +40,37 @@ class PatientResponse(PatientBase):
     class Config:
         from_attributes = True
 
+
+class PatientFullResponse(PatientResponse):
+    medical_history: Optional[MedicalHistoryResponse] = None
+    vital_signs: List[VitalSignsResponse] = []
+    lab_results: List[LabResultsResponse] = []
+    diagnoses: List[DiagnosisResponse] = []
+
+    class Config:
+        from_attributes = True
+
+
+class PatientLatestResponse(BaseModel):
+    patient_id: int
+    last_test_date: Optional[datetime] = None
+    serum_creatinine: Optional[float] = None
+    blood_urea_nitrogen: Optional[int] = None
+    sodium_level: Optional[int] = None
+    potassium_level: Optional[float] = None
+    hemoglobin: Optional[float] = None
+    white_blood_cells: Optional[float] = None
+    red_blood_cells: Optional[float] = None
+    egfr: Optional[float] = None
+    last_measurement_date: Optional[datetime] = None
+    blood_pressure_systolic: Optional[int] = None
+    blood_pressure_diastolic: Optional[int] = None
+    heart_rate: Optional[int] = None
+    weight_kg: Optional[float] = None
+    height_cm: Optional[float] = None
+    bmi: Optional[float] = None
+    temperature_c: Optional[float] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -28,3 +28,16 @@ class PatientHistoryResponse(BaseModel):
         populate_by_name = True
         from_attributes = True
 
+
+
+class PatientHistoryPartialResponse(BaseModel):
+    id: str = Field(..., alias="_id")
+    patient_id: Optional[int] = None
+    entry_type: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
+    timestamp: Optional[datetime] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class PositiveRateResponse(BaseModel):
+    model_version: Optional[str] = None
+    day: str
+    total: int
+    positives: int
+    positive_rate: float
+
+
+class ScoreBucketResponse(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+
+class SummaryRefreshResponse(BaseModel):
+    refreshed_from: Optional[datetime] = None
+    high_water_mark: datetime
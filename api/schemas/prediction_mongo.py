@@ -34,3 +34,18 @@ class PredictionResponse(BaseModel):
         populate_by_name = True
         from_attributes = True
 
+
+
+class PredictionPartialResponse(BaseModel):
+    id: str = Field(..., alias="_id")
+    patient_id: Optional[int] = None
+    model_name: Optional[str] = None
+    model_version: Optional[str] = None
+    features: Optional[Dict[str, Any]] = None
+    prediction: Optional[Dict[str, Any]] = None
+    timestamp: Optional[datetime] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class TieringRunResponse(BaseModel):
+    cutoff: datetime
+    target: str
+    path: Optional[str] = None
+    moved: int
+    seconds: float
+    docs_per_second: float
+    finished_at: datetime
+
+
+class TieringStatusResponse(BaseModel):
+    hot_count: int
+    hot_size_bytes: int
+    hot_storage_bytes: int
+    hot_index_bytes: int
+    archive_count: int
+    archive_storage_bytes: int
+    last_run: Optional[TieringRunResponse] = None
@@ -36,3 +36,14 @@ class VitalSignsResponse(VitalSignsBase):
     class Config:
         from_attributes = True
 
+
+class VitalSignsBucketResponse(BaseModel):
+    bucket: datetime = Field(..., description="Start of the hour/day bucket")
+    count: int = Field(..., description="Raw rows in the bucket")
+    blood_pressure_systolic: Optional[float] = None
+    blood_pressure_diastolic: Optional[float] = None
+    heart_rate: Optional[float] = None
+    weight_kg: Optional[float] = None
+    height_cm: Optional[float] = None
+    bmi: Optional[float] = None
+    temperature_c: Optional[float] = None
@@ -0,0 +1,69 @@
+import json
+import os
+from typing import Any, Dict, Iterable, Optional, Tuple, Type
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from api.export import json_default
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+load_dotenv()
+
+# Opt-in fast path for hot list endpoints: one TypeAdapter call for SQL rows,
+# Mongo documents encoded directly (no response_model re-validation)
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode to compact JSON bytes, with orjson when installed. ObjectIds
+    become strings and naive datetimes ISO strings, as pydantic emits them.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_orjson_default)
+    return json.dumps(
+        content, default=json_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with `dumps` (orjson when available)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def adapter_response(adapter: TypeAdapter, data: Any, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Validate ORM objects and serialize them to JSON in one pydantic-core call."""
+    body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def response_keys(model: Type[BaseModel]) -> Tuple[str, ...]:
+    """Output keys of a response model (aliases where set, e.g. `_id`)."""
+    return tuple(field.alias or name for name, field in model.model_fields.items())
+
+
+def documents_response(documents: Iterable[Dict[str, Any]], model: Type[BaseModel]) -> FastJSONResponse:
+    """
+    Encode Mongo documents without validating them against `model`. Keys
+    that are not on the model are dropped and missing ones stay absent, as
+    with response_model_exclude_unset; `_id` ObjectIds are handled by the
+    encoder rather than a stringify pass.
+    """
+    keys = response_keys(model)
+    return FastJSONResponse([{key: doc[key] for key in keys if key in doc} for doc in documents])
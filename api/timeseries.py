@@ -0,0 +1,84 @@
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import func, literal_column, select
+
+# Downsampling granularities and per-bucket aggregates for /patient/{id}?bucket=
+BUCKETS = ("hour", "day")
+AGGREGATES = ("min", "max", "avg", "last")
+
+_SQLITE_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00",
+    "day": "%Y-%m-%d 00:00:00",
+}
+
+
+def time_bucket(column: Any, bucket: str, dialect: str) -> Any:
+    """Truncate a timestamp column to the start of its hour/day bucket."""
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unknown bucket: {bucket}")
+    if dialect == "sqlite":
+        return func.strftime(_SQLITE_FORMATS[bucket], column)
+    # Inline the unit so GROUP BY/PARTITION BY see identical expressions
+    return func.date_trunc(literal_column(f"'{bucket}'"), column)
+
+
+def in_range(query: Any, date_column: Any, start: Optional[datetime], end: Optional[datetime]) -> Any:
+    """Apply a [start, end) filter on the date column."""
+    if start is not None:
+        query = query.where(date_column >= start)
+    if end is not None:
+        query = query.where(date_column < end)
+    return query
+
+
+def downsample_query(
+    model: Any,
+    date_column: Any,
+    id_column: Any,
+    fields: Sequence[str],
+    patient_id: int,
+    bucket: str,
+    agg: str,
+    dialect: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Any:
+    """
+    One row per bucket with its start (`bucket`), row count and each field
+    aggregated with min/max/avg, or taken from the bucket's newest row for
+    `last`. Runs entirely in SQL off the (patient_id, date) index.
+    """
+    bucket_column = time_bucket(date_column, bucket, dialect)
+    owned = model.patient_id == patient_id
+
+    if agg == "last":
+        ranked = in_range(
+            select(
+                bucket_column.label("bucket"),
+                func.count().over(partition_by=bucket_column).label("count"),
+                func.row_number().over(
+                    partition_by=bucket_column,
+                    order_by=(date_column.desc(), id_column.desc())
+                ).label("position"),
+                *(getattr(model, field).label(field) for field in fields)
+            ).where(owned),
+            date_column, start, end
+        ).subquery()
+        return (
+            select(ranked.c.bucket, ranked.c["count"], *(ranked.c[field] for field in fields))
+            .where(ranked.c.position == 1)
+            .order_by(ranked.c.bucket)
+        )
+
+    aggregate = getattr(func, agg)
+    query = select(
+        bucket_column.label("bucket"),
+        func.count().label("count"),
+        *(aggregate(getattr(model, field)).label(field) for field in fields)
+    ).where(owned)
+    return (
+        in_range(query, date_column, start, end)
+        .group_by(literal_column("bucket"))
+        .order_by(literal_column("bucket"))
+    )
@@ -0,0 +1,121 @@
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from api.metrics import Gauge
+from api.models.feature_packing import PREDICTION_FEATURE_STORAGE, FeaturePacker
+from api.models.mongo_models import MongoDB
+from api.models.sql_models import async_engine, replica_engines
+
+load_dotenv()
+
+# Run the warm-up steps in the app lifespan, before the server accepts requests
+WARMUP = os.getenv("WARMUP", "true").lower() in ("1", "true", "yes")
+# SQL connections opened per engine (primary and each replica)
+WARMUP_SQL_CONNECTIONS = int(os.getenv("WARMUP_SQL_CONNECTIONS", "2"))
+# GET requests sent through the app in-process, so routing, query compilation
+# and serializers are exercised before real traffic
+WARMUP_PATHS = [path.strip() for path in os.getenv("WARMUP_PATHS", "/api/v1/patients/?limit=1").split(",")
+                if path.strip()]
+# Longest any one step may take before it is reported as failed
+WARMUP_TIMEOUT_SECONDS = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "10"))
+
+WARMUP_STEP_SECONDS = Gauge(
+    "startup_warmup_step_seconds",
+    "Duration of the last run of each startup warm-up step",
+    ("step",)
+)
+WARMUP_STEP_OK = Gauge(
+    "startup_warmup_step_ok",
+    "1 if the startup warm-up step succeeded, else 0",
+    ("step",)
+)
+
+# Step name -> None once it succeeded, else the last error
+warmup_status: Dict[str, Optional[str]] = {}
+_warmup_lock = asyncio.Lock()
+
+
+async def warm_sql(app) -> None:
+    """Open WARMUP_SQL_CONNECTIONS pooled connections on the primary and each replica."""
+
+    async def connect(engine) -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    engines = [async_engine] + replica_engines
+    await asyncio.gather(*(connect(engine) for engine in engines for _ in range(WARMUP_SQL_CONNECTIONS)))
+
+
+async def warm_mongo(app) -> None:
+    """Ping MongoDB so server selection and the first pooled connection happen now."""
+    await run_in_threadpool(MongoDB().client.admin.command, "ping")
+
+
+async def warm_feature_schema(app) -> None:
+    """Load feature_names.pkl (and joblib) and register the packed feature schema."""
+    if PREDICTION_FEATURE_STORAGE == "packed":
+        await run_in_threadpool(FeaturePacker(MongoDB()).current_schema)
+
+
+async def get(app, path: str) -> int:
+    """Send one GET through the ASGI app without a socket; returns the status code."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0), "server": ("warmup", 80),
+    }
+    statuses: List[int] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await app(scope, receive, send)
+    return statuses[0] if statuses else 500
+
+
+async def warm_requests(app) -> None:
+    for path in WARMUP_PATHS:
+        status = await get(app, path)
+        if status >= 400:
+            raise RuntimeError(f"GET {path} returned {status}")
+
+
+WARMUP_STEPS: Tuple[Tuple[str, Callable[..., Awaitable[None]]], ...] = (
+    ("sql", warm_sql),
+    ("mongo", warm_mongo),
+    ("feature_schema", warm_feature_schema),
+    ("requests", warm_requests),
+)
+
+
+async def warm_up(app) -> Dict[str, Optional[str]]:
+    """
+    Run each warm-up step that has not yet succeeded. A failed step is
+    recorded rather than raised, so the app still starts when a backend is
+    down; the readiness check runs the failed steps again.
+    """
+    async with _warmup_lock:
+        for name, step in WARMUP_STEPS:
+            if name in warmup_status and warmup_status[name] is None:
+                continue
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(step(app), WARMUP_TIMEOUT_SECONDS)
+                warmup_status[name] = None
+            except Exception as exc:
+                warmup_status[name] = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+            WARMUP_STEP_SECONDS.set(name, value=time.perf_counter() - start)
+            WARMUP_STEP_OK.set(name, value=0.0 if warmup_status[name] else 1.0)
+    return warmup_status
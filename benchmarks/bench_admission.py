@@ -0,0 +1,134 @@
+"""
+Benchmark: interactive latency under a batch flood, with and without admission control.
+Usage: python -m benchmarks.bench_admission [seconds] [interactive_per_second] [batch_clients]
+
+No database needed. A simulated prediction service with a fixed number of
+workers (like the threadpool) serves open-loop interactive requests from
+many clients next to a batch job running `batch_clients` requests back to
+back. It is run twice:
+  - unprotected: every request queues FIFO for a worker
+  - admission:   requests pass api.admission's per-client token buckets and
+                 priority-aware in-flight limit first; rejected batch
+                 requests back off for their Retry-After
+and reports interactive p50/p99 latency, batch throughput and the admission
+decisions. Exits non-zero if interactive p99 with admission control is over
+the SLO.
+"""
+import asyncio
+import math
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from api.admission import ADMISSION_RETRY_AFTER, BATCH, INTERACTIVE, AdmissionController, RateLimiter, Shed
+
+WORKERS = 8
+INTERACTIVE_SECONDS = 0.01
+BATCH_SECONDS = 0.05
+INTERACTIVE_CLIENTS = 200
+BATCH_RATE_PER_SECOND = 60.0
+SLO_SECONDS = 0.1
+
+
+class Run:
+    def __init__(self, controller: Optional[AdmissionController], limiter: Optional[RateLimiter]):
+        self.controller = controller
+        self.limiter = limiter
+        self.workers = asyncio.Semaphore(WORKERS)
+        self.latencies: List[float] = []
+        self.batch_done = 0
+        self.decisions: Dict[str, Counter] = {INTERACTIVE: Counter(), BATCH: Counter()}
+
+    async def serve(self, seconds: float) -> None:
+        async with self.workers:
+            await asyncio.sleep(seconds)
+
+    async def request(self, priority: str, client: str, seconds: float) -> Optional[float]:
+        """Seconds to back off (the Retry-After header) if rejected, else None."""
+        if self.limiter is not None:
+            retry_after = self.limiter.check(client)
+            if retry_after:
+                self.decisions[priority]["rate_limited"] += 1
+                return math.ceil(retry_after)
+        if self.controller is None:
+            await self.serve(seconds)
+            return None
+        try:
+            await self.controller.acquire(priority)
+        except Shed as exc:
+            self.decisions[priority][exc.reason] += 1
+            return ADMISSION_RETRY_AFTER
+        self.decisions[priority]["admitted"] += 1
+        try:
+            await self.serve(seconds)
+        finally:
+            self.controller.release(priority)
+        return None
+
+    async def interactive(self, rng: random.Random) -> None:
+        start = time.perf_counter()
+        client = f"clinician-{rng.randrange(INTERACTIVE_CLIENTS)}"
+        if await self.request(INTERACTIVE, client, rng.expovariate(1 / INTERACTIVE_SECONDS)) is None:
+            self.latencies.append(time.perf_counter() - start)
+
+    async def batch_worker(self, rng: random.Random, deadline: float) -> None:
+        while time.perf_counter() < deadline:
+            backoff = await self.request(BATCH, "batch-job", rng.expovariate(1 / BATCH_SECONDS))
+            if backoff is None:
+                self.batch_done += 1
+            else:
+                await asyncio.sleep(backoff)
+
+
+async def simulate(run: Run, seconds: float, rate: float, batch_clients: int) -> None:
+    rng = random.Random(7)
+    deadline = time.perf_counter() + seconds
+    batch = [asyncio.ensure_future(run.batch_worker(random.Random(i), deadline)) for i in range(batch_clients)]
+    tasks = []
+    while time.perf_counter() < deadline:
+        tasks.append(asyncio.ensure_future(run.interactive(rng)))
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks, *batch)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return float("nan")
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else values[0]
+
+
+def main(seconds: float, rate: float, batch_clients: int) -> int:
+    print(f"{WORKERS} workers, {rate:.0f} interactive req/s from {INTERACTIVE_CLIENTS} clients, "
+          f"{batch_clients} concurrent batch requests, {seconds:.0f}s per run")
+    p99 = {}
+    for label, controller, limiter in (
+        ("unprotected", None, None),
+        ("admission", AdmissionController(
+            max_in_flight=WORKERS, batch_share=0.5,
+            max_queue={INTERACTIVE: 64, BATCH: 16}, queue_timeout={INTERACTIVE: 0.05, BATCH: 2.0}
+        ), RateLimiter(rate=BATCH_RATE_PER_SECOND, burst=20)),
+    ):
+        run = Run(controller, limiter)
+        asyncio.run(simulate(run, seconds, rate, batch_clients))
+        p50 = percentile(run.latencies, 50) * 1000
+        p99[label] = percentile(run.latencies, 99)
+        print(f"  {label:<12} interactive p50 {p50:7.1f} ms  p99 {p99[label] * 1000:7.1f} ms | "
+              f"batch {run.batch_done / seconds:6.1f} req/s")
+        for priority, counts in run.decisions.items():
+            if counts:
+                print(f"  {'':<12} {priority}: " + ", ".join(f"{k} {v:,}" for k, v in sorted(counts.items())))
+
+    ok = p99["admission"] <= SLO_SECONDS
+    print(f"Interactive p99 with admission control {'within' if ok else 'OVER'} the {SLO_SECONDS * 1000:.0f} ms SLO")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        float(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 200,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 64
+    ))
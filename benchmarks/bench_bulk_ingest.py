@@ -0,0 +1,79 @@
+"""
+Benchmark: single-document inserts vs. the bulk NDJSON ingest path.
+Usage: python -m benchmarks.bench_bulk_ingest [num_docs]
+
+Writes to a throwaway "ckd_benchmark" database on MONGODB_URI.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from api.bulk import bulk_ingest
+from api.models.mongo_models import insert_documents
+from api.routers.patient_history_mongo import build_history_document
+from api.schemas.patient_history_mongo import PatientHistoryCreate
+
+CHUNK_SIZE = 64 * 1024
+
+
+def make_records(count: int):
+    for i in range(count):
+        yield {
+            "patient_id": i % 500,
+            "entry_type": "vitals",
+            "data": {"systolic": 120 + i % 30, "diastolic": 80 + i % 15, "heart_rate": 70 + i % 20},
+            "timestamp": datetime(2024, 1, 1).isoformat()
+        }
+
+
+async def chunked(body: bytes):
+    for start in range(0, len(body), CHUNK_SIZE):
+        yield body[start:start + CHUNK_SIZE]
+
+
+def bench_single(collection, records) -> float:
+    start = time.perf_counter()
+    for record in records:
+        doc = build_history_document(PatientHistoryCreate.model_validate(record))
+        result = collection.insert_one(doc)
+        collection.find_one({"_id": result.inserted_id})
+    return time.perf_counter() - start
+
+
+def bench_bulk(collection, records) -> float:
+    body = "\n".join(json.dumps(record) for record in records).encode("utf-8")
+    start = time.perf_counter()
+    summary = asyncio.run(bulk_ingest(
+        chunked(body),
+        PatientHistoryCreate,
+        lambda history: build_history_document(history, source="bulk"),
+        lambda documents: insert_documents(collection, documents)
+    ))
+    elapsed = time.perf_counter() - start
+    assert summary["inserted"] == len(records), summary
+    return elapsed
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    collection = client.get_database("ckd_benchmark").patient_history
+    records = list(make_records(count))
+
+    collection.drop()
+    single_count = min(count, 2000)
+    single = bench_single(collection, records[:single_count])
+    collection.drop()
+    bulk = bench_bulk(collection, records)
+    collection.drop()
+
+    print(f"Single insert_one + find_one: {single_count / single / 1000:8.2f}k docs/s ({single_count} docs)")
+    print(f"Bulk NDJSON insert_many:      {count / bulk / 1000:8.2f}k docs/s ({count} docs)")
+    client.close()
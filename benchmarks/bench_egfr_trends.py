@@ -0,0 +1,74 @@
+"""
+Benchmark + correctness check for the vectorized eGFR trend analytics.
+Usage: python -m benchmarks.bench_egfr_trends [patients] [readings]
+
+Generates a synthetic cohort in memory (no database), computes per-patient
+slopes and stage progression with api.models.egfr_analytics.compute_trends,
+and compares the slopes and timing against a per-patient np.polyfit loop.
+Exits non-zero if any slope disagrees.
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from api.models.egfr_analytics import DAYS_PER_YEAR, compute_trends, to_series
+
+
+def synthetic_rows(patients: int, readings: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    start = datetime(2020, 1, 1)
+    rows = []
+    for patient_id in range(1, patients + 1):
+        count = int(rng.integers(1, 2 * readings))
+        baseline, slope = rng.uniform(15, 110), rng.normal(-2, 4)
+        for day in np.sort(rng.uniform(0, 4 * 365, count)):
+            egfr = max(baseline + slope * day / DAYS_PER_YEAR + rng.normal(0, 2), 1.0)
+            rows.append((patient_id, start + timedelta(days=float(day)), egfr, None))
+        if rng.random() < 0.2:
+            rows.append((patient_id, start + timedelta(days=4 * 365), None, int(rng.integers(1, 6))))
+    rows.sort(key=lambda row: (row[0], row[1]))
+    return rows
+
+
+def loop_slopes(series) -> dict:
+    """Reference: one np.polyfit per patient."""
+    slopes = {}
+    for patient_id in np.unique(series.patient_id):
+        rows = (series.patient_id == patient_id) & np.isfinite(series.egfr)
+        if rows.sum() >= 2:
+            slopes[int(patient_id)] = np.polyfit(series.days[rows] / DAYS_PER_YEAR, series.egfr[rows], 1)[0]
+    return slopes
+
+
+def main(patients: int, readings: int) -> int:
+    series = to_series(synthetic_rows(patients, readings))
+    print(f"{patients:,} patients, {len(series.patient_id):,} readings")
+
+    start = time.perf_counter()
+    trends = compute_trends(series)
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = loop_slopes(series)
+    looped = time.perf_counter() - start
+
+    slopes = dict(zip(trends["patient_id"].tolist(), trends["slope_per_year"].tolist()))
+    mismatches = [pid for pid, slope in expected.items() if not np.isclose(slopes[pid], slope, atol=1e-6)]
+    for pid in mismatches[:10]:
+        print(f"FAIL patient {pid}: slope {slopes[pid]:.4f}, expected {expected[pid]:.4f}")
+
+    print(f"  vectorized: {vectorized * 1000:8.1f} ms")
+    print(f"  polyfit loop: {looped * 1000:6.1f} ms ({looped / vectorized:.0f}x slower)")
+    print(f"  rapid decliners: {int(trends['rapid_decliner'].sum()):,}, "
+          f"stage progressions: {int(trends['stage_progressions'].sum()):,}")
+    print(f"Slope check: {'OK' if not mismatches else f'{len(mismatches)} mismatches'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    ))
@@ -0,0 +1,135 @@
+"""
+Benchmark + invalidation check for conditional GETs (ETag / If-None-Match).
+Usage: python -m benchmarks.bench_etag_polling [polls]
+
+Drives the app in-process against a temporary SQLite database. It checks that
+each ETag changes after a write to the data it covers, then compares bytes
+transferred and requests/sec for clients polling with and without
+If-None-Match. Exits non-zero if an invalidation check fails.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Point the app at a throwaway database before it is imported
+_DB_PATH = os.path.join(tempfile.mkdtemp(), "etag.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.pop("READ_REPLICA_URLS", None)
+
+from datetime import date, datetime, timedelta  # noqa: E402
+
+from api.database import SessionLocal  # noqa: E402
+from api.main import app  # noqa: E402
+from api.models.sql_models import Base, Patient, LabResults, VitalSigns, engine  # noqa: E402
+
+Headers = Dict[str, str]
+
+
+async def call(method: str, path: str, headers: Optional[Headers] = None,
+               body: bytes = b"") -> Tuple[int, Headers, bytes]:
+    """Minimal in-process ASGI request."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "path": path,
+        "raw_path": path.encode(), "query_string": query.encode(), "scheme": "http",
+        "server": ("test", 80), "client": ("127.0.0.1", 1234), "root_path": "",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+                   + [(b"content-type", b"application/json")],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    response: Dict = {"body": b""}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode().lower(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+
+def seed(patients: int, readings: int) -> None:
+    Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with SessionLocal() as db:
+        for pid in range(1, patients + 1):
+            db.add(Patient(patient_id=pid, first_name="Poll", last_name=str(pid),
+                           date_of_birth=date(1970, 1, 1), gender="F"))
+            for i in range(readings):
+                when = start + timedelta(days=i)
+                db.add(LabResults(patient_id=pid, test_date=when, serum_creatinine=1.1, egfr=80 - i % 30))
+                db.add(VitalSigns(patient_id=pid, measurement_date=when, heart_rate=70, bmi=24.5))
+        db.commit()
+
+
+async def check_invalidation() -> List[str]:
+    failures = []
+
+    async def etag(path: str) -> str:
+        status, headers, _ = await call("GET", path)
+        assert status == 200, (path, status)
+        return headers["etag"]
+
+    async def expect_change(label: str, path: str, method: str, write_path: str, body: bytes) -> None:
+        before = await etag(path)
+        status, _, _ = await call("GET", path, {"If-None-Match": before})
+        if status != 304:
+            failures.append(f"{label}: unchanged resource returned {status}, expected 304")
+        status, _, _ = await call(method, write_path, body=body)
+        assert status < 400, (write_path, status)
+        status, headers, _ = await call("GET", path, {"If-None-Match": before})
+        if status != 200 or headers.get("etag") == before:
+            failures.append(f"{label}: stale ETag still matched after {method} {write_path}")
+
+    await expect_change("patient", "/api/v1/patients/1", "PUT", "/api/v1/patients/1",
+                        b'{"address": "12 Kigali Road"}')
+    await expect_change("patient list", "/api/v1/patients/?limit=50", "PUT", "/api/v1/patients/2",
+                        b'{"contact_number": "0788000000"}')
+    await expect_change("lab results", "/api/v1/lab-results/patient/1", "POST", "/api/v1/lab-results/",
+                        b'{"patient_id": 1, "serum_creatinine": 1.4}')
+    await expect_change("lab results update", "/api/v1/lab-results/patient/1", "PUT", "/api/v1/lab-results/1",
+                        b'{"egfr": 55.0}')
+    await expect_change("full record", "/api/v1/patients/1/full", "DELETE", "/api/v1/vital-signs/1", b"")
+    return failures
+
+
+async def poll(path: str, polls: int, conditional: bool) -> Tuple[int, float]:
+    etag = None
+    transferred = 0
+    start = time.perf_counter()
+    for _ in range(polls):
+        headers = {"If-None-Match": etag} if conditional and etag else {}
+        status, response_headers, body = await call("GET", path, headers)
+        etag = response_headers.get("etag", etag)
+        transferred += len(body) + sum(len(k) + len(v) + 4 for k, v in response_headers.items())
+    return transferred, polls / (time.perf_counter() - start)
+
+
+async def main(polls: int) -> int:
+    seed(patients=100, readings=50)
+    failures = await check_invalidation()
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"Invalidation checks: {'OK' if not failures else f'{len(failures)} failed'}")
+
+    for path in ("/api/v1/patients/?limit=100", "/api/v1/patients/3/full", "/api/v1/lab-results/patient/3"):
+        full_bytes, full_rate = await poll(path, polls, conditional=False)
+        cond_bytes, cond_rate = await poll(path, polls, conditional=True)
+        print(f"{path}")
+        print(f"  unconditional: {full_bytes / polls:10,.0f} B/poll {full_rate:8,.0f} req/s")
+        print(f"  If-None-Match: {cond_bytes / polls:10,.0f} B/poll {cond_rate:8,.0f} req/s "
+              f"({100 * (1 - cond_bytes / full_bytes):.1f}% less data)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)))
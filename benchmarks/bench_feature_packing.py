@@ -0,0 +1,92 @@
+"""
+Benchmark: prediction documents with a features dict vs. packed float32 vectors.
+Usage: python -m benchmarks.bench_feature_packing [num_docs]
+
+Uses rows from Chronic_Kidney_Disease_data.csv as features and writes to a
+throwaway "ckd_benchmark" database on MONGODB_URI.
+"""
+import csv
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import bson
+import joblib
+from dotenv import load_dotenv
+from pymongo import MongoClient
+
+from api.models.feature_packing import FEATURE_NAMES_PATH, FeaturePacker
+
+DATA_PATH = "Chronic_Kidney_Disease_data.csv"
+
+
+class BenchDB:
+    def __init__(self, db):
+        self.feature_schemas = db.feature_schemas
+
+
+def load_features(names):
+    rows = []
+    with open(DATA_PATH, newline="") as data_file:
+        for row in csv.DictReader(data_file):
+            rows.append({
+                name: float(row[name]) if name != "DoctorInCharge" else 1.0
+                for name in names
+            })
+    return rows
+
+
+def make_docs(rows, count: int, packer: FeaturePacker):
+    for i in range(count):
+        yield packer.pack({
+            "patient_id": i,
+            "model_name": "random_forest",
+            "model_version": "1.0",
+            "features": dict(rows[i % len(rows)]),
+            "prediction": {"label": i % 2, "probability": (i % 100) / 100},
+            "timestamp": datetime.utcnow(),
+            "metadata": {}
+        })
+
+
+def insert(collection, docs, batch_size: int = 1000) -> float:
+    start = time.perf_counter()
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            collection.insert_many(batch)
+            batch = []
+    if batch:
+        collection.insert_many(batch)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    names = list(joblib.load(FEATURE_NAMES_PATH))
+    rows = load_features(names)
+
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    db = client.get_database("ckd_benchmark")
+
+    print(f"{count} predictions, {len(names)} features")
+    print(f"{'format':<8}{'avg doc B':>11}{'insert docs/s':>15}{'data MB':>10}{'storage MB':>12}")
+    for storage in ("dict", "packed"):
+        packer = FeaturePacker(BenchDB(db), storage=storage)
+        collection = db[f"predictions_{storage}"]
+        collection.drop()
+
+        sample = list(make_docs(rows, 1000, packer))
+        doc_size = statistics.mean(len(bson.encode(doc)) for doc in sample)
+        elapsed = insert(collection, make_docs(rows, count, packer))
+        stats = db.command("collStats", collection.name)
+        print(f"{storage:<8}{doc_size:>11.0f}{count / elapsed:>15.0f}"
+              f"{stats['size'] / 1e6:>10.1f}{stats['storageSize'] / 1e6:>12.1f}")
+        collection.drop()
+
+    db.feature_schemas.drop()
+    client.close()
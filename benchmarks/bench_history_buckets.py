@@ -0,0 +1,100 @@
+"""
+Benchmark: one-document-per-entry vs. bucketed patient history storage.
+Usage: python -m benchmarks.bench_history_buckets [num_patients] [entries_per_patient]
+
+Writes to a throwaway "ckd_benchmark" database on MONGODB_URI and reports
+collection/index size and per-patient read latency for both layouts.
+"""
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, ASCENDING, DESCENDING
+
+from api.models.mongo_models import BucketedHistoryStore, DocumentHistoryStore
+
+
+class BenchDB:
+    def __init__(self, db):
+        self.patient_history = db.patient_history
+        self.patient_history_buckets = db.patient_history_buckets
+
+
+def make_entries(num_patients: int, per_patient: int):
+    start = datetime(2022, 1, 1)
+    for i in range(per_patient):
+        timestamp = start + timedelta(minutes=15 * i)
+        for patient_id in range(num_patients):
+            yield {
+                "patient_id": patient_id,
+                "entry_type": "vitals",
+                "data": {"systolic": 110 + i % 40, "diastolic": 70 + i % 20, "heart_rate": 60 + i % 30},
+                "timestamp": timestamp,
+                "metadata": {"source": "benchmark", "created_at": timestamp}
+            }
+
+
+def load(store, entries, batch_size: int = 5000) -> float:
+    start = time.perf_counter()
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            store.insert_many(batch)
+            batch = []
+    if batch:
+        store.insert_many(batch)
+    return time.perf_counter() - start
+
+
+def read_latency(store, num_patients: int, runs: int = 200) -> float:
+    samples = []
+    for i in range(runs):
+        start = time.perf_counter()
+        store.find({"patient_id": i % num_patients}, None, 0, 100)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def sizes(db, name: str):
+    stats = db.command("collStats", name)
+    return stats["count"], stats["storageSize"], stats["totalIndexSize"]
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    num_patients = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    per_patient = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    client = MongoClient(os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    db = client.get_database("ckd_benchmark")
+    db.patient_history.drop()
+    db.patient_history_buckets.drop()
+    db.patient_history.create_index([("patient_id", ASCENDING), ("timestamp", DESCENDING)])
+
+    bench_db = BenchDB(db)
+    document_store = DocumentHistoryStore(bench_db)
+    bucketed_store = BucketedHistoryStore(bench_db)
+    bucketed_store.ensure_indexes()
+
+    results = []
+    for name, store, collection in [
+        ("document", document_store, "patient_history"),
+        ("bucketed", bucketed_store, "patient_history_buckets"),
+    ]:
+        load_time = load(store, make_entries(num_patients, per_patient))
+        count, storage, index = sizes(db, collection)
+        latency = read_latency(store, num_patients)
+        results.append((name, load_time, count, storage, index, latency))
+
+    print(f"{num_patients} patients x {per_patient} entries")
+    print(f"{'layout':<10}{'load s':>9}{'docs':>10}{'storage MB':>12}{'index MB':>10}{'p50 read ms':>13}")
+    for name, load_time, count, storage, index, latency in results:
+        print(f"{name:<10}{load_time:>9.1f}{count:>10}{storage / 1e6:>12.2f}{index / 1e6:>10.2f}{latency:>13.2f}")
+
+    db.patient_history.drop()
+    db.patient_history_buckets.drop()
+    client.close()
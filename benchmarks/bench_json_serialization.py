@@ -0,0 +1,130 @@
+"""
+Benchmark: response serialization per 1000 documents, default vs FAST_JSON path.
+Usage: python -m benchmarks.bench_json_serialization [documents] [rounds]
+
+No database needed. For synthetic prediction documents (ObjectId, datetime,
+features dict) and lab-result ORM-like rows it times:
+  - default: what FastAPI does with response_model (stringify `_id` loop,
+    TypeAdapter validate, dump to JSON-able Python, stdlib json.dumps)
+  - fast:    api.serialization (documents_response / adapter_response)
+and checks that both produce the same JSON. Install orjson to compare the
+orjson and stdlib encoders. Exits non-zero if the outputs differ.
+"""
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from api import serialization
+from api.schemas.lab_results import LabResultsResponse
+from api.schemas.prediction_mongo import PredictionPartialResponse
+from api.serialization import adapter_response, documents_response
+
+FEATURES = ("Age", "BMI", "SystolicBP", "DiastolicBP", "FastingBloodSugar", "HbA1c", "SerumCreatinine",
+            "BUNLevels", "GFR", "ProteinInUrine", "ACR", "SerumElectrolytesSodium", "HemoglobinLevels")
+
+PREDICTIONS = TypeAdapter(List[PredictionPartialResponse])
+LAB_RESULTS = TypeAdapter(List[LabResultsResponse])
+
+
+def predictions(count: int, rng: random.Random) -> List[dict]:
+    start = datetime(2024, 1, 1)
+    return [{
+        "_id": ObjectId(),
+        "patient_id": rng.randint(1, 5000),
+        "model_name": "ckd_random_forest",
+        "model_version": "1.2",
+        "features": {name: round(rng.uniform(0, 200), 2) for name in FEATURES},
+        "prediction": {"label": rng.randint(0, 1), "probability": round(rng.random(), 4)},
+        "timestamp": start + timedelta(seconds=rng.randrange(10 ** 7)),
+        "metadata": {"source": "benchmark"},
+    } for _ in range(count)]
+
+
+def lab_rows(count: int, rng: random.Random) -> List[SimpleNamespace]:
+    start = datetime(2024, 1, 1)
+    return [SimpleNamespace(
+        lab_id=i, patient_id=rng.randint(1, 5000), test_date=start + timedelta(hours=i),
+        serum_creatinine=round(rng.uniform(0.5, 6), 2), blood_urea_nitrogen=rng.randint(5, 80),
+        sodium_level=rng.randint(130, 150), potassium_level=round(rng.uniform(3, 6), 2),
+        hemoglobin=round(rng.uniform(8, 17), 1), white_blood_cells=None, red_blood_cells=None,
+        egfr=round(rng.uniform(10, 110), 1)
+    ) for i in range(1, count + 1)]
+
+
+def response_model_body(adapter: TypeAdapter, content: Any, **dump: Any) -> bytes:
+    """FastAPI's response_model path: validate, dump to JSON-able data, json.dumps."""
+    value = adapter.validate_python(content, from_attributes=True)
+    data = adapter.dump_python(value, mode="json", by_alias=True, **dump)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def default_predictions(documents: List[dict]) -> bytes:
+    for doc in documents:
+        doc["_id"] = str(doc["_id"])
+    return response_model_body(PREDICTIONS, documents, exclude_unset=True)
+
+
+def time_per_1000(build: Callable[[], Any], run: Callable[[Any], bytes], count: int, rounds: int):
+    timings = []
+    body = b""
+    for _ in range(rounds):
+        data = build()
+        start = time.perf_counter()
+        body = run(data)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000 * 1000 / count, body
+
+
+def main(count: int, rounds: int) -> int:
+    rng = random.Random(42)
+    docs = predictions(count, rng)
+    rows = lab_rows(count, rng)
+
+    def copies() -> List[dict]:
+        # Fresh documents per round, since the default path stringifies `_id` in place
+        return [dict(doc) for doc in docs]
+
+    encoders = [("stdlib", None)]
+    if serialization.orjson is not None:
+        encoders.append(("orjson", serialization.orjson))
+    else:
+        print("orjson not installed; fast path uses the stdlib encoder (pip install orjson)")
+
+    mismatches = 0
+    print(f"{count:,} documents, median of {rounds} rounds, ms per 1000 documents")
+    for label, default, fast in (
+        ("predictions", default_predictions,
+         lambda d: documents_response(d, PredictionPartialResponse).body),
+        ("lab results", lambda r: response_model_body(LAB_RESULTS, r),
+         lambda r: adapter_response(LAB_RESULTS, r).body),
+    ):
+        build = copies if label == "predictions" else (lambda: rows)
+        before, expected = time_per_1000(build, default, count, rounds)
+        print(f"  {label:<12} response_model + json: {before:8.2f}")
+        # SQL rows are encoded by pydantic-core whichever JSON library is installed
+        for name, module in encoders if label == "predictions" else [("pydantic", serialization.orjson)]:
+            serialization.orjson = module
+            after, body = time_per_1000(build, fast, count, rounds)
+            same = json.loads(body) == json.loads(expected)
+            mismatches += not same
+            print(f"  {label:<12} fast path ({name}):{'':<{9 - len(name)}}{after:8.2f} "
+                  f"({before / after:.1f}x){'' if same else '  OUTPUT DIFFERS'}")
+        serialization.orjson = encoders[-1][1]
+
+    print(f"Output check: {'OK' if not mismatches else f'{mismatches} mismatches'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    ))
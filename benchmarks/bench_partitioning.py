@@ -0,0 +1,160 @@
+"""
+Benchmark: plain vs monthly range-partitioned time-series table (PostgreSQL).
+Usage: python -m benchmarks.bench_partitioning [rows] [months]
+
+Builds both layouts of a lab-style readings table with the same synthetic
+rows in a throwaway "partition_bench" schema on DATABASE_URL, then compares:
+partitions touched and latency of per-patient date-range reads, size of
+the (patient_id, date) index that writes maintain, and retention (DELETE of
+the oldest month vs DETACH + DROP of its partition). Exits non-zero if a
+range read on the partitioned table does not prune partitions.
+"""
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from api.models.partitions import add_months, month_start, partition_name
+from api.models.sql_models import engine
+
+SCHEMA = "partition_bench"
+PATIENTS = 20000
+QUERIES = 200
+
+
+def create_tables(conn, first_month, months: int) -> None:
+    conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    conn.execute(text(f"SET search_path TO {SCHEMA}"))
+    columns = "id bigserial, patient_id integer NOT NULL, test_date timestamp NOT NULL, egfr double precision"
+    conn.execute(text(f"CREATE TABLE plain ({columns}, PRIMARY KEY (id))"))
+    conn.execute(text(f"CREATE TABLE part ({columns}, PRIMARY KEY (id, test_date)) PARTITION BY RANGE (test_date)"))
+    for offset in range(months):
+        month = add_months(first_month, offset)
+        conn.execute(text(
+            f"CREATE TABLE {partition_name('part', month)} PARTITION OF part "
+            f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+        ))
+    conn.execute(text("CREATE TABLE part_default PARTITION OF part DEFAULT"))
+
+
+def load(conn, rows: int, first_month, last_month) -> float:
+    start = time.perf_counter()
+    conn.execute(
+        text(
+            "INSERT INTO plain (patient_id, test_date, egfr) "
+            "SELECT 1 + (random() * (:patients - 1))::int, "
+            "       CAST(:first AS timestamp) + random() * (CAST(:last AS timestamp) - CAST(:first AS timestamp)), "
+            "       15 + random() * 90 "
+            "FROM generate_series(1, :rows)"
+        ),
+        {
+            "patients": PATIENTS,
+            "first": datetime.combine(first_month, datetime.min.time()),
+            "last": datetime.combine(last_month, datetime.min.time()),
+            "rows": rows
+        }
+    )
+    conn.execute(text("INSERT INTO part SELECT * FROM plain"))
+    for table in ("plain", "part"):
+        conn.execute(text(f"CREATE INDEX ix_{table}_patient_tested ON {table} (patient_id, test_date DESC)"))
+        conn.execute(text(f"ANALYZE {table}"))
+    return time.perf_counter() - start
+
+
+def range_read(conn, table: str, now: datetime, days: int):
+    """Median latency and partitions touched for newest-first per-patient reads."""
+    query = (
+        f"SELECT * FROM {table} WHERE patient_id = :patient_id "
+        "AND test_date >= :start AND test_date < :end ORDER BY test_date DESC"
+    )
+    params = {"patient_id": 1, "start": now - timedelta(days=days), "end": now}
+    plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    def relations(node):
+        if "Relation Name" in node:
+            yield node["Relation Name"]
+        for child in node.get("Plans", []):
+            yield from relations(child)
+
+    touched = len(set(relations(plan[0]["Plan"])))
+    timings = []
+    for patient_id in range(1, PATIENTS, PATIENTS // QUERIES):
+        params["patient_id"] = patient_id
+        start = time.perf_counter()
+        conn.execute(text(query), params).all()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, touched
+
+
+def index_sizes(conn) -> tuple:
+    """Plain index size, partitioned index total and largest per-partition index."""
+    plain = conn.execute(text("SELECT pg_relation_size('ix_plain_patient_tested')")).scalar()
+    total, largest = conn.execute(text(
+        "SELECT SUM(pg_relation_size(relid)), MAX(pg_relation_size(relid)) "
+        "FROM pg_partition_tree('ix_part_patient_tested') WHERE isleaf"
+    )).one()
+    return plain / 2 ** 20, total / 2 ** 20, largest / 2 ** 20
+
+
+def retention(conn, first_month) -> tuple:
+    cutoff = add_months(first_month, 1)
+    start = time.perf_counter()
+    deleted = conn.execute(text("DELETE FROM plain WHERE test_date < :cutoff"), {"cutoff": cutoff}).rowcount
+    delete_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    name = partition_name("part", first_month)
+    conn.execute(text(f"ALTER TABLE part DETACH PARTITION {name}"))
+    conn.execute(text(f"DROP TABLE {name}"))
+    return deleted, delete_seconds, time.perf_counter() - start
+
+
+def main(rows: int, months: int) -> int:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("The partitioning benchmark needs PostgreSQL; set DATABASE_URL accordingly.")
+
+    now = datetime.utcnow()
+    last_month = add_months(month_start(now.date()), 1)
+    first_month = add_months(last_month, -months)
+    failures = 0
+    with engine.connect() as conn:
+        try:
+            create_tables(conn, first_month, months)
+            elapsed = load(conn, rows, first_month, last_month)
+            conn.commit()
+            print(f"Loaded {rows:,} rows into each table over {months} monthly partitions in {elapsed:.1f}s")
+            plain_mb, total_mb, largest_mb = index_sizes(conn)
+            print(f"  (patient_id, date) index: plain {plain_mb:,.1f} MB | partitioned {total_mb:,.1f} MB "
+                  f"total, {largest_mb:,.1f} MB largest partition")
+
+            for days in (7, 30, 90):
+                plain_ms, _ = range_read(conn, "plain", now, days)
+                part_ms, touched = range_read(conn, "part", now, days)
+                pruned = touched < months + 1
+                failures += not pruned
+                print(f"  last {days:>2} days: plain {plain_ms:6.2f} ms | partitioned {part_ms:6.2f} ms, "
+                      f"{touched}/{months + 1} partitions{'' if pruned else ' NO PRUNING'}")
+
+            deleted, delete_seconds, detach_seconds = retention(conn, first_month)
+            conn.commit()
+            print(f"  retention of oldest month ({deleted:,} rows): DELETE {delete_seconds * 1000:,.0f} ms | "
+                  f"DETACH + DROP {detach_seconds * 1000:,.0f} ms")
+        finally:
+            conn.rollback()
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.execute(text("RESET search_path"))
+            conn.commit()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 24
+    ))
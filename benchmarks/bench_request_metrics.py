@@ -0,0 +1,110 @@
+"""
+Benchmark: per-request overhead of the request metrics middleware.
+Usage: python -m benchmarks.bench_request_metrics [requests] [rounds]
+
+No server or database needed. Requests are driven straight through the ASGI
+interface (no sockets) against:
+  - a bare ASGI app returning a fixed body, with and without
+    RequestMetricsMiddleware (the middleware's own cost)
+  - a FastAPI app with a prefixed router and a path-parameter route, with
+    and without it (overhead relative to a real, small endpoint)
+and reports microseconds per request, plus the time to render /metrics.
+Exits non-zero if the recorded request counts do not match.
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+from fastapi import APIRouter, FastAPI
+
+from api.metrics import render_metrics
+from api.request_metrics import HTTP_REQUESTS, RequestMetricsMiddleware
+
+BODY = b'{"status":"healthy"}'
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": BODY})
+
+
+def fastapi_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+    router = APIRouter(prefix="/patients")
+
+    @router.get("/{patient_id}")
+    async def get_patient(patient_id: int):
+        return {"patient_id": patient_id, "status": "healthy"}
+
+    app.include_router(router, prefix="/api/v1")
+    if with_metrics:
+        app.add_middleware(RequestMetricsMiddleware)
+    return app
+
+
+def scope_for(path: str) -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scopes = [scope_for(f"/api/v1/patients/{i % 1000}") for i in range(requests)]
+    start = time.perf_counter()
+    for scope in scopes:
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+def per_request_us(app, requests: int, rounds: int) -> float:
+    async def run() -> float:
+        # Warm-up runs the app's startup-time work (middleware stack build, route compilation)
+        await drive(app, 100)
+        return statistics.median([await drive(app, requests) for _ in range(rounds)])
+
+    return asyncio.run(run()) * 1e6 / requests
+
+
+def recorded(route: str) -> float:
+    return sum(value for labels, value in HTTP_REQUESTS._values.items() if labels[1] == route)
+
+
+def main(requests: int, rounds: int) -> int:
+    print(f"{requests:,} requests per round, median of {rounds} rounds, µs per request")
+    for label, plain, measured in (
+        ("bare ASGI app", bare_app, RequestMetricsMiddleware(bare_app)),
+        ("FastAPI route", fastapi_app(False), fastapi_app(True)),
+    ):
+        before = per_request_us(plain, requests, rounds)
+        after = per_request_us(measured, requests, rounds)
+        print(f"  {label:<14} without {before:7.2f} | with metrics {after:7.2f} | "
+              f"overhead {after - before:6.2f} µs ({(after - before) / before:.1%})")
+
+    start = time.perf_counter()
+    text = render_metrics()
+    print(f"  render /metrics: {(time.perf_counter() - start) * 1000:.2f} ms for {len(text.splitlines()):,} lines")
+
+    expected = (100 + requests * rounds)
+    counts = {"<unmatched>": recorded("<unmatched>"), "/api/v1/patients/{patient_id}":
+              recorded("/api/v1/patients/{patient_id}")}
+    ok = all(count == expected for count in counts.values())
+    print(f"Request counts: {'OK' if ok else f'expected {expected:,} per route, got {counts}'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 20000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    ))
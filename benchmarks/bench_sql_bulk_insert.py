@@ -0,0 +1,110 @@
+"""
+Benchmark: single-row lab result creates vs. the bulk NDJSON path.
+Usage: python -m benchmarks.bench_sql_bulk_insert [num_rows]
+
+Runs against BENCHMARK_DATABASE_URL (an async URL, e.g.
+postgresql+asyncpg://.../ckd_benchmark); defaults to a temporary SQLite file.
+Set SQL_BULK_INSERT=copy to measure COPY on PostgreSQL.
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from api.bulk import bulk_ingest
+from api.models.sql_models import SQL_BULK_INSERT, Base, Patient, LabResults, insert_rows
+from api.routers.lab_results import build_lab_results_row
+from api.schemas.lab_results import LabResultsCreate
+
+CHUNK_SIZE = 64 * 1024
+PATIENTS = 500
+
+
+def make_records(count: int):
+    for i in range(count):
+        yield {
+            "patient_id": 1 + i % PATIENTS,
+            "test_date": datetime(2024, 1, 1).isoformat(),
+            "serum_creatinine": 1.0 + (i % 40) / 10,
+            "blood_urea_nitrogen": 10 + i % 30,
+            "hemoglobin": 12.5,
+            "egfr": 90 - i % 60
+        }
+
+
+async def chunked(body: bytes):
+    for start in range(0, len(body), CHUNK_SIZE):
+        yield body[start:start + CHUNK_SIZE]
+
+
+async def bench_single(sessionmaker, records) -> float:
+    start = time.perf_counter()
+    async with sessionmaker() as db:
+        for record in records:
+            lab_results = LabResultsCreate.model_validate(record)
+            if await db.get(Patient, lab_results.patient_id) is None:
+                continue
+            row = LabResults(**build_lab_results_row(lab_results))
+            db.add(row)
+            await db.commit()
+            await db.refresh(row)
+    return time.perf_counter() - start
+
+
+async def bench_bulk(sessionmaker, records) -> float:
+    body = "\n".join(json.dumps(record) for record in records).encode("utf-8")
+    start = time.perf_counter()
+    async with sessionmaker() as db:
+        async def insert(rows):
+            return await insert_rows(db, LabResults, rows)
+
+        summary = await bulk_ingest(chunked(body), LabResultsCreate, build_lab_results_row, insert)
+        await db.commit()
+    elapsed = time.perf_counter() - start
+    assert summary["inserted"] == len(records), summary
+    return elapsed
+
+
+async def main(count: int) -> None:
+    url = os.getenv("BENCHMARK_DATABASE_URL")
+    if not url:
+        url = "sqlite+aiosqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_async_engine(url)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker() as db:
+        db.add_all(
+            Patient(patient_id=i, first_name="Bench", last_name=str(i), date_of_birth=date(1970, 1, 1), gender="F")
+            for i in range(1, PATIENTS + 1)
+        )
+        await db.commit()
+
+    records = list(make_records(count))
+    single_count = min(count, 2000)
+    single = await bench_single(sessionmaker, records[:single_count])
+    async with sessionmaker() as db:
+        await db.execute(delete(LabResults))
+        await db.commit()
+    bulk = await bench_bulk(sessionmaker, records)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+    print(f"{'Single-row create + commit + refresh:':<40}{single_count / single:10,.0f} rows/s ({single_count} rows)")
+    print(f"{'Bulk NDJSON (' + SQL_BULK_INSERT + '):':<40}{count / bulk:10,.0f} rows/s ({count} rows)")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000))
@@ -0,0 +1,133 @@
+"""
+Benchmark: API cold start, import-time breakdown and first-request latency.
+Usage: python -m benchmarks.bench_startup [path] [runs]
+
+Needs the databases from DATABASE_URL / MONGODB_URI (steps that cannot
+reach them are reported by /ready and time out after WARMUP_TIMEOUT_SECONDS).
+  1. Import profile: `python -X importtime -c "import api.main"`, summed per
+     top-level package, plus the slowest api.* modules.
+  2. Cold start: starts `uvicorn api.main:app` with WARMUP=false and then
+     WARMUP=true, and measures the time until the port accepts connections
+     (uvicorn listens once the lifespan startup is done), the first GET of
+     `path` (default /api/v1/patients/?limit=1) and a second, warm GET.
+Reports medians over `runs` server starts. Exits non-zero if a server fails
+to start or a request fails.
+"""
+import http.client
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+START_TIMEOUT_SECONDS = 60
+
+
+def import_profile() -> Tuple[float, Dict[str, float], List[Tuple[str, float]]]:
+    """Total import time, self time per top-level package, cumulative time of api.* modules (seconds)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api.main"],
+        capture_output=True, text=True, check=True
+    )
+    packages: Dict[str, float] = defaultdict(float)
+    api_modules: List[Tuple[str, float]] = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, name = int(match.group(1)) / 1e6, int(match.group(2)) / 1e6, match.group(4)
+        packages[name.split(".")[0]] += own
+        if name.startswith("api."):
+            api_modules.append((name, cumulative))
+        if name == "api.main":
+            total = cumulative
+    return total, packages, sorted(api_modules, key=lambda item: -item[1])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def timed_get(port: int, path: str) -> Tuple[float, int]:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    start = time.perf_counter()
+    conn.request("GET", path)
+    response = conn.getresponse()
+    response.read()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed, response.status
+
+
+def cold_start(warmup: bool, path: str) -> Tuple[float, float, float, int]:
+    """Seconds to listening, first and second request latency, and the first request's status."""
+    port = free_port()
+    env = dict(os.environ, WARMUP="true" if warmup else "false")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+            if time.perf_counter() - start > START_TIMEOUT_SECONDS:
+                raise RuntimeError("uvicorn did not start listening in time")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.05).close()
+                break
+            except OSError:
+                time.sleep(0.01)
+        listening = time.perf_counter() - start
+        first, status = timed_get(port, path)
+        second, _ = timed_get(port, path)
+        return listening, first, second, status
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(path: str, runs: int) -> int:
+    total, packages, api_modules = import_profile()
+    print(f"import api.main: {total * 1000:,.0f} ms (-X importtime)")
+    for package, seconds in sorted(packages.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {package:<20} {seconds * 1000:7.1f} ms")
+    print("  slowest api modules (cumulative):")
+    for name, seconds in api_modules[:8]:
+        print(f"    {name:<40} {seconds * 1000:7.1f} ms")
+
+    failures = 0
+    print(f"\nCold start, GET {path}, median of {runs} runs")
+    for warmup in (False, True):
+        samples = []
+        for _ in range(runs):
+            try:
+                samples.append(cold_start(warmup, path))
+            except RuntimeError as exc:
+                print(f"  WARMUP={str(warmup).lower()}: {exc}")
+                failures += 1
+                break
+        if not samples:
+            continue
+        failures += sum(status >= 400 for *_, status in samples)
+        listening, first, second = (statistics.median(sample[i] for sample in samples) for i in range(3))
+        print(f"  WARMUP={str(warmup).lower():<5}  listening {listening * 1000:7.0f} ms | first request "
+              f"{first * 1000:7.1f} ms | second {second * 1000:6.1f} ms | "
+              f"start to first response {(listening + first) * 1000:7.0f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(
+        sys.argv[1] if len(sys.argv) > 1 else "/api/v1/patients/?limit=1",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    ))
@@ -0,0 +1,86 @@
+"""
+Query-count regression check for GET /api/v1/patients/{id}/full.
+Usage: python -m benchmarks.check_patient_full_queries [rows_per_collection]
+
+Seeds an in-memory SQLite database (aiosqlite) and counts the SQL statements
+issued while loading a full patient record. Exits non-zero if the count grows
+with the number of rows or exceeds EXPECTED_QUERIES.
+"""
+import asyncio
+import sys
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from api.models.sql_models import Base, Patient, MedicalHistory, VitalSigns, LabResults, Diagnosis
+from api.routers.patients import load_full_patient
+
+# Patient + medical history + vitals + labs + diagnoses
+EXPECTED_QUERIES = 5
+
+
+def seed_patient(patient_id: int, rows: int) -> List[object]:
+    start = datetime(2024, 1, 1)
+    objects: List[object] = [
+        Patient(
+            patient_id=patient_id,
+            first_name="Test",
+            last_name=f"Patient {patient_id}",
+            date_of_birth=date(1970, 1, 1),
+            gender="F"
+        ),
+        MedicalHistory(patient_id=patient_id, diabetes=True)
+    ]
+    for i in range(rows):
+        when = start + timedelta(days=i)
+        objects.append(VitalSigns(patient_id=patient_id, measurement_date=when, heart_rate=70 + i % 20))
+        objects.append(LabResults(patient_id=patient_id, test_date=when, serum_creatinine=1.0 + i / 100))
+        objects.append(Diagnosis(patient_id=patient_id, diagnosis_date=when, ckd_stage=1 + i % 5))
+    return objects
+
+
+async def count_queries(sessionmaker, statements: List[str], patient_id: int, latest: Optional[int]):
+    async with sessionmaker() as db:
+        statements.clear()
+        patient = await load_full_patient(db, patient_id, latest)
+        return len(statements), patient
+
+
+async def main(rows: int) -> int:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    statements: List[str] = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement)
+    )
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with sessionmaker() as db:
+        db.add_all(seed_patient(1, 1))
+        db.add_all(seed_patient(2, rows))
+        await db.commit()
+
+    failures = 0
+    for patient_id, latest in ((1, None), (2, None), (2, 10)):
+        count, patient = await count_queries(sessionmaker, statements, patient_id, latest)
+        expected_rows = min(rows if patient_id == 2 else 1, latest or rows)
+        ok = (
+            count <= EXPECTED_QUERIES
+            and len(patient.vital_signs) == expected_rows
+            and patient.vital_signs[0].measurement_date >= patient.vital_signs[-1].measurement_date
+        )
+        failures += not ok
+        print(f"patient {patient_id} latest={latest}: {count} queries, "
+              f"{len(patient.vital_signs)} vitals {'OK' if ok else 'FAIL'}")
+
+    await engine.dispose()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)))
@@ -0,0 +1,127 @@
+"""
+Flag sequential scans (and unpruned partitions) in the SQL routers' per-patient queries.
+Usage: python -m benchmarks.check_query_plans [patient_id]
+
+Runs EXPLAIN (FORMAT JSON) for each query against DATABASE_URL (PostgreSQL)
+with enable_seqscan off, so a Seq Scan in the plan means no usable index
+exists rather than the planner preferring a scan of a small table.
+Once lab_results/vital_signs are partitioned (migration 0005), date-bounded
+reads must also prune partitions rather than touch every one.
+Exits non-zero if any query plans a sequential scan or fails to prune.
+"""
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import delete, select, text
+
+from api.models.partitions import PARTITIONED_TABLES, is_partitioned, list_partitions
+from api.models.sql_models import engine, Patient, MedicalHistory, VitalSigns, LabResults
+from api.routers.lab_results import LAB_RESULTS_FIELDS
+from api.routers.patients import FULL_RECORD_COLLECTIONS
+from api.routers.vital_signs import VITAL_SIGNS_FIELDS
+from api.timeseries import downsample_query, in_range
+
+
+def router_queries(patient_id: int) -> List[Tuple[str, Any]]:
+    queries = [
+        ("patients: get by id", select(Patient).where(Patient.patient_id == patient_id)),
+        ("medical_history: by patient",
+         select(MedicalHistory).where(MedicalHistory.patient_id == patient_id)),
+        ("medical_history: cascade delete",
+         delete(MedicalHistory).where(MedicalHistory.patient_id == patient_id)),
+    ]
+    for name, (model, id_column, date_column) in FULL_RECORD_COLLECTIONS.items():
+        queries += [
+            (f"{name}: by patient, newest first",
+             select(model).where(model.patient_id == patient_id).order_by(date_column.desc())),
+            (f"{name}: list filtered by patient",
+             select(model).where(model.patient_id == patient_id).offset(0).limit(100)),
+            (f"{name}: latest N for full record",
+             select(id_column).where(model.patient_id == patient_id)
+             .order_by(date_column.desc(), id_column.desc()).limit(10)),
+            (f"{name}: cascade delete", delete(model).where(model.patient_id == patient_id)),
+        ]
+
+    return queries + [(label, statement) for _, label, statement in range_queries(patient_id)]
+
+
+def range_queries(patient_id: int) -> List[Tuple[str, str, Any]]:
+    """(table, label, statement) for the date-bounded reads that should prune partitions."""
+    end = datetime.utcnow()
+    start = end - timedelta(days=90)
+    queries = []
+    for name, model, date_column, id_column, fields in (
+        ("lab_results", LabResults, LabResults.test_date, LabResults.lab_id, LAB_RESULTS_FIELDS),
+        ("vital_signs", VitalSigns, VitalSigns.measurement_date, VitalSigns.vital_id, VITAL_SIGNS_FIELDS),
+    ):
+        queries += [
+            (name, f"{name}: date range",
+             in_range(select(model).where(model.patient_id == patient_id), date_column, start, end)
+             .order_by(date_column.desc())),
+            (name, f"{name}: daily avg buckets",
+             downsample_query(model, date_column, id_column, fields, patient_id, "day", "avg",
+                              "postgresql", start, end)),
+            (name, f"{name}: hourly last buckets",
+             downsample_query(model, date_column, id_column, fields, patient_id, "hour", "last",
+                              "postgresql", start, end)),
+        ]
+    return queries
+
+
+def seq_scans(plan: Dict[str, Any]) -> Iterator[str]:
+    if plan.get("Node Type") == "Seq Scan":
+        yield plan.get("Relation Name", "?")
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def relations(plan: Dict[str, Any]) -> Iterator[str]:
+    if "Relation Name" in plan:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from relations(child)
+
+
+def main(patient_id: int) -> int:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("The plan check needs PostgreSQL; set DATABASE_URL accordingly.")
+
+    flagged = 0
+    ranged = {label: table for table, label, _ in range_queries(patient_id)}
+    with engine.connect() as conn:
+        with conn.begin() as transaction:
+            # Partitions per partitioned table (monthly + default), after migration 0005
+            partitions = {
+                table: len(list_partitions(conn, table)) + 1
+                for table in PARTITIONED_TABLES if is_partitioned(conn, table)
+            }
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+            for label, statement in router_queries(patient_id):
+                sql = statement.compile(engine, compile_kwargs={"literal_binds": True})
+                plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                tables = sorted(set(seq_scans(plan[0]["Plan"])))
+                result = "SEQ SCAN " + ", ".join(tables) if tables else "ok"
+
+                table = ranged.get(label)
+                if table in partitions and not tables:
+                    scanned = {name for name in relations(plan[0]["Plan"]) if name.startswith(f"{table}_")}
+                    if partitions[table] > 1 and len(scanned) >= partitions[table]:
+                        result = f"NO PRUNING ({len(scanned)} partitions)"
+                    else:
+                        result = f"ok ({len(scanned)}/{partitions[table]} partitions)"
+
+                flagged += not result.startswith("ok")
+                print(f"{result:<30} {label}")
+            # EXPLAIN without ANALYZE does not run the deletes; roll back regardless
+            transaction.rollback()
+
+    print(f"{flagged} queries with sequential scans or no partition pruning")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1))
@@ -0,0 +1,111 @@
+"""
+Load test: requests/sec and latency percentiles for the SQL read routes.
+Usage: python -m benchmarks.load_test_sql [base_url] [concurrency] [total_requests]
+
+Point it at a running server (e.g. `uvicorn api.main:app --workers 1`) and run
+it once against the sync build and once against the async build to compare.
+Uses keep-alive HTTP/1.1 connections from the standard library only.
+"""
+import asyncio
+import sys
+import time
+from typing import List, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = (
+    "/api/v1/patients/?limit=20",
+    "/api/v1/lab-results/?limit=20",
+    "/api/v1/vital-signs/?limit=20",
+)
+
+
+async def read_response(reader: asyncio.StreamReader) -> int:
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status
+
+
+async def worker(host: str, port: int, paths: List[str], jobs: asyncio.Queue,
+                 latencies: List[float], errors: List[int]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while True:
+            try:
+                index = jobs.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            path = paths[index % len(paths)]
+            request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n"
+            start = time.perf_counter()
+            writer.write(request.encode("ascii"))
+            status = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(base_url: str, concurrency: int, total: int) -> Tuple[float, List[float], List[int]]:
+    parts = urlsplit(base_url)
+    host, port = parts.hostname or "localhost", parts.port or 80
+    paths = [parts.path.rstrip("/") + path for path in DEFAULT_PATHS]
+
+    jobs: asyncio.Queue = asyncio.Queue()
+    for index in range(total):
+        jobs.put_nowait(index)
+
+    latencies: List[float] = []
+    errors: List[int] = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(host, port, paths, jobs, latencies, errors) for _ in range(concurrency)
+    ))
+    return time.perf_counter() - start, latencies, errors
+
+
+def main() -> None:
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    total = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+
+    elapsed, latencies, errors = asyncio.run(run(base_url, concurrency, total))
+    latencies.sort()
+    print(f"{len(latencies)} requests, concurrency {concurrency}, {elapsed:.2f}s")
+    print(f"  throughput: {len(latencies) / elapsed:,.0f} req/s")
+    print(f"  p50: {percentile(latencies, 0.50) * 1000:.1f} ms")
+    print(f"  p99: {percentile(latencies, 0.99) * 1000:.1f} ms")
+    if errors:
+        print(f"  errors: {len(errors)} (first status {errors[0]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Initial schema: patients, medical history, vital signs, lab results, diagnoses
+
+Databases created earlier with Base.metadata.create_all already match this
+revision: run `alembic stamp 0001` on them, then `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _patient_fk() -> sa.Column:
+    return sa.Column(
+        "patient_id",
+        sa.Integer,
+        sa.ForeignKey("patients.patient_id", ondelete="CASCADE")
+    )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "patients",
+        sa.Column("patient_id", sa.Integer, primary_key=True),
+        sa.Column("first_name", sa.String(100), nullable=False),
+        sa.Column("last_name", sa.String(100), nullable=False),
+        sa.Column("date_of_birth", sa.Date, nullable=False),
+        sa.Column("gender", sa.String(10), nullable=False),
+        sa.Column("contact_number", sa.String(20)),
+        sa.Column("email", sa.String(100)),
+        sa.Column("address", sa.Text),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("updated_at", sa.DateTime)
+    )
+    op.create_table(
+        "medical_history",
+        sa.Column("history_id", sa.Integer, primary_key=True),
+        _patient_fk(),
+        sa.Column("diabetes", sa.Boolean),
+        sa.Column("hypertension", sa.Boolean),
+        sa.Column("cardiovascular_disease", sa.Boolean),
+        sa.Column("family_history_ckd", sa.Boolean),
+        sa.Column("notes", sa.Text),
+        sa.Column("created_at", sa.DateTime)
+    )
+    op.create_table(
+        "vital_signs",
+        sa.Column("vital_id", sa.Integer, primary_key=True),
+        _patient_fk(),
+        sa.Column("measurement_date", sa.DateTime),
+        sa.Column("blood_pressure_systolic", sa.Integer),
+        sa.Column("blood_pressure_diastolic", sa.Integer),
+        sa.Column("heart_rate", sa.Integer),
+        sa.Column("weight_kg", sa.Float),
+        sa.Column("height_cm", sa.Float),
+        sa.Column("bmi", sa.Float),
+        sa.Column("temperature_c", sa.Float)
+    )
+    op.create_table(
+        "lab_results",
+        sa.Column("lab_id", sa.Integer, primary_key=True),
+        _patient_fk(),
+        sa.Column("test_date", sa.DateTime),
+        sa.Column("serum_creatinine", sa.Float),
+        sa.Column("blood_urea_nitrogen", sa.Integer),
+        sa.Column("sodium_level", sa.Integer),
+        sa.Column("potassium_level", sa.Float),
+        sa.Column("hemoglobin", sa.Float),
+        sa.Column("white_blood_cells", sa.Float),
+        sa.Column("red_blood_cells", sa.Float),
+        sa.Column("egfr", sa.Float)
+    )
+    op.create_table(
+        "diagnoses",
+        sa.Column("diagnosis_id", sa.Integer, primary_key=True),
+        _patient_fk(),
+        sa.Column("diagnosis_date", sa.DateTime),
+        sa.Column("ckd_stage", sa.Integer),
+        sa.Column("gfr_value", sa.Float),
+        sa.Column("notes", sa.Text),
+        sa.Column("created_at", sa.DateTime)
+    )
+
+
+def downgrade() -> None:
+    for table in ("diagnoses", "lab_results", "vital_signs", "medical_history", "patients"):
+        op.drop_table(table)
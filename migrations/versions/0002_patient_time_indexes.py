@@ -0,0 +1,39 @@
+"""Index patient_id foreign keys, time-ordered per patient
+
+PostgreSQL does not index foreign keys, so per-patient lookups and
+ON DELETE CASCADE from patients scanned the child tables. The composite
+(patient_id, <date> DESC) indexes serve both the FK and newest-first reads.
+On PostgreSQL they are built CONCURRENTLY so writes are not blocked.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = (
+    ("ix_medical_history_patient_id", "medical_history", ["patient_id"]),
+    ("ix_vital_signs_patient_measured", "vital_signs", ["patient_id", sa.text("measurement_date DESC")]),
+    ("ix_lab_results_patient_tested", "lab_results", ["patient_id", sa.text("test_date DESC")]),
+    ("ix_diagnoses_patient_diagnosed", "diagnoses", ["patient_id", sa.text("diagnosis_date DESC")]),
+)
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,28 @@
+"""Add updated_at to per-patient child tables
+
+Lets conditional GETs derive ETags for per-patient collections from
+count + max(updated_at). Existing rows get the migration time.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+TABLES = ("medical_history", "vital_signs", "lab_results", "diagnoses")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_column(table, "updated_at")
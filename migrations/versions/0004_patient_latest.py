@@ -0,0 +1,50 @@
+"""Add the patient_latest snapshot table
+
+Holds each patient's newest non-null value per lab and vital field. After
+upgrading, populate it with `python -m scripts.rebuild_patient_latest`.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "patient_latest",
+        sa.Column(
+            "patient_id",
+            sa.Integer,
+            sa.ForeignKey("patients.patient_id", ondelete="CASCADE"),
+            primary_key=True
+        ),
+        sa.Column("last_test_date", sa.DateTime),
+        sa.Column("serum_creatinine", sa.Float),
+        sa.Column("blood_urea_nitrogen", sa.Integer),
+        sa.Column("sodium_level", sa.Integer),
+        sa.Column("potassium_level", sa.Float),
+        sa.Column("hemoglobin", sa.Float),
+        sa.Column("white_blood_cells", sa.Float),
+        sa.Column("red_blood_cells", sa.Float),
+        sa.Column("egfr", sa.Float),
+        sa.Column("last_measurement_date", sa.DateTime),
+        sa.Column("blood_pressure_systolic", sa.Integer),
+        sa.Column("blood_pressure_diastolic", sa.Integer),
+        sa.Column("heart_rate", sa.Integer),
+        sa.Column("weight_kg", sa.Float),
+        sa.Column("height_cm", sa.Float),
+        sa.Column("bmi", sa.Float),
+        sa.Column("temperature_c", sa.Float),
+        sa.Column("updated_at", sa.DateTime)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("patient_latest")
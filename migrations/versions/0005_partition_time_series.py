@@ -0,0 +1,92 @@
+"""Range-partition lab_results and vital_signs by month (PostgreSQL)
+
+Rebuilds both tables as PARTITION BY RANGE (test_date / measurement_date)
+with monthly partitions from the oldest row through PARTITION_MONTHS_AHEAD
+months ahead, plus a default partition. The primary keys become
+(id, date) because PostgreSQL requires the partition key in every unique
+constraint; ids still come from the original sequences. Rows are copied
+under an exclusive lock, so run this in a maintenance window on large
+tables. Afterwards, `python -m scripts.manage_partitions` keeps future
+partitions created and detaches expired ones. SQLite is left unpartitioned.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+from sqlalchemy import text
+
+from api.models.partitions import (
+    PARTITION_MONTHS_AHEAD,
+    create_default_partition,
+    ensure_partitions,
+    month_start,
+)
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+# (table, id column, partition key, patient index)
+TABLES = (
+    ("lab_results", "lab_id", "test_date", "ix_lab_results_patient_tested"),
+    ("vital_signs", "vital_id", "measurement_date", "ix_vital_signs_patient_measured"),
+)
+
+
+def _rebuild(table: str, id_column: str, date_column: str, index: str, partition: bool) -> None:
+    """Copy `table` into a new (partitioned or plain) table with the same name, keys and index."""
+    bind = op.get_bind()
+    old = f"{table}_old"
+    sequence = bind.execute(text(f"SELECT pg_get_serial_sequence('{table}', '{id_column}')")).scalar()
+
+    op.execute(f'ALTER TABLE "{table}" RENAME TO "{old}"')
+    op.execute(f'ALTER TABLE "{old}" DROP CONSTRAINT IF EXISTS "{table}_pkey"')
+    op.execute(f'ALTER TABLE "{old}" DROP CONSTRAINT IF EXISTS "{table}_patient_id_fkey"')
+    op.execute(f'DROP INDEX IF EXISTS "{index}"')
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY NONE")
+
+    partition_by = f" PARTITION BY RANGE ({date_column})" if partition else ""
+    op.execute(f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS){partition_by}')
+    key = f"{id_column}, {date_column}" if partition else id_column
+    op.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_pkey" PRIMARY KEY ({key})')
+    op.execute(
+        f'ALTER TABLE "{table}" ADD CONSTRAINT "{table}_patient_id_fkey" FOREIGN KEY (patient_id) '
+        "REFERENCES patients (patient_id) ON DELETE CASCADE"
+    )
+    op.execute(f'CREATE INDEX "{index}" ON "{table}" (patient_id, {date_column} DESC)')
+
+    if partition:
+        first = bind.execute(text(f'SELECT MIN({date_column}) FROM "{old}"')).scalar()
+        create_default_partition(bind, table)
+        ensure_partitions(
+            bind, PARTITION_MONTHS_AHEAD, first_month=month_start(first) if first else None, tables=(table,)
+        )
+
+    # The column lists match (LIKE), so rows can be copied positionally
+    op.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+    if sequence:
+        op.execute(f"ALTER SEQUENCE {sequence} OWNED BY \"{table}\".{id_column}")
+    op.execute(f'DROP TABLE "{old}"')
+    op.execute(f'ANALYZE "{table}"')
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, id_column, date_column, index in TABLES:
+        # Partition keys are part of the primary key, so they cannot be NULL
+        op.execute(f"UPDATE {table} SET {date_column} = COALESCE(updated_at, now()) WHERE {date_column} IS NULL")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {date_column} SET NOT NULL")
+        _rebuild(table, id_column, date_column, index, partition=True)
+
+
+def downgrade() -> None:
+    # Partitions detached by scripts.manage_partitions are not merged back
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, id_column, date_column, index in TABLES:
+        _rebuild(table, id_column, date_column, index, partition=False)
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN {date_column} DROP NOT NULL")
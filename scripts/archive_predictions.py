@@ -0,0 +1,39 @@
+"""
+Move cold predictions out of the hot `predictions` collection.
+Predictions older than --hot-days are archived, except each patient's
+--keep-latest most recent ones.
+
+Usage: python -m scripts.archive_predictions [--hot-days N] [--keep-latest N]
+                                             [--target collection|file|parquet] [--batch-size N]
+"""
+import argparse
+
+from api.models.mongo_models import MongoDB
+from api.models.prediction_tiering import (
+    ARCHIVE_BATCH_SIZE,
+    PREDICTION_ARCHIVE_DIR,
+    PREDICTION_ARCHIVE_TARGET,
+    PREDICTION_HOT_DAYS,
+    PREDICTION_KEEP_LATEST,
+    PredictionTiering
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hot-days", type=int, default=PREDICTION_HOT_DAYS)
+    parser.add_argument("--keep-latest", type=int, default=PREDICTION_KEEP_LATEST)
+    parser.add_argument("--target", choices=["collection", "file", "parquet"], default=PREDICTION_ARCHIVE_TARGET)
+    parser.add_argument("--archive-dir", default=PREDICTION_ARCHIVE_DIR)
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    tiering = PredictionTiering(MongoDB(), target=args.target, archive_dir=args.archive_dir)
+    run = tiering.run(args.hot_days, args.keep_latest, args.batch_size)
+    print(f"Moved {run['moved']} predictions older than {run['cutoff']:%Y-%m-%d %H:%M} "
+          f"to {run['path'] or 'predictions_archive'} in {run['seconds']}s "
+          f"({run['docs_per_second']} docs/s)")
+
+    status = tiering.status()
+    print(f"Hot set: {status['hot_count']} docs, {status['hot_storage_bytes'] / 1e6:.1f} MB storage, "
+          f"{status['hot_index_bytes'] / 1e6:.1f} MB indexes")
+    print(f"Archive: {status['archive_count']} docs, {status['archive_storage_bytes'] / 1e6:.1f} MB storage")
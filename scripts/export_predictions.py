@@ -0,0 +1,57 @@
+"""
+Export predictions to an Arrow IPC stream or a Parquet file for training
+sets and drift reports. Features become float64 columns in
+feature_names.pkl order next to _id, patient_id, model_name, model_version,
+timestamp, prediction_label and prediction_score. Documents are read and
+written in batches, so memory stays bounded by --batch-size.
+
+Usage: python -m scripts.export_predictions OUTPUT [--format arrow|parquet] [--batch-size N]
+                                            [--patient-id N] [--model-name NAME]
+                                            [--include-archived] [--compression CODEC]
+
+Load the result with pyarrow.ipc.open_stream(...).read_all() or
+pandas.read_parquet(...); null-free feature columns convert to NumPy
+without copying (column.to_numpy(zero_copy_only=True)).
+"""
+import argparse
+import time
+
+from api.columnar import EXPORT_PARQUET_COMPRESSION, PredictionBatcher, iter_columnar
+from api.export import EXPORT_BATCH_SIZE
+from api.models.feature_packing import FeaturePacker
+from api.models.mongo_models import MongoDB
+from api.models.prediction_tiering import iter_predictions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output")
+    parser.add_argument("--format", choices=["arrow", "parquet"], default=None,
+                        help="Defaults to parquet for *.parquet outputs, arrow otherwise")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="Rows per record batch/row group")
+    parser.add_argument("--patient-id", type=int)
+    parser.add_argument("--model-name")
+    parser.add_argument("--include-archived", action="store_true")
+    parser.add_argument("--compression", choices=["snappy", "zstd", "gzip", "lz4", "none"],
+                        default=EXPORT_PARQUET_COMPRESSION)
+    args = parser.parse_args()
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "arrow")
+
+    query = {}
+    if args.patient_id is not None:
+        query["patient_id"] = args.patient_id
+    if args.model_name:
+        query["model_name"] = args.model_name
+
+    mongo_db = MongoDB()
+    batcher = PredictionBatcher(FeaturePacker(mongo_db))
+    cursor = iter_predictions(mongo_db, query, batch_size=args.batch_size, include_archived=args.include_archived)
+
+    start = time.perf_counter()
+    size = 0
+    with open(args.output, "wb") as f:
+        for chunk in iter_columnar(cursor, batcher, fmt, args.batch_size, args.compression):
+            f.write(chunk)
+            size += len(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {size / 1e6:.1f} MB of {fmt} to {args.output} in {elapsed:.1f}s "
+          f"({len(batcher.feature_names)} feature columns)")
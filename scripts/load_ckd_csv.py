@@ -0,0 +1,264 @@
+"""
+Seed PostgreSQL from Chronic_Kidney_Disease_data.csv with COPY FROM STDIN.
+Each CSV row becomes a patient with medical history, vital signs and lab
+results. --multiplier generates that many jittered synthetic patients per
+source row, and --readings adds a monthly series of vitals/labs per patient.
+
+Usage: python -m scripts.load_ckd_csv [--csv PATH] [--multiplier N] [--readings N]
+                                      [--batch-size N] [--defer-constraints] [--seed N]
+
+With --defer-constraints, secondary indexes and foreign keys on the loaded
+tables are dropped for the load and recreated (FKs validated) afterwards.
+Everything runs in one transaction, so a failed load leaves no partial data.
+Run scripts.rebuild_patient_latest afterwards to populate the snapshot table.
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from api.models.sql_models import engine
+
+CSV_PATH = "Chronic_Kidney_Disease_data.csv"
+
+TABLE_COLUMNS = {
+    "patients": (
+        "patient_id", "first_name", "last_name", "date_of_birth", "gender",
+        "contact_number", "email", "address", "created_at", "updated_at"
+    ),
+    "medical_history": (
+        "patient_id", "diabetes", "hypertension", "cardiovascular_disease",
+        "family_history_ckd", "notes", "created_at"
+    ),
+    "vital_signs": (
+        "patient_id", "measurement_date", "blood_pressure_systolic", "blood_pressure_diastolic",
+        "heart_rate", "weight_kg", "height_cm", "bmi", "temperature_c"
+    ),
+    "lab_results": (
+        "patient_id", "test_date", "serum_creatinine", "blood_urea_nitrogen", "sodium_level",
+        "potassium_level", "hemoglobin", "white_blood_cells", "red_blood_cells", "egfr"
+    ),
+}
+
+# Serial primary keys to move past the loaded rows
+SEQUENCES = {
+    "patients": "patient_id",
+    "medical_history": "history_id",
+    "vital_signs": "vital_id",
+    "lab_results": "lab_id",
+}
+
+FIRST_NAMES = ("Amara", "Brian", "Chloe", "David", "Esther", "Felix", "Grace", "Hassan",
+               "Ines", "Jean", "Kellia", "Liam", "Mugisha", "Nadia", "Omar", "Patricia")
+LAST_NAMES = ("Uwase", "Smith", "Mugabo", "Okafor", "Garcia", "Nkurunziza", "Chen", "Pheko",
+              "Umuhire", "Moreau", "Kamau", "Novak")
+
+
+def jitter(rng: random.Random, value: float, spread: float, low: float = 0.0,
+           high: Optional[float] = None) -> float:
+    """Gaussian noise proportional to the value, clamped to [low, high]."""
+    value = rng.gauss(value, abs(value) * spread)
+    if high is not None:
+        value = min(value, high)
+    return max(value, low)
+
+
+def synthesize(
+    source: Dict[str, str],
+    patient_id: int,
+    copy: int,
+    readings: int,
+    rng: random.Random,
+    now: datetime
+) -> Dict[str, List[Tuple[Any, ...]]]:
+    """Map one CSV row onto table rows; copy 0 keeps the source values."""
+    spread = 0.05 if copy else 0.0
+
+    def value(field: str, low: float = 0.0, high: Optional[float] = None) -> float:
+        return jitter(rng, float(source[field]), spread, low, high)
+
+    age = int(source["Age"]) + (rng.randint(-3, 3) if copy else 0)
+    birth = date(now.year - max(age, 18), 1, 1) + timedelta(days=rng.randrange(365))
+    gender = "Female" if source["Gender"] == "1" else "Male"
+    systolic, diastolic = value("SystolicBP", 70, 250), value("DiastolicBP", 40, 150)
+
+    rows: Dict[str, List[Tuple[Any, ...]]] = {
+        "patients": [(
+            patient_id, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), birth, gender,
+            None, None, None, now, now
+        )],
+        "medical_history": [(
+            patient_id,
+            source["AntidiabeticMedications"] == "1" or value("HbA1c") >= 6.5,
+            systolic >= 140 or diastolic >= 90,
+            source["Statins"] == "1",
+            source["FamilyHistoryKidneyDisease"] == "1",
+            None,
+            now
+        )],
+        "vital_signs": [],
+        "lab_results": [],
+    }
+
+    bmi = value("BMI", 15, 60)
+    height = rng.uniform(150, 190)
+    creatinine, gfr = value("SerumCreatinine", 0.3), value("GFR", 5, 130)
+    for reading in range(readings):
+        # Monthly readings going back in time, with kidney function drifting down
+        when = now - timedelta(days=30 * (readings - 1 - reading), minutes=rng.randrange(1440))
+        drift = 1 + 0.01 * (readings - 1 - reading)
+        rows["vital_signs"].append((
+            patient_id, when,
+            round(jitter(rng, systolic, 0.03, 70, 250)), round(jitter(rng, diastolic, 0.03, 40, 150)),
+            rng.randint(58, 100),
+            round(bmi * (height / 100) ** 2, 1), round(height, 1), round(bmi, 1),
+            round(rng.uniform(36.1, 37.4), 1)
+        ))
+        rows["lab_results"].append((
+            patient_id, when,
+            round(jitter(rng, creatinine / drift, 0.03, 0.3), 2),
+            round(value("BUNLevels", 1)),
+            round(value("SerumElectrolytesSodium", 100, 170)),
+            round(value("SerumElectrolytesPotassium", 2, 8), 2),
+            round(value("HemoglobinLevels", 5, 20), 1),
+            None, None,
+            round(jitter(rng, gfr * drift, 0.03, 5, 130), 1)
+        ))
+    return rows
+
+
+def generate(csv_path: str, first_id: int, multiplier: int, readings: int,
+             seed: int) -> Iterator[Dict[str, List[Tuple[Any, ...]]]]:
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    patient_id = first_id
+    for copy in range(multiplier):
+        with open(csv_path, newline="") as f:
+            for source in csv.DictReader(f):
+                yield synthesize(source, patient_id, copy, readings, rng, now)
+                patient_id += 1
+
+
+def copy_rows(cursor, table: str, rows: List[Tuple[Any, ...]]) -> None:
+    """Stream rows through COPY ... FROM STDIN (CSV, empty field = NULL)."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    columns = ", ".join(TABLE_COLUMNS[table])
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def drop_constraints(cursor) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+    """Drop secondary indexes and FKs on the loaded tables; return their definitions."""
+    tables = list(TABLE_COLUMNS)
+    cursor.execute(
+        """
+        SELECT c.conrelid::regclass::text, c.conname, pg_get_constraintdef(c.oid)
+        FROM pg_constraint c
+        WHERE c.contype = 'f' AND c.conrelid::regclass::text = ANY(%s)
+        """,
+        (tables,)
+    )
+    foreign_keys = cursor.fetchall()
+    for table, name, _ in foreign_keys:
+        cursor.execute(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"')
+
+    cursor.execute(
+        """
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.schemaname = current_schema() AND i.tablename = ANY(%s)
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+        """,
+        (tables,)
+    )
+    indexes = cursor.fetchall()
+    for name, _ in indexes:
+        cursor.execute(f'DROP INDEX "{name}"')
+    return [definition for _, definition in indexes], foreign_keys
+
+
+def restore_constraints(cursor, indexes: List[str], foreign_keys: List[Tuple[str, str, str]]) -> None:
+    for definition in indexes:
+        cursor.execute(definition)
+    for table, name, definition in foreign_keys:
+        # Partitioned tables (migration 0005) do not support NOT VALID foreign keys
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", (table,))
+        if cursor.fetchone()[0] == "p":
+            cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}')
+            continue
+        cursor.execute(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition} NOT VALID')
+        cursor.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT "{name}"')
+
+
+def load(csv_path: str, multiplier: int, readings: int, batch_size: int,
+         defer_constraints: bool, seed: int) -> Dict[str, int]:
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("COPY loading needs PostgreSQL; set DATABASE_URL accordingly.")
+
+    counts = {table: 0 for table in TABLE_COLUMNS}
+    start = time.perf_counter()
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT COALESCE(MAX(patient_id), 0) + 1 FROM patients")
+        first_id = cursor.fetchone()[0]
+
+        deferred = drop_constraints(cursor) if defer_constraints else ([], [])
+
+        batch: Dict[str, List[Tuple[Any, ...]]] = {table: [] for table in TABLE_COLUMNS}
+        patients = 0
+        for rows in generate(csv_path, first_id, multiplier, readings, seed):
+            for table, table_rows in rows.items():
+                batch[table].extend(table_rows)
+            patients += 1
+            if patients % batch_size == 0:
+                for table, table_rows in batch.items():
+                    copy_rows(cursor, table, table_rows)
+                    counts[table] += len(table_rows)
+                    table_rows.clear()
+                print(f"Copied {patients} patients ({patients / (time.perf_counter() - start):,.0f}/s)")
+        for table, table_rows in batch.items():
+            if table_rows:
+                copy_rows(cursor, table, table_rows)
+                counts[table] += len(table_rows)
+
+        if defer_constraints:
+            print(f"Recreating {len(deferred[0])} indexes and {len(deferred[1])} foreign keys")
+            restore_constraints(cursor, *deferred)
+
+        for table, column in SEQUENCES.items():
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), "
+                f"COALESCE((SELECT MAX({column}) FROM {table}), 1))"
+            )
+        for table in TABLE_COLUMNS:
+            cursor.execute(f"ANALYZE {table}")
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"Done: {', '.join(f'{count} {table}' for table, count in counts.items())} "
+          f"in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--multiplier", type=int, default=1, help="Synthetic patients per CSV row")
+    parser.add_argument("--readings", type=int, default=1, help="Vitals/labs readings per patient")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Patients per COPY batch")
+    parser.add_argument("--defer-constraints", action="store_true",
+                        help="Drop indexes and FKs during the load and rebuild them afterwards")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    load(args.csv, args.multiplier, args.readings, args.batch_size, args.defer_constraints, args.seed)
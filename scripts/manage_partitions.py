@@ -0,0 +1,61 @@
+"""
+Maintain the monthly partitions of lab_results and vital_signs (after
+migration 0005). Creates partitions for the coming months, then detaches
+partitions older than the retention window and moves them to the archive
+schema (or drops them with --drop). Safe to run repeatedly, e.g. daily
+from cron. --first-month also creates past months, moving their rows out
+of the default partition (e.g. after COPY-seeding historical readings).
+
+Usage: python -m scripts.manage_partitions [--ahead N] [--first-month YYYY-MM] [--retain-months N]
+                                           [--archive-schema NAME] [--drop] [--concurrently]
+"""
+import argparse
+from datetime import datetime
+
+from api.models.partitions import (
+    PARTITION_ARCHIVE_SCHEMA,
+    PARTITION_MONTHS_AHEAD,
+    PARTITION_RETAIN_MONTHS,
+    PARTITIONED_TABLES,
+    detach_partitions,
+    ensure_partitions,
+    list_partitions,
+)
+from api.models.sql_models import engine
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ahead", type=int, default=PARTITION_MONTHS_AHEAD,
+                        help="Months of partitions to keep ready after the current one")
+    parser.add_argument("--first-month", type=lambda value: datetime.strptime(value, "%Y-%m").date(),
+                        help="Also create partitions from this month (YYYY-MM) onwards")
+    parser.add_argument("--retain-months", type=int, default=PARTITION_RETAIN_MONTHS,
+                        help="Months to keep attached before the current one (0 keeps everything)")
+    parser.add_argument("--archive-schema", default=PARTITION_ARCHIVE_SCHEMA)
+    parser.add_argument("--drop", action="store_true", help="Drop expired partitions instead of archiving")
+    parser.add_argument("--concurrently", action="store_true",
+                        help="DETACH ... CONCURRENTLY (PostgreSQL 14+) so readers are not blocked")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Partitioning needs PostgreSQL; set DATABASE_URL accordingly.")
+
+    with engine.begin() as conn:
+        created = ensure_partitions(conn, args.ahead, args.first_month)
+    print(f"Created {len(created)} partitions{': ' + ', '.join(created) if created else ''}")
+
+    # DETACH CONCURRENTLY cannot run inside a transaction block
+    options = {"isolation_level": "AUTOCOMMIT"} if args.concurrently else {}
+    with engine.connect().execution_options(**options) as conn:
+        detached = detach_partitions(
+            conn, args.retain_months, args.archive_schema, args.drop, args.concurrently
+        )
+        if not args.concurrently:
+            conn.commit()
+        action = "Dropped" if args.drop else f"Archived to {args.archive_schema}"
+        print(f"{action}: {len(detached)} partitions{': ' + ', '.join(detached) if detached else ''}")
+
+        for table in PARTITIONED_TABLES:
+            partitions = list_partitions(conn, table)
+            if partitions:
+                print(f"{table}: {len(partitions)} partitions, {partitions[0][1]:%Y-%m} to {partitions[-1][1]:%Y-%m}")
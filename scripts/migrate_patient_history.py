@@ -0,0 +1,63 @@
+"""
+Move patient history entries from the one-document-per-entry `patient_history`
+collection into bucketed storage (`patient_history_buckets`).
+Entries keep their ObjectIds, so existing history IDs stay valid.
+
+Usage: python -m scripts.migrate_patient_history [--batch-size N] [--after OBJECT_ID] [--drop-source]
+
+Set PATIENT_HISTORY_STORAGE=bucketed once the migration has finished.
+Re-running with --after <last printed ID> resumes an interrupted migration;
+entries already in a bucket are skipped, so overlapping ranges are safe.
+"""
+import argparse
+import time
+
+from bson import ObjectId
+
+from api.models.mongo_models import MongoDB, BucketedHistoryStore
+
+
+def migrate(batch_size: int, after: ObjectId = None, drop_source: bool = False) -> int:
+    mongo_db = MongoDB()
+    source = mongo_db.patient_history
+    store = BucketedHistoryStore(mongo_db)
+
+    query = {"_id": {"$gt": after}} if after else {}
+    cursor = source.find(query, batch_size=batch_size).sort("_id", 1)
+
+    migrated = 0
+    start = time.perf_counter()
+    batch = []
+    for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            migrated += _write(store, batch)
+            print(f"Migrated {migrated} entries (last _id {batch[-1]['_id']})")
+            batch = []
+    if batch:
+        migrated += _write(store, batch)
+        print(f"Migrated {migrated} entries (last _id {batch[-1]['_id']})")
+
+    elapsed = time.perf_counter() - start
+    print(f"Done: {migrated} entries in {elapsed:.1f}s")
+
+    if drop_source:
+        source.drop()
+        print("Dropped source collection 'patient_history'.")
+    return migrated
+
+
+def _write(store: BucketedHistoryStore, batch) -> int:
+    inserted, errors = store.insert_many(batch)
+    for index, message in errors:
+        print(f"Failed to migrate {batch[index]['_id']}: {message}")
+    return inserted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--after", type=ObjectId, default=None, help="Resume after this _id")
+    parser.add_argument("--drop-source", action="store_true", help="Drop patient_history when done")
+    args = parser.parse_args()
+    migrate(args.batch_size, args.after, args.drop_source)
@@ -0,0 +1,23 @@
+"""
+Rebuild the patient_latest snapshot from lab_results and vital_signs.
+Run after upgrading to migration 0004, after COPY seeding
+(scripts.load_ckd_csv), or whenever rows were changed outside the API.
+
+Usage: python -m scripts.rebuild_patient_latest [--batch-size N]
+"""
+import argparse
+import time
+
+from api.database import SessionLocal
+from api.models.patient_latest import REFRESH_CHUNK_SIZE, rebuild_patient_latest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=REFRESH_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with SessionLocal() as db:
+        count = rebuild_patient_latest(db, args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"Rebuilt snapshots for {count} patients in {elapsed:.1f}s")